@@ -30,9 +30,11 @@ import pika
 import json
 from pika.exceptions import AMQPConnectionError, AMQPError, ChannelClosedByBroker, \
     ChannelWrongStateError
+from pika.adapters.asyncio_connection import AsyncioConnection
 from abc import ABC, ABCMeta, abstractmethod
 from functools import partial
 import random
+import asyncio
 
 class Channel(metaclass=ABCMeta):
     """ Abstract class to represent a comm channel to a node """
@@ -299,6 +301,8 @@ class AmqpChannel(Channel):
                 consumer_tag = const.CONSUMER_TAG
                 self._channel.basic_cancel(consumer_tag=consumer_tag)
                 self._channel.stop_consuming()
+                # Cancels the generator based consumer used for batching
+                self._channel.cancel()
                 self._channel.close()
                 self._connection.close()
                 self._channel = None
@@ -339,13 +343,31 @@ class AmqpChannel(Channel):
     def send_file(self, local_file, remote_file):
         raise Exception('send_file not implemented for AMQP Channel')
 
-    def acknowledge(self, delivery_tag=None):
+    def acknowledge(self, delivery_tag=None, multiple=False):
+        """
+        Acknowledge the delivery. If multiple is set, all the deliveries up to
+        and including delivery_tag are acknowledged with a single ack.
+        """
+        try:
+            self._channel.basic_ack(delivery_tag=delivery_tag, multiple=multiple)
+        except self.connection_exceptions as e:
+            Log.error(self.connection_error_msg.format(repr(e)))
+            self.init()
+            self.acknowledge(delivery_tag, multiple)
+
+    def reject(self, delivery_tag=None, multiple=False, requeue=True):
+        """
+        Negatively acknowledge the delivery so that RMQ re-delivers it.
+        If multiple is set, all the deliveries up to and including
+        delivery_tag are rejected.
+        """
         try:
-            self._channel.basic_ack(delivery_tag=delivery_tag)
+            self._channel.basic_nack(delivery_tag=delivery_tag, multiple=multiple,
+                                     requeue=requeue)
         except self.connection_exceptions as e:
             Log.error(self.connection_error_msg.format(repr(e)))
             self.init()
-            self.acknowledge(delivery_tag)
+            self.reject(delivery_tag, multiple, requeue)
 
 class FILEChannel(Channel):
     def __init__(self, *args, **kwargs):
@@ -504,8 +526,11 @@ class AmqpComm(Comm):
         self.delivery_tag = method.delivery_tag
         self.plugin_callback(body)
 
-    def acknowledge(self):
-        self._inChannel.acknowledge(self.delivery_tag)
+    def acknowledge(self, multiple=False):
+        self._inChannel.acknowledge(self.delivery_tag, multiple)
+
+    def reject(self, multiple=False):
+        self._inChannel.reject(self.delivery_tag, multiple)
 
     def stop(self):
         self.disconnect()
@@ -535,6 +560,41 @@ class AmqpComm(Comm):
                 self.init()
                 self.recv(callback_fn)
 
+    def recv_batch(self, callback_fn, batch_size, linger):
+        """
+        Start consuming the queue messages in batches.
+        Messages are collected until either batch_size messages are received
+        or linger seconds have passed since the first message of the batch.
+        callback_fn receives the list of message bodies; self.delivery_tag
+        points to the last message of the batch so that the whole batch can
+        be acknowledged with a single multiple-ack.
+        """
+        try:
+            self.plugin_callback = callback_fn
+            channel = self._inChannel.channel()
+            if not channel:
+                return
+            channel.basic_qos(prefetch_count=batch_size)
+            batch = []
+            deadline = None
+            for method, properties, body in channel.consume(\
+                    self._inChannel.exchange_queue, inactivity_timeout=linger):
+                if method:
+                    batch.append((method.delivery_tag, body))
+                    if deadline is None:
+                        deadline = time.monotonic() + linger
+                if batch and (len(batch) >= batch_size or method is None \
+                        or time.monotonic() >= deadline):
+                    self.delivery_tag = batch[-1][0]
+                    self.plugin_callback([body for _, body in batch])
+                    batch = []
+                    deadline = None
+        except self._inChannel.connection_exceptions as e:
+            if not self._is_disconnect:
+                Log.error(self._inChannel.connection_error_msg.format(repr(e)))
+                self.init()
+                self.recv_batch(callback_fn, batch_size, linger)
+
     def disconnect(self):
         try:
             Log.debug(f"Disconnecting AMQPSensor RMQ communication")
@@ -547,6 +607,220 @@ class AmqpComm(Comm):
     def connect(self):
         raise Exception('connect not implemented for AMQP Comm')
 
+class AsyncAmqpComm(Comm):
+    """
+    Consumes the sensor queue inside the running event loop using pika's
+    asyncio connection adapter, so no consumer thread is needed.
+    Up to prefetch_count messages are processed concurrently. Messages with
+    the same ordering key are processed one after another in the order of
+    delivery. A message is acknowledged as soon as its callback returns True
+    and rejected for re-delivery otherwise.
+    """
+
+    def __init__(self, prefetch_count=1):
+        Comm.__init__(self)
+        # AmqpChannel is used for the connection configuration only
+        self._config = AmqpChannel()
+        self._prefetch_count = prefetch_count
+        self._loop = None
+        self._connection = None
+        self._channel = None
+        self._closed = None
+        self._pending = set()
+        self._in_flight = {}
+        self.plugin_callback = None
+        self._key_fn = None
+        self._is_disconnect = False
+
+    def _rpc(self, method, *args, **kwargs):
+        """
+        Calls the pika channel method and returns a future which is resolved
+        by its completion callback, or failed if the channel gets closed.
+        """
+        future = self._loop.create_future()
+        self._pending.add(future)
+        future.add_done_callback(self._pending.discard)
+
+        def on_done(result):
+            if not future.done():
+                future.set_result(result)
+        method(*args, callback=on_done, **kwargs)
+        return future
+
+    async def connect(self):
+        """
+        Open the connection with one of the RMQ hosts and open a channel.
+        """
+        self._connection = None
+        self._channel = None
+        ampq_hosts = [f'amqp://{self._config.username}:{self._config.password}@'\
+            f'{host}/{self._config.virtual_host}' for host in self._config.hosts]
+        ampq_hosts = [pika.URLParameters(host) for host in ampq_hosts]
+        random.shuffle(ampq_hosts)
+        connected = self._loop.create_future()
+
+        def on_done(result):
+            if connected.done():
+                return
+            if isinstance(result, BaseException):
+                connected.set_exception(result)
+            else:
+                connected.set_result(result)
+        try:
+            AsyncioConnection.create_connection(ampq_hosts, on_done,
+                                                custom_ioloop=self._loop)
+            connection = await connected
+            self._closed = self._loop.create_future()
+            connection.add_on_close_callback(self._on_connection_closed)
+            opened = self._loop.create_future()
+            connection.channel(on_open_callback=opened.set_result)
+            channel = await opened
+            channel.add_on_close_callback(self._on_channel_closed)
+            self._connection = connection
+            self._channel = channel
+        except AMQPError as e:
+            Log.error(self._config.connection_error_msg.format(repr(e)))
+
+    async def init(self):
+        """
+        Establish connection with Rabbit-MQ server and declare the queue.
+        """
+        self._loop = asyncio.get_event_loop()
+        self._is_disconnect = False
+        retry_count = 0
+        while not self._channel and int(self._config.retry_counter) > retry_count:
+            await self.connect()
+            if not self._channel:
+                Log.warn(f"RMQ Connection Failed. Retry Attempt: {retry_count+1}" \
+                    f" in {2**retry_count} seconds")
+                await asyncio.sleep(2**retry_count)
+                retry_count += 1
+        if not self._channel:
+            Log.error("RMQ connection could not be initialized.")
+            return
+        try:
+            await self._rpc(self._channel.exchange_declare,
+                            exchange=self._config.exchange,
+                            exchange_type=self._config.exchange_type,
+                            durable=self._config.durable)
+            await self._rpc(self._channel.queue_declare,
+                            queue=self._config.exchange_queue,
+                            exclusive=self._config.exclusive,
+                            durable=self._config.durable)
+            await self._rpc(self._channel.queue_bind,
+                            queue=self._config.exchange_queue,
+                            exchange=self._config.exchange,
+                            routing_key=self._config.routing_key)
+            await self._rpc(self._channel.basic_qos,
+                            prefetch_count=self._prefetch_count)
+            Log.info(f'Initialized Exchange: {self._config.exchange}, '
+                     f'Queue: {self._config.exchange_queue}, '
+                     f'prefetch: {self._prefetch_count}')
+        except AMQPError as err:
+            Log.error(f'CSM Fails to initialize the queue. Details: {err}')
+            raise CsmError(-1, f'{err}')
+
+    async def recv(self, callback_fn=None, message=None, key_fn=None):
+        """
+        Start consuming the queue messages.
+        :param callback_fn: Coroutine function called for every message,
+        returns True if the message is to be acknowledged.
+        :param key_fn: Function called with the message body, returns the
+        ordering key and the message to be passed to callback_fn. If not
+        passed, the body is passed and all the messages share one key.
+        """
+        self.plugin_callback = callback_fn
+        self._key_fn = key_fn
+        if self._channel:
+            self._channel.basic_consume(self._config.exchange_queue,
+                                        self._on_message,
+                                        consumer_tag=const.CONSUMER_TAG)
+
+    def _on_message(self, channel, method, properties, body):
+        try:
+            key, message = self._key_fn(body) if self._key_fn else (None, body)
+        except Exception as e:
+            Log.warn(f"Rejecting unreadable message: {e}")
+            channel.basic_nack(delivery_tag=method.delivery_tag, requeue=False)
+            return
+        previous = self._in_flight.get(key)
+        task = self._loop.create_task(
+            self._process(channel, method.delivery_tag, message, previous))
+        self._in_flight[key] = task
+        task.add_done_callback(partial(self._on_processed, key))
+
+    def _on_processed(self, key, task):
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+
+    async def _process(self, channel, delivery_tag, message, previous):
+        """
+        Waits for the previous message with the same key, then passes the
+        message to the callback and acknowledges or rejects it.
+        """
+        if previous:
+            await asyncio.wait([previous])
+        status = False
+        try:
+            status = await self.plugin_callback(message)
+        except Exception as e:
+            Log.warn(f"Error occured during processing message: {e}")
+        # Delivery tags are only valid on the channel they came from
+        if not channel.is_open:
+            return
+        if status:
+            channel.basic_ack(delivery_tag=delivery_tag)
+        else:
+            channel.basic_nack(delivery_tag=delivery_tag, requeue=True)
+
+    def _on_channel_closed(self, channel, reason):
+        for future in list(self._pending):
+            if not future.done():
+                future.set_exception(AMQPError(f'Channel closed: {reason}'))
+        if self._connection and self._connection.is_open \
+                and not self._connection.is_closing:
+            self._connection.close()
+
+    def _on_connection_closed(self, connection, reason):
+        self._connection = None
+        self._channel = None
+        if self._closed and not self._closed.done():
+            self._closed.set_result(reason)
+        if not self._is_disconnect:
+            Log.error(self._config.connection_error_msg.format(repr(reason)))
+            self._loop.create_task(self._reconnect())
+
+    async def _reconnect(self):
+        await self.init()
+        await self.recv(self.plugin_callback, key_fn=self._key_fn)
+
+    async def disconnect(self):
+        """
+        Stop consuming, wait for the messages in flight and close the
+        connection.
+        """
+        try:
+            Log.debug(f"Disconnecting async AMQP RMQ communication")
+            self._is_disconnect = True
+            if self._channel and self._channel.is_open:
+                self._channel.basic_cancel(consumer_tag=const.CONSUMER_TAG)
+            if self._in_flight:
+                await asyncio.wait(list(self._in_flight.values()))
+            if self._connection and self._connection.is_open:
+                self._connection.close()
+                await self._closed
+        except Exception as e:
+            Log.exception(e)
+
+    async def stop(self):
+        await self.disconnect()
+
+    def send(self, message, **kwargs):
+        raise Exception('send not implemented for async AMQP Comm')
+
+    def acknowledge(self):
+        raise Exception('acknowledge not implemented for async AMQP Comm')
+
 class AmqpActuatorComm(Comm):
     def __init__(self):
         Comm.__init__(self)
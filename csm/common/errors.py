@@ -159,3 +159,14 @@ class CsmUnauthorizedError(CsmError):
 class CsmServiceNotAvailable(CsmError):
 
     """This  error represents CSM service is Not Available."""
+
+
+class CsmTooManyRequests(CsmError):
+    """
+    This error represents HTTP 429 Too Many Requests, e.g. a login burst
+    """
+
+    def __init__(self, desc=None, message_id=None, message_args=None):
+        super(CsmTooManyRequests, self).__init__(
+            CSM_OPERATION_NOT_PERMITTED, desc,
+            message_id, message_args)
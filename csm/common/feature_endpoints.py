@@ -0,0 +1,111 @@
+# CORTX-CSM: CORTX Management web and CLI interface.
+# Copyright (c) 2020 Seagate Technology LLC and/or its Affiliates
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+
+import asyncio
+import re
+import time
+
+
+class FeatureEndpointMatcher:
+    """
+    Matches request paths against the feature endpoint mapping.
+    The mapping is compiled once: endpoints without wildcards are looked up in
+    a dict, endpoints with wildcards are compiled to regular expressions and
+    grouped by the number of path segments, as a wildcard never spans a '/'.
+    As before, the first endpoint of the mapping matching the path wins.
+    """
+
+    WILDCARD = '*'
+    WILDCARD_RE = r'[\w\d]*'
+
+    def __init__(self, endpoint_map: dict, cache_size: int = 1024):
+        """
+        :param endpoint_map: Feature endpoint mapping, endpoint to feature info
+        :param cache_size: Number of matched paths to remember
+        """
+        self._exact = {}
+        self._patterns = {}
+        self._size = len(endpoint_map)
+        for order, (endpoint, feature) in enumerate(endpoint_map.items()):
+            if self.WILDCARD in endpoint:
+                regex = re.compile(
+                    f'^{endpoint}$'.replace(self.WILDCARD, self.WILDCARD_RE))
+                self._patterns.setdefault(endpoint.count('/'), []).append(
+                    (order, regex, feature))
+            else:
+                self._exact.setdefault(endpoint, (order, feature))
+        self._cache = {}
+        self._cache_size = cache_size
+
+    def match(self, path: str):
+        """
+        Returns the feature info of the endpoint matching the path
+        :param path: Request path
+        :return: Feature info dict or None
+        """
+        if path in self._cache:
+            return self._cache[path]
+        limit, feature = self._exact.get(path, (self._size, None))
+        for order, regex, value in self._patterns.get(path.count('/'), ()):
+            if order >= limit:
+                break
+            if regex.match(path):
+                feature = value
+                break
+        if len(self._cache) >= self._cache_size:
+            self._cache.clear()
+        self._cache[path] = feature
+        return feature
+
+
+class FeatureSupportCache:
+    """
+    Caches the verdicts of UnsupportedFeaturesDB.is_feature_supported for ttl
+    seconds. Concurrent lookups of the same feature share one DB query.
+    """
+
+    def __init__(self, features_db, ttl: float):
+        """
+        :param features_db: UnsupportedFeaturesDB instance
+        :param ttl: Time in seconds a verdict is kept
+        """
+        self._features_db = features_db
+        self._ttl = ttl
+        self._verdicts = {}
+        self._pending = {}
+
+    async def is_feature_supported(self, component: str, feature: str) -> bool:
+        key = (component, feature)
+        verdict = self._verdicts.get(key)
+        if verdict is not None and verdict[1] > time.monotonic():
+            return verdict[0]
+        future = self._pending.get(key)
+        if future is None:
+            future = asyncio.ensure_future(self._lookup(key))
+            self._pending[key] = future
+            future.add_done_callback(lambda _: self._pending.pop(key, None))
+        # A cancelled request must not cancel the lookup shared with others
+        return await asyncio.shield(future)
+
+    async def _lookup(self, key):
+        supported = await self._features_db.is_feature_supported(*key)
+        self._verdicts[key] = (supported, time.monotonic() + self._ttl)
+        return supported
+
+    def invalidate(self):
+        """
+        Drops all the cached verdicts
+        """
+        self._verdicts.clear()
@@ -16,6 +16,7 @@
 import asyncio
 import inspect
 from typing import Callable
+from cortx.utils.log import Log
 
 
 class Observable:
@@ -34,3 +35,20 @@ class Observable:
                 asyncio.run_coroutine_threadsafe(observer(*args, **kwargs), loop=loop)
             else:
                 observer(*args, **kwargs)
+
+    async def _async_notify_listeners(self, *args, observers=None, **kwargs):
+        """
+        Counterpart of _notify_listeners for callers running in the event
+        loop. The coroutine observers are awaited concurrently and their
+        errors are logged instead of being lost.
+        :param observers: Observers to notify, all the listeners if not passed
+        """
+        coros = []
+        for observer in (self._observers if observers is None else observers):
+            if inspect.iscoroutinefunction(observer):
+                coros.append(observer(*args, **kwargs))
+            else:
+                observer(*args, **kwargs)
+        for result in await asyncio.gather(*coros, return_exceptions=True):
+            if isinstance(result, Exception):
+                Log.warn(f"Error in notifying listener: {result}")
@@ -0,0 +1,59 @@
+# CORTX-CSM: CORTX Management web and CLI interface.
+# Copyright (c) 2020 Seagate Technology LLC and/or its Affiliates
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from csm.common.errors import CsmTooManyRequests
+from csm.core.data.models.users import Passwd
+
+
+class PasswdPool:
+    """
+    Hashes and verifies passwords in a bounded thread pool, so the expensive
+    bcrypt rounds do not block the event loop. bcrypt releases the GIL while
+    hashing. Calls beyond max_pending are rejected instead of being queued.
+    """
+
+    def __init__(self, workers: int = 2, max_pending: int = 32):
+        """
+        :param workers: Number of hashing threads
+        :param max_pending: Number of calls running or waiting for a thread
+        """
+        self._executor = ThreadPoolExecutor(max_workers=workers)
+        self._max_pending = max_pending
+        self._pending = 0
+
+    async def _run(self, func, *args):
+        if self._pending >= self._max_pending:
+            raise CsmTooManyRequests("Too many password verifications in progress")
+        self._pending += 1
+        try:
+            loop = asyncio.get_event_loop()
+            return await loop.run_in_executor(self._executor, func, *args)
+        finally:
+            self._pending -= 1
+
+    async def hash(self, password: str) -> str:
+        return await self._run(Passwd.hash, password)
+
+    async def verify(self, password: str, hashed: str) -> bool:
+        return await self._run(Passwd.verify, password, hashed)
+
+    async def shutdown(self, app=None):
+        """
+        Stops the hashing threads
+        :param app: aiohttp application, when used as a shutdown handler
+        """
+        self._executor.shutdown(wait=False)
@@ -232,6 +232,58 @@ class Payload:
     def data(self):
         return self._data
 
+class CompiledMapping:
+    """
+    Converts one schema to another the same way Payload.convert does, but the
+    mapping dictionary is compiled once into key paths and setter functions,
+    so converting a message does not split the dotted keys again.
+    """
+
+    def __init__(self, map):
+        """
+        :param map: mapping dictionary :type:Dict
+        Mapping file example -
+        key <input schema> : value <output schema>
+        """
+        self._rules = [(self._compile_getter(key), self._compile_setter(value))
+                       for key, value in map.items()]
+
+    @staticmethod
+    def _compile_getter(key):
+        path = key.split('.')
+
+        def get(data):
+            for k in path:
+                if k not in data.keys(): return None
+                data = data[k]
+            return data
+        return get
+
+    @staticmethod
+    def _compile_setter(key):
+        *parents, leaf = key.split('.')
+
+        def set(data, val):
+            for k in parents:
+                if k not in data.keys() or type(data[k]) != dict:
+                    data[k] = {}
+                data = data[k]
+            data[leaf] = val
+        return set
+
+    def convert(self, data, result=None):
+        """
+        Converts the data according to the compiled mapping.
+        :param data: Input schema :type:Dict
+        :param result: Output schema to be filled, a new one if not passed.
+        :return: :type: Dict
+        """
+        if result is None:
+            result = {}
+        for get, set in self._rules:
+            set(result, get(data))
+        return result
+
 class CommonPayload:
     """
     Implements a common payload to represent Json, Toml, Yaml, Ini Doc.
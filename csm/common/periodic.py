@@ -100,7 +100,10 @@ class Periodic:
         if not self.is_running():
             return
         self.task.cancel()
-        with suppress(asyncio.CancelledError, asyncio.TimeoutError):
-            self.loop.run_until_complete(self.task)
+        # From a coroutine, e.g. a shutdown handler, the loop is already
+        # running and the cancelled task just finishes on its own
+        if not self.loop.is_running():
+            with suppress(asyncio.CancelledError, asyncio.TimeoutError):
+                self.loop.run_until_complete(self.task)
         self.task = None
         self.at = None
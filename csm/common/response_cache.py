@@ -0,0 +1,117 @@
+# CORTX-CSM: CORTX Management web and CLI interface.
+# Copyright (c) 2020 Seagate Technology LLC and/or its Affiliates
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+
+import asyncio
+import hashlib
+import json
+import time
+from typing import Awaitable, Callable, Optional
+from cortx.utils.log import Log
+
+
+class CachedResponse:
+    """
+    Serialized response body with its entity tag
+    """
+
+    JSON = 'application/json'
+    BINARY = 'application/octet-stream'
+
+    def __init__(self, value, expiry: float):
+        """
+        :param value: bytes, sent as is, or a value serialized to JSON
+        :param expiry: Monotonic time the response is valid until
+        """
+        if isinstance(value, bytes):
+            self.body = value
+            self.content_type = self.BINARY
+        else:
+            self.body = json.dumps(value, default=str).encode('utf-8')
+            self.content_type = self.JSON
+        self.etag = f'"{hashlib.sha256(self.body).hexdigest()[:32]}"'
+        self.expiry = expiry
+
+    def matches(self, if_none_match: Optional[str]) -> bool:
+        """
+        Checks an If-None-Match header against the entity tag
+        """
+        if not if_none_match:
+            return False
+        tags = [tag.strip() for tag in if_none_match.split(',')]
+        return '*' in tags or self.etag in tags or f'W/{self.etag}' in tags
+
+
+class ResponseCache:
+    """
+    Caches the responses of the endpoints polled by the clients.
+    A response is computed once and reused until it expires or is invalidated
+    by the operations changing it. Concurrent requests of a response being
+    computed share the computation.
+    """
+
+    def __init__(self, ttl: float = 60):
+        """
+        :param ttl: Time in seconds a response is kept
+        """
+        self._ttl = ttl
+        self._responses = {}
+        self._pending = {}
+        self._generation = 0
+
+    async def get(self, key: str, compute: Callable[[], Awaitable]) -> CachedResponse:
+        """
+        Returns the cached response, computing it if needed.
+        Errors of the computation are raised and not cached.
+        :param key: Name of the response, e.g. the endpoint
+        :param compute: Coroutine function returning the response value
+        """
+        response = self._responses.get(key)
+        if response is not None and response.expiry > time.monotonic():
+            return response
+        future = self._pending.get(key)
+        if future is None:
+            future = asyncio.ensure_future(self._compute(key, compute, self._generation))
+            self._pending[key] = future
+            future.add_done_callback(
+                lambda done: self._pending.pop(key, None)
+                if self._pending.get(key) is done else None)
+        # A cancelled request must not cancel the computation shared with others
+        return await asyncio.shield(future)
+
+    async def _compute(self, key: str, compute: Callable[[], Awaitable],
+                       generation: int) -> CachedResponse:
+        """
+        :param generation: Generation of the cache when the computation was
+        requested, the task may only start after an invalidation
+        """
+        response = CachedResponse(await compute(), time.monotonic() + self._ttl)
+        # A response computed while it was invalidated may be stale already
+        if generation == self._generation:
+            self._responses[key] = response
+        return response
+
+    def invalidate(self, *prefixes: str):
+        """
+        Drops the responses whose key starts with one of the prefixes,
+        all of them if no prefix is given
+        """
+        self._generation += 1
+        for key in list(self._responses):
+            if not prefixes or key.startswith(prefixes):
+                del self._responses[key]
+        for key in list(self._pending):
+            if not prefixes or key.startswith(prefixes):
+                del self._pending[key]
+        Log.debug(f"Cached responses invalidated: {prefixes or 'all'}")
@@ -24,6 +24,14 @@ class Service:
         task = asyncio.run_coroutine_threadsafe(coro, self._loop)
         return task.result()
 
+    def _in_loop(self):
+        """
+        Checks whether the caller runs in the service event loop, where
+        _run_coroutine would block the loop forever.
+        """
+        # asyncio.get_running_loop() is only available from Python 3.7
+        return asyncio._get_running_loop() is self._loop
+
 
 class ApplicationService(Service):
     """
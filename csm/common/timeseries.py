@@ -14,8 +14,11 @@
 # please email opensource@seagate.com or cortx-questions@seagate.com.
 
 import json
+import math
+import time
 import aiohttp
 import asyncio
+from collections import OrderedDict
 from string import Template
 from datetime import datetime, timedelta
 
@@ -89,6 +92,54 @@ class TimeSeriesProvider:
     async def process_request(self, **args):
         pass
 
+    async def shutdown(self, app=None):
+        pass
+
+class StatsCache:
+    """
+    LRU cache of stats payloads, each one valid until its expiration time.
+    Identical requests made while the payload is being computed share the
+    computation.
+    """
+
+    def __init__(self, size: int = 256):
+        """
+        :param size: Maximum number of payloads kept
+        """
+        self._size = size
+        self._payloads = OrderedDict()
+        self._pending = {}
+
+    async def get(self, key, compute, expiry):
+        """
+        Return the cached payload, computing it if needed.
+        Failures are raised and not cached.
+        :param key: Hashable request key
+        :param compute: Coroutine function returning the payload
+        :param expiry: Function of the current time returning the expiration
+                       time of a payload computed now
+        """
+        entry = self._payloads.get(key)
+        if entry is not None and entry[1] > time.time():
+            self._payloads.move_to_end(key)
+            return entry[0]
+        future = self._pending.get(key)
+        if future is None:
+            future = asyncio.ensure_future(self._compute(key, compute, expiry))
+            self._pending[key] = future
+            future.add_done_callback(lambda _: self._pending.pop(key, None))
+        # A cancelled request must not cancel the computation shared with others
+        return await asyncio.shield(future)
+
+    async def _compute(self, key, compute, expiry):
+        payload = await compute()
+        self._payloads[key] = (payload, expiry(time.time()))
+        self._payloads.move_to_end(key)
+        while len(self._payloads) > self._size:
+            self._payloads.popitem(last=False)
+        return payload
+
+
 class TimelionProvider(TimeSeriesProvider):
     """
     Api for Timelion
@@ -119,6 +170,8 @@ class TimelionProvider(TimeSeriesProvider):
                                 }}')
         self._timelion_query = Template('.es(q=$metric, timefield=$timestamp, ' +
                                 'index=$index, metric=$method).$processing()')
+        self._session = None
+        self._cache = None
 
     def init(self):
         try:
@@ -140,6 +193,16 @@ class TimelionProvider(TimeSeriesProvider):
                     template_metrics[metric["name"]] = query
             self._aggr_rule = self._template_agg_rule
             self._indexes = ["statsd_timerdata-*", "statsd_counter-*", "statsd_gauge-*"]
+            self._connections = int(Conf.get(const.CSM_GLOBAL_INDEX,
+                                             const.STATS_PROVIDER_CONNECTIONS, 10))
+            self._timeout = aiohttp.ClientTimeout(
+                total=float(Conf.get(const.CSM_GLOBAL_INDEX, const.STATS_PROVIDER_TIMEOUT, 30)),
+                connect=float(Conf.get(const.CSM_GLOBAL_INDEX,
+                                       const.STATS_PROVIDER_CONNECT_TIMEOUT, 5)))
+            self._retries = int(Conf.get(const.CSM_GLOBAL_INDEX, const.STATS_PROVIDER_RETRIES, 2))
+            cache_size = int(Conf.get(const.CSM_GLOBAL_INDEX,
+                                      const.STATS_PROVIDER_CACHE_SIZE, 256))
+            self._cache = StatsCache(cache_size) if cache_size > 0 else None
         except Exception as e:
             Log.debug("Failed to parse stats aggregation rule %s" %e)
             raise CsmInternalError("Failed to parse stats aggregation rule")
@@ -193,6 +256,51 @@ class TimelionProvider(TimeSeriesProvider):
         Log.debug(f"Timelion Request: id: {stats_id}, panel: {panel}, from: {from_t}, "
                   f"duration: {duration_t}, metric_list: {metric_list}, interval: {interval}, "
                   f"total_sample: {total_sample}, unit: {unit}, output_format: {output_format}")
+        request = dict(panel=panel, metric_list=metric_list, interval=interval,
+                       total_sample=total_sample, unit=unit,
+                       output_format=output_format, query=query)
+        if self._cache is None or query:
+            return await self._process_request(stats_id, from_t=from_t,
+                                               duration_t=duration_t, **request)
+        try:
+            from_t, duration_t = self._align_range(from_t, duration_t)
+        except (TypeError, ValueError):
+            return await self._process_request(stats_id, from_t=from_t,
+                                               duration_t=duration_t, **request)
+        key = (panel.lower(), tuple(metric_list), from_t, duration_t, str(interval),
+               str(total_sample), tuple(unit) if type(unit) is list else unit, output_format)
+        payload = await self._cache.get(
+            key,
+            lambda: self._process_request(None, from_t=from_t, duration_t=duration_t,
+                                          **request),
+            lambda now: self._payload_expiry(duration_t, now))
+        return dict(payload, id=stats_id)
+
+    def _align_range(self, from_t, duration_t):
+        """
+        Widen the time range to storage interval boundaries, so the requests
+        of the same range made during one interval share the result
+        """
+        step = self._storage_interval
+        from_t = int(from_t) // step * step
+        duration_t = math.ceil(int(duration_t) / step) * step
+        return from_t, duration_t
+
+    def _payload_expiry(self, duration_t, now):
+        """
+        The queried range ends offset seconds before duration_t, a range
+        ending one more interval in the past is stored already and immutable,
+        it is kept until evicted. A range reaching the trailing interval is
+        valid until the next interval is stored.
+        """
+        if duration_t + self._storage_interval <= now:
+            return math.inf
+        step = self._storage_interval
+        return (now // step + 1) * step
+
+    async def _process_request(self, stats_id, panel, from_t, duration_t,
+                    metric_list, interval, total_sample,
+                    unit, output_format, query):
         try:
             interval, duration_t, from_t = await self._parse_interval(from_t, duration_t, interval, total_sample)
             from_t = str(datetime.utcfromtimestamp(int(from_t)).isoformat())+'.000Z'
@@ -325,22 +433,48 @@ class TimelionProvider(TimeSeriesProvider):
         body = body.replace("${interval}", str(interval.replace("s", "")))
         return await self._query(json.loads(body))
 
+    def _get_session(self):
+        """
+        Return the session shared by the queries, its connections are kept
+        alive and reused. It is created on the first query, in the event loop.
+        """
+        if self._session is None or self._session.closed:
+            Log.debug("Creating session to timelion")
+            connector = aiohttp.TCPConnector(limit=self._connections)
+            self._session = aiohttp.ClientSession(connector=connector,
+                                                  timeout=self._timeout)
+        return self._session
+
     async def _query(self, data):
         """
         Use timelion api to get aggregated data
+        Queries only read the data, so those failing on a connection which
+        was reset are retried.
         """
-        try:
-            Log.debug("Creating session request to timelion")
-            async with aiohttp.ClientSession() as session:
-                async with session.post(self._url,
+        attempt = 0
+        while True:
+            try:
+                async with self._get_session().post(self._url,
                             json=data,
                             headers=self._header) as resp:
-                    result = await resp.text()
-                await session.close()
-            return result
-        except Exception as e:
-            Log.debug("Timelion connection error: %s" %e)
-            raise CsmInternalError("Connection failed to timelion %s" %self._url)
+                    return await resp.text()
+            except (aiohttp.ServerDisconnectedError, aiohttp.ClientOSError) as e:
+                if attempt >= self._retries:
+                    Log.debug("Timelion connection error: %s" %e)
+                    raise CsmInternalError("Connection failed to timelion %s" %self._url)
+                attempt += 1
+                Log.debug(f"Timelion connection reset, retrying ({attempt}): {e}")
+            except Exception as e:
+                Log.debug("Timelion connection error: %s" %e)
+                raise CsmInternalError("Connection failed to timelion %s" %self._url)
+
+    async def shutdown(self, app=None):
+        """
+        Close the session and its connections
+        """
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
 
     async def _convert_payload(self, res, stats_id, panel, output_format, units):
         """
@@ -20,9 +20,9 @@ import asyncio
 import json
 import traceback
 import ssl
+from collections import deque
 from concurrent.futures import CancelledError as ConcurrentCancelledError
 from asyncio import CancelledError as AsyncioCancelledError
-from weakref import WeakSet
 from aiohttp import web, web_exceptions
 from abc import ABC
 from secure import SecureHeaders
@@ -34,19 +34,21 @@ from csm.common.conf import Conf, ConfSection, DebugConf
 from cortx.utils.log import Log
 from cortx.utils.product_features import unsupported_features
 from csm.common.payload import Json
+from csm.common.feature_endpoints import FeatureEndpointMatcher, FeatureSupportCache
 from csm.common.services import Service
 from csm.core.blogic import const
 from csm.common.cluster import Cluster
 from csm.common.errors import (CsmError, CsmNotFoundError, CsmPermissionDenied,
                                CsmInternalError, InvalidRequest, ResourceExist,
-                               CsmNotImplemented, CsmServiceConflict, CsmGatewayTimeout)
+                               CsmNotImplemented, CsmServiceConflict, CsmGatewayTimeout,
+                               CsmTooManyRequests)
 from csm.core.routes import ApiRoutes
 from csm.core.services.alerts import AlertsAppService
 from csm.core.services.usl import UslService
 from csm.core.services.file_transfer import DownloadFileEntity
 from csm.core.controllers.view import CsmView, CsmResponse, CsmAuth
 from csm.core.controllers import CsmRoutes
-import re
+from csm.core.agent.websocket import WebSocketFanout, WebSocketEvent
 
 
 class CsmApi(ABC):
@@ -98,7 +100,19 @@ class CsmRestApi(CsmApi, ABC):
         CsmApi.init()
         CsmRestApi._queue = asyncio.Queue()
         CsmRestApi._bgtasks = []
-        CsmRestApi._wsclients = WeakSet()
+        CsmRestApi._wsfanout = WebSocketFanout(
+            CsmRestApi.json_serializer,
+            queue_size=Conf.get(const.CSM_GLOBAL_INDEX, const.WS_QUEUE_SIZE, 100),
+            lag_policy=Conf.get(const.CSM_GLOBAL_INDEX, const.WS_LAG_POLICY,
+                                WebSocketFanout.POLICY_DISCONNECT),
+            send_timeout=Conf.get(const.CSM_GLOBAL_INDEX, const.WS_SEND_TIMEOUT, 10),
+            default_topics=(const.WS_TOPIC_ALERTS,),
+            history_size=Conf.get(const.CSM_GLOBAL_INDEX, const.WS_HISTORY_SIZE, 1000))
+        CsmRestApi._feature_endpoints = FeatureEndpointMatcher(
+            Json(const.FEATURE_ENDPOINT_MAPPING_SCHEMA).load())
+        CsmRestApi._feature_support = FeatureSupportCache(
+            unsupported_features.UnsupportedFeaturesDB(),
+            Conf.get(const.CSM_GLOBAL_INDEX, const.FEATURE_SUPPORT_TTL, 300))
 
         CsmRestApi._app = web.Application(
             middlewares=[CsmRestApi.set_secure_headers,
@@ -110,6 +124,7 @@ class CsmRestApi(CsmApi, ABC):
         CsmRoutes.add_routes(CsmRestApi._app)
         ApiRoutes.add_websocket_routes(
             CsmRestApi._app.router, CsmRestApi.process_websocket)
+        CsmRoutes.add_auth_metadata(CsmRestApi._app)
 
         CsmRestApi._app.on_startup.append(CsmRestApi._on_startup)
         CsmRestApi._app.on_shutdown.append(CsmRestApi._on_shutdown)
@@ -204,42 +219,49 @@ class CsmRestApi(CsmApi, ABC):
         raise web.HTTPUnauthorized(headers=CsmAuth.UNAUTH)
 
     @staticmethod
-    async def _resolve_handler(request):
-        match_info = await request.app.router.resolve(request)
-        return match_info.handler
+    def _get_auth_metadata(request):
+        """
+        Get the public flag and required permissions of the request handler.
+        The request is already resolved by the router when the middlewares
+        run, the metadata is stored on the request to be shared by them.
+        """
+        metadata = request.get(CsmAuth.REQUEST_METADATA)
+        if metadata is None:
+            match_info = request.match_info
+            # Handlers of unresolved requests are created per request
+            metadata = CsmView.get_auth_metadata(
+                match_info.handler, request.method,
+                cache=match_info.http_exception is None)
+            request[CsmAuth.REQUEST_METADATA] = metadata
+        return metadata
 
     @classmethod
-    async def _is_public(cls, request):
-        handler = await cls._resolve_handler(request)
-        return CsmView.is_public(handler, request.method)
+    def _is_public(cls, request):
+        is_public, _ = cls._get_auth_metadata(request)
+        return is_public
 
     @classmethod
-    async def _get_permissions(cls, request):
-        handler = await cls._resolve_handler(request)
-        return CsmView.get_permissions(handler, request.method)
+    def _get_permissions(cls, request):
+        _, permissions = cls._get_auth_metadata(request)
+        return permissions
 
     @staticmethod
     async def check_for_unsupported_endpoint(request):
         """
         Check whether the endpoint is supported. If not, send proper error
         reponse.
+        The endpoint mapping is compiled at init and the verdicts are cached
+        for CSM_SERVICE.CSM_AGENT.feature_support_ttl seconds.
         """
-        def getMatchingEndpoint(endpoint_map, path):
-            for key,value in endpoint_map.items():
-                map_re = f'^{key}$'.replace("*", "[\w\d]*")
-                if re.search(rf"{map_re}", path):
-                    return value
-
-        feature_endpoint_map = Json(const.FEATURE_ENDPOINT_MAPPING_SCHEMA).load()
-        endpoint = getMatchingEndpoint(feature_endpoint_map, request.path)
+        endpoint = CsmRestApi._feature_endpoints.match(request.path)
         if endpoint:
-            unsupported_feature_instance = unsupported_features.UnsupportedFeaturesDB()
+            feature_support = CsmRestApi._feature_support
             if endpoint[const.DEPENDENT_ON]:
                 for component in endpoint[const.DEPENDENT_ON]:
-                    if not await unsupported_feature_instance.is_feature_supported(component,endpoint[const.FEATURE_NAME]):
+                    if not await feature_support.is_feature_supported(component,endpoint[const.FEATURE_NAME]):
                         Log.debug(f"The request {request.path} of feature {endpoint[const.FEATURE_NAME]} is not supported by {component}")
                         raise InvalidRequest("This feature is not supported on this environment.")
-            if not await unsupported_feature_instance.is_feature_supported(const.CSM_COMPONENT_NAME, endpoint[const.FEATURE_NAME]):
+            if not await feature_support.is_feature_supported(const.CSM_COMPONENT_NAME, endpoint[const.FEATURE_NAME]):
                 Log.debug(f"The request {request.path} of feature {endpoint[const.FEATURE_NAME]} is not supported by {const.CSM_COMPONENT_NAME}")
                 raise InvalidRequest("This feature is not supported on this environment.")
         else:
@@ -249,7 +271,7 @@ class CsmRestApi(CsmApi, ABC):
     @web.middleware
     async def session_middleware(cls, request, handler):
         session = None
-        is_public = await cls._is_public(request)
+        is_public = cls._is_public(request)
         if not is_public:
             hdr = request.headers.get(CsmAuth.HDR)
             if not hdr:
@@ -278,7 +300,7 @@ class CsmRestApi(CsmApi, ABC):
     async def permission_middleware(cls, request, handler):
         if request.session is not None:
             # Check user permissions
-            required = await cls._get_permissions(request)
+            required = cls._get_permissions(request)
             verdict = (request.session.permissions & required) == required
             Log.debug(f'Required permissions: {required}')
             Log.debug(f'User permissions: {request.session.permissions}')
@@ -354,6 +376,8 @@ class CsmRestApi(CsmApi, ABC):
             return CsmRestApi.json_response(CsmRestApi.error_response(e, request), status=504)
         except CsmServiceConflict as e:
             return CsmRestApi.json_response(CsmRestApi.error_response(e, request), status=409)
+        except CsmTooManyRequests as e:
+            return CsmRestApi.json_response(CsmRestApi.error_response(e, request), status=429)
         except (CsmError, InvalidRequest) as e:
             return CsmRestApi.json_response(CsmRestApi.error_response(e, request), status=400)
         except KeyError as e:
@@ -405,28 +429,32 @@ class CsmRestApi(CsmApi, ABC):
         scheme should be designed for this case.
         For the time being the handler is marked as 'public'
         to disable authentication for websockets completely.
+        Text messages received from the client are subscription requests,
+        see WebSocketFanout.
         """
         ws = web.WebSocketResponse()
         await ws.prepare(request)
         Log.debug('REST API websock connection opened')
-        CsmRestApi._wsclients.add(ws)
+        CsmRestApi._wsfanout.add(ws, request.remote)
 
         try:
             async for msg in ws:
                 if msg.type == web.WSMsgType.TEXT:
-                    Log.debug('REST API websock msg (ignored): %s' % msg)
+                    Log.debug('REST API websock msg: %s' % msg)
+                    CsmRestApi._wsfanout.handle_message(ws, msg.data)
                 elif msg.type == web.WSMsgType.ERROR:
                     Log.debug('REST API websock exception: %s' % ws.exception())
             Log.debug('REST API websock connection closed')
             await ws.close()
         finally:
-            CsmRestApi._wsclients.discard(ws)
+            CsmRestApi._wsfanout.remove(ws)
         return ws
 
     @staticmethod
     async def _on_startup(app):
         Log.debug('REST API startup')
         CsmRestApi._bgtasks.append(app.loop.create_task(CsmRestApi._websock_bg()))
+        CsmRestApi._bgtasks.append(app.loop.create_task(CsmRestApi._websock_metrics_bg()))
         CsmRestApi._bgtasks.append(app.loop.create_task(CsmRestApi._ssl_cert_check_bg()))
 
     @staticmethod
@@ -434,6 +462,7 @@ class CsmRestApi(CsmApi, ABC):
         Log.debug('REST API shutdown')
         for task in CsmRestApi._bgtasks:
             task.cancel()
+        await CsmRestApi._wsfanout.close()
 
     @staticmethod
     async def _websock_bg():
@@ -441,22 +470,43 @@ class CsmRestApi(CsmApi, ABC):
         try:
             while True:
                 msg = await CsmRestApi._queue.get()
-                await CsmRestApi._websock_broadcast(msg)
+                CsmRestApi._websock_broadcast(msg)
         except AsyncioCancelledError:
             Log.debug('REST API websock background task canceled')
 
         Log.debug('REST API websock background task done')
 
     @staticmethod
-    async def _websock_broadcast(msg):
-        # do explicit copy because the list can change asynchronously
-        clients = CsmRestApi._wsclients.copy()
+    def _websock_broadcast(msg):
         try:
-            for ws in clients:
-                json_msg = CsmRestApi.json_serializer(msg)
-                await ws.send_str(json_msg)
-        except:
-            Log.debug('REST API websock broadcast error')
+            CsmRestApi._wsfanout.publish(msg)
+        except Exception as e:
+            Log.debug(f'REST API websock broadcast error: {e}')
+
+    @staticmethod
+    def websock_metrics():
+        """
+        Returns the send queue depth of every connected websocket client
+        """
+        return CsmRestApi._wsfanout.metrics()
+
+    @staticmethod
+    async def _websock_metrics_bg():
+        """
+        Logs the websocket metrics periodically while clients are connected
+        """
+        interval = int(Conf.get(const.CSM_GLOBAL_INDEX,
+                                const.WS_METRICS_INTERVAL, 300))
+        if interval <= 0:
+            return
+        try:
+            while True:
+                await asyncio.sleep(interval)
+                metrics = CsmRestApi.websock_metrics()
+                if metrics["clients"]:
+                    Log.info(f'REST API websock metrics: {metrics}')
+        except AsyncioCancelledError:
+            Log.debug('REST API websock metrics task canceled')
 
     @classmethod
     async def _ssl_cert_check_bg(cls):
@@ -474,8 +524,14 @@ class CsmRestApi(CsmApi, ABC):
         return await CsmRestApi._queue.put(msg)
 
     @staticmethod
-    def push(alert):
-        coro = CsmRestApi._async_push(alert)
+    def push(msg, topic=const.WS_TOPIC_ALERTS, **attributes):
+        """
+        Publishes the message to the websocket clients subscribed to the topic
+        :param msg: Message to be sent
+        :param topic: Topic of the message
+        :param attributes: Attributes the subscription filters are matched against
+        """
+        coro = CsmRestApi._async_push(WebSocketEvent(topic, msg, **attributes))
         asyncio.run_coroutine_threadsafe(coro, CsmRestApi._app.loop)
         return True
 
@@ -483,13 +539,50 @@ class CsmRestApi(CsmApi, ABC):
 class AlertHttpNotifyService(Service):
     def __init__(self):
         super().__init__()
-        self.unpublished_alerts = set()
+        # Alerts which could not be pushed yet, oldest first
+        self.unpublished_alerts = deque(maxlen=Conf.get(
+            const.CSM_GLOBAL_INDEX, const.WS_HISTORY_SIZE, 1000))
 
     def push_unpublished(self):
+        """
+        Pushes the alerts which could not be pushed before, in order.
+        Stops at the first failure, the remaining alerts are retried with the
+        next alert.
+        """
         while self.unpublished_alerts:
-            self.handle_alert()
+            alert = self.unpublished_alerts[0]
+            try:
+                CsmRestApi.push(alert, const.WS_TOPIC_ALERTS,
+                                severity=alert.severity, host_id=alert.host_id,
+                                node_id=alert.node_id,
+                                enclosure_id=alert.enclosure_id,
+                                module_type=alert.module_type)
+            except Exception as e:
+                Log.warn(f"Pushing alert {alert.alert_uuid} failed: {e}")
+                break
+            self.unpublished_alerts.popleft()
 
     def handle_alert(self, alert):
-        self.unpublished_alerts.add(alert)
-        if CsmRestApi.push(alert):
-            self.unpublished_alerts.discard(alert)
+        self.unpublished_alerts.append(alert)
+        self.push_unpublished()
+
+    def handle_health(self, msg_body):
+        """
+        Publishes a health map update to the websocket clients subscribed to
+        the health of the updated subtree.
+        :param msg_body: Health update as passed to update_health_map
+        """
+        resource_key = msg_body.get(const.RESOURCE_KEY, "")
+        host_id = msg_body.get(const.ALERT_NODE_ID, "")
+        resources = msg_body.get(const.RESOURCE_LIST, [])
+        subtree = resource_key.split('.') + [resource.get(const.KEY, "")
+                                             for resource in resources]
+        health = {
+            "topic": const.WS_TOPIC_HEALTH,
+            "resource_key": resource_key,
+            "host_id": host_id,
+            "severity": msg_body.get(const.ALERT_SEVERITY, ""),
+            "resources": resources
+        }
+        CsmRestApi.push(health, const.WS_TOPIC_HEALTH, host_id=host_id,
+                        subtree=tuple(subtree))
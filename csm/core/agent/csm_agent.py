@@ -75,6 +75,7 @@ class CsmAgent:
         CsmAgent.health_monitor = HealthMonitorService(\
                 health_plugin_obj, health_service)
         CsmRestApi._app[const.HEALTH_SERVICE] = health_service
+        CsmRestApi._app.on_shutdown.append(health_service.shutdown)
 
         http_notifications = AlertHttpNotifyService()
         pm = import_plugin_module(const.ALERT_PLUGIN)
@@ -85,6 +86,8 @@ class CsmAgent:
         email_queue.start_worker_sync()
 
         CsmAgent.alert_monitor.add_listener(http_notifications.handle_alert)
+        CsmAgent.health_monitor.add_listener(http_notifications.handle_health)
+        CsmRestApi._app.on_shutdown.append(CsmAgent.alert_monitor.shutdown)
         CsmRestApi._app["alerts_service"] = alerts_service
 
        # Network file manager registration
@@ -93,14 +96,20 @@ class CsmAgent:
         # Stats service creation
         time_series_provider = TimelionProvider(const.AGGREGATION_RULE)
         time_series_provider.init()
+        CsmRestApi._app.on_shutdown.append(time_series_provider.shutdown)
         CsmRestApi._app["stat_service"] = StatsAppService(time_series_provider)
 
         # User/Role/Session management services
         roles = Json(const.ROLES_MANAGEMENT).load()
-        auth_service = AuthService()
+        passwd_pool = PasswdPool(
+            int(Conf.get(const.CSM_GLOBAL_INDEX, const.LOGIN_PASSWD_WORKERS, 2)),
+            int(Conf.get(const.CSM_GLOBAL_INDEX, const.LOGIN_PASSWD_MAX_PENDING, 32)))
+        CsmRestApi._app.on_shutdown.append(passwd_pool.shutdown)
+        auth_service = AuthService(passwd_pool)
         user_manager = UserManager(db)
         role_manager = RoleManager(roles)
         session_manager = SessionManager()
+        CsmRestApi._app.on_shutdown.append(session_manager.shutdown)
         CsmRestApi._app.login_service = LoginService(auth_service,
                                                      user_manager,
                                                      role_manager,
@@ -140,10 +149,14 @@ class CsmAgent:
         s3 = import_plugin_module(const.S3_PLUGIN).S3Plugin()
         CsmRestApi._app[const.S3_IAM_USERS_SERVICE] = IamUsersService(s3, provisioner)
         CsmRestApi._app[const.S3_ACCOUNT_SERVICE] = S3AccountService(s3, provisioner)
-        CsmRestApi._app[const.S3_BUCKET_SERVICE] = S3BucketService(s3, provisioner)
+        s3_bucket_service = S3BucketService(s3, provisioner)
+        CsmRestApi._app[const.S3_BUCKET_SERVICE] = s3_bucket_service
         CsmRestApi._app[const.S3_ACCESS_KEYS_SERVICE] = S3AccessKeysService(s3)
+        # Bucket deletions are stopped before the S3 connections are closed
+        CsmRestApi._app.on_shutdown.append(s3_bucket_service.shutdown)
+        CsmRestApi._app.on_shutdown.append(s3.shutdown)
 
-        user_service = CsmUserService(provisioner, user_manager)
+        user_service = CsmUserService(provisioner, user_manager, passwd_pool)
         CsmRestApi._app[const.CSM_USER_SERVICE] = user_service
         update_repo = UpdateStatusRepository(db)
         security_service = SecurityService(db, provisioner)
@@ -151,15 +164,19 @@ class CsmAgent:
             Conf.get(const.CSM_GLOBAL_INDEX, 'UPDATE.hotfix_store_path'), provisioner, update_repo)
         CsmRestApi._app[const.FW_UPDATE_SERVICE] = FirmwareUpdateService(provisioner,
                 Conf.get(const.CSM_GLOBAL_INDEX, 'UPDATE.firmware_store_path'), update_repo)
-        CsmRestApi._app[const.SYSTEM_CONFIG_SERVICE] = SystemConfigAppService(db, provisioner,
+        system_config_service = SystemConfigAppService(db, provisioner,
             security_service, system_config_mgr, Template.from_file(const.CSM_SMTP_TEST_EMAIL_TEMPLATE_REL))
+        CsmRestApi._app[const.SYSTEM_CONFIG_SERVICE] = system_config_service
         CsmRestApi._app[const.STORAGE_CAPACITY_SERVICE] = StorageCapacityService(provisioner)
 
         CsmRestApi._app[const.SECURITY_SERVICE] = security_service
         CsmRestApi._app[const.PRODUCT_VERSION_SERVICE] = ProductVersionService(provisioner)
 
         # USL Service
-        CsmRestApi._app[const.USL_SERVICE] = UslService(s3, db, provisioner)
+        usl_service = UslService(s3, db, provisioner)
+        # The system config holds the friendly name and the network settings
+        system_config_service.add_listener(usl_service.invalidate_responses)
+        CsmRestApi._app[const.USL_SERVICE] = usl_service
 
         # Plugin for Maintenance
         # TODO : Replace PcsHAFramework with hare utility
@@ -231,6 +248,7 @@ if __name__ == '__main__':
     from csm.core.services.users import CsmUserService, UserManager
     from csm.core.services.roles import RoleManagementService, RoleManager
     from csm.core.services.sessions import SessionManager, LoginService, AuthService
+    from csm.common.passwd import PasswdPool
     from csm.core.services.security import SecurityService
     from csm.core.services.hotfix_update import HotfixApplicationService
     from csm.core.repositories.update_status import UpdateStatusRepository
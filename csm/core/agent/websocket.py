@@ -0,0 +1,351 @@
+# CORTX-CSM: CORTX Management web and CLI interface.
+# Copyright (c) 2020 Seagate Technology LLC and/or its Affiliates
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+
+import asyncio
+import json
+from collections import deque
+from typing import Callable
+from uuid import uuid4
+from cortx.utils.log import Log
+
+
+class WebSocketEvent:
+    """
+    Message published to the websocket clients, with the topic and the
+    attributes the subscriptions of the clients are matched against
+    """
+
+    def __init__(self, topic: str, msg, **attributes):
+        self.topic = topic
+        self.msg = msg
+        self.attributes = attributes
+        self.seq = None
+
+
+class WebSocketSubscription:
+    """
+    Subscription of a client to a topic. Every filter must match the event
+    attribute of the same name: attributes holding a collection, like the
+    path of a health subtree, match if they contain the filter value, other
+    attributes match if they are equal to it, ignoring case.
+    """
+
+    def __init__(self, topic: str, **filters):
+        self.topic = topic
+        self.filters = filters
+
+    def matches(self, event: WebSocketEvent) -> bool:
+        if self.topic != event.topic:
+            return False
+        for name, expected in self.filters.items():
+            value = event.attributes.get(name)
+            if isinstance(value, (list, tuple, set, frozenset)):
+                if expected not in value:
+                    return False
+            elif str(value).lower() != str(expected).lower():
+                return False
+        return True
+
+    def to_dict(self) -> dict:
+        return {"topic": self.topic, **self.filters}
+
+    def __eq__(self, other):
+        return isinstance(other, WebSocketSubscription) and \
+            self.to_dict() == other.to_dict()
+
+
+class WebSocketClient:
+    """
+    Connected websocket client with its own send queue and the topics it is
+    subscribed to. The queue is bounded by WebSocketFanout, which lets the
+    replay of missed events go past the bound. Queued messages are
+    (data, replayed) tuples, so the replayed ones can be told apart when they
+    leave the queue. The reply to a resume request is queued like the
+    replayed messages, so neither is dropped when the client lags behind.
+    """
+
+    def __init__(self, ws, remote=None, subscriptions=None):
+        self.ws = ws
+        self.remote = remote
+        self.queue = asyncio.Queue()
+        self.subscriptions = list(subscriptions or [])
+        self.sequenced = False
+        self.replayed = 0
+        self.sender = None
+        self.sent = 0
+        self.dropped = 0
+
+    @property
+    def depth(self) -> int:
+        return self.queue.qsize()
+
+    @property
+    def lag(self) -> int:
+        """ Number of queued live messages, not counting the replayed ones """
+        return self.depth - self.replayed
+
+    def put(self, data: str, replayed: bool = False):
+        self.queue.put_nowait((data, replayed))
+        if replayed:
+            self.replayed += 1
+
+    def get_nowait(self) -> str:
+        return self._dequeued(self.queue.get_nowait())
+
+    async def get(self) -> str:
+        return self._dequeued(await self.queue.get())
+
+    def drop_oldest(self):
+        """
+        Drops the oldest live message, the replayed ones before it are kept
+        """
+        items = [self.queue.get_nowait() for _ in range(self.depth)]
+        index = next((i for i, (_, replayed) in enumerate(items) if not replayed), None)
+        if index is not None:
+            del items[index]
+        for item in items:
+            self.queue.put_nowait(item)
+
+    def _dequeued(self, item) -> str:
+        data, replayed = item
+        if replayed:
+            self.replayed -= 1
+        return data
+
+    def is_subscribed(self, event: WebSocketEvent) -> bool:
+        return any(subscription.matches(event)
+                   for subscription in self.subscriptions)
+
+
+class WebSocketFanout:
+    """
+    Fans the messages out to the connected websocket clients.
+    Every message is serialized once and put into the send queue of each
+    client. A sender task per client drains its queue, so clients are written
+    concurrently and a slow client only delays itself. A client whose queue is
+    full has fallen past the lag threshold: depending on the lag policy either
+    its oldest message is dropped or it is disconnected.
+
+    Clients receive only the events of the topics they are subscribed to, the
+    filtering is done before the message is serialized. Subscriptions are
+    changed by sending a text message:
+    {"action": "subscribe", "topics": [{"topic": "alerts", "severity": "critical"}]}
+    {"action": "unsubscribe", "topics": [...]}, all topics if "topics" is omitted.
+    The client gets its current subscriptions back. Clients which never
+    subscribe receive the default topics.
+
+    The last events are kept in a ring buffer with their sequence number.
+    A client sending {"action": "resume", "seq": <last seen seq>, "epoch": ...}
+    gets the buffered events it missed, and from then on every message wrapped
+    as {"seq": ..., "epoch": ..., "topic": ..., "data": <message>}. The reply
+    tells whether the gap could be filled completely. If it could not, e.g. the
+    agent was restarted and the epoch changed, the client has to reload.
+    """
+
+    POLICY_DROP = "drop"
+    POLICY_DISCONNECT = "disconnect"
+    ACTION_SUBSCRIBE = "subscribe"
+    ACTION_UNSUBSCRIBE = "unsubscribe"
+    ACTION_RESUME = "resume"
+
+    def __init__(self, serializer: Callable, queue_size: int = 100,
+                 lag_policy: str = POLICY_DISCONNECT, send_timeout: float = 10,
+                 default_topics=(), history_size: int = 1000):
+        """
+        :param serializer: Function converting a message to a str
+        :param queue_size: Number of messages a client may lag behind
+        :param lag_policy: POLICY_DROP or POLICY_DISCONNECT
+        :param send_timeout: Time in seconds to send one message to a client
+        :param default_topics: Topics of the clients which never subscribed
+        :param history_size: Number of events kept for resuming clients
+        """
+        self._serializer = serializer
+        self._queue_size = queue_size
+        self._lag_policy = lag_policy
+        self._send_timeout = send_timeout
+        self._default_topics = default_topics
+        self._clients = {}
+        self._history = deque(maxlen=history_size)
+        self._seq = 0
+        self._epoch = uuid4().hex
+
+    def add(self, ws, remote=None) -> WebSocketClient:
+        """
+        Registers a prepared websocket and starts its sender task
+        :param ws: aiohttp WebSocketResponse
+        :param remote: Remote address of the client, for the metrics
+        :return: WebSocketClient
+        """
+        client = WebSocketClient(ws, remote,
+            [WebSocketSubscription(topic) for topic in self._default_topics])
+        client.sender = asyncio.ensure_future(self._send_loop(client))
+        self._clients[ws] = client
+        return client
+
+    def remove(self, ws):
+        """
+        Unregisters a websocket and stops its sender task
+        :param ws: aiohttp WebSocketResponse
+        """
+        client = self._clients.pop(ws, None)
+        if client is not None and client.sender is not None:
+            client.sender.cancel()
+
+    def publish(self, event: WebSocketEvent):
+        """
+        Sequences the event, keeps it for resuming clients and queues it for
+        every client subscribed to it. The message is serialized once per
+        format.
+        :param event: WebSocketEvent to be sent
+        """
+        self._seq += 1
+        event.seq = self._seq
+        self._history.append(event)
+        clients = [client for client in self._clients.values()
+                   if client.is_subscribed(event)]
+        data = None
+        envelope = None
+        for client in clients:
+            if client.sequenced:
+                if envelope is None:
+                    envelope = self._envelope(event)
+                self._enqueue(client, envelope)
+            else:
+                if data is None:
+                    data = self._serializer(event.msg)
+                self._enqueue(client, data)
+
+    def _envelope(self, event: WebSocketEvent) -> str:
+        return self._serializer({"seq": event.seq, "epoch": self._epoch,
+                                 "topic": event.topic, "data": event.msg})
+
+    def _resume(self, client: WebSocketClient, seq: int, epoch):
+        """
+        Queues the buffered events the client missed after seq
+        :return: True if no event was lost since seq
+        """
+        client.sequenced = True
+        oldest = self._history[0].seq if self._history else self._seq + 1
+        complete = epoch in (None, self._epoch) and oldest - 1 <= seq <= self._seq
+        if not complete:
+            seq = 0
+        client.put(self._serializer({
+            "action": self.ACTION_RESUME, "epoch": self._epoch,
+            "seq": self._seq, "complete": complete}), replayed=True)
+        for event in self._history:
+            if event.seq > seq and client.is_subscribed(event):
+                client.put(self._envelope(event), replayed=True)
+        return complete
+
+    def handle_message(self, ws, data: str):
+        """
+        Handles a subscription request received from a client
+        :param ws: aiohttp WebSocketResponse
+        :param data: Text message received
+        """
+        client = self._clients.get(ws)
+        if client is None:
+            return
+        try:
+            request = json.loads(data)
+            action = request.get("action")
+            if action == self.ACTION_RESUME:
+                self._resume(client, int(request.get("seq", 0)),
+                             request.get("epoch"))
+                return
+            topics = [WebSocketSubscription(**topic)
+                      for topic in request.get("topics", [])]
+        except (ValueError, TypeError, AttributeError) as e:
+            Log.debug(f"Invalid websocket message: {data}. {e}")
+            self._enqueue(client, self._serializer(
+                {"error": "Invalid subscription request"}))
+            return
+        if action == self.ACTION_SUBSCRIBE:
+            client.subscriptions.extend(topic for topic in topics
+                                        if topic not in client.subscriptions)
+        elif action == self.ACTION_UNSUBSCRIBE:
+            client.subscriptions = [subscription
+                                    for subscription in client.subscriptions
+                                    if topics and subscription not in topics]
+        else:
+            Log.debug(f"Unknown websocket action: {action}")
+            self._enqueue(client, self._serializer(
+                {"error": f"Unknown action: {action}"}))
+            return
+        self._enqueue(client, self._serializer({
+            "action": action,
+            "topics": [subscription.to_dict()
+                       for subscription in client.subscriptions]}))
+
+    def _enqueue(self, client: WebSocketClient, data: str):
+        if client.lag < self._queue_size:
+            client.put(data)
+            return
+        if self._lag_policy == self.POLICY_DROP:
+            client.drop_oldest()
+            client.put(data)
+            client.dropped += 1
+            Log.debug(f"Websocket client lags behind, dropped messages: "
+                      f"{client.dropped}")
+        else:
+            Log.warn(f"Websocket client lags behind by {client.lag} "
+                     f"messages, disconnecting")
+            self.remove(client.ws)
+            asyncio.ensure_future(self._close(client.ws))
+
+    async def _send_loop(self, client: WebSocketClient):
+        try:
+            while True:
+                data = await client.get()
+                await asyncio.wait_for(client.ws.send_str(data),
+                                       self._send_timeout)
+                client.sent += 1
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            Log.debug(f"Websocket send failed, disconnecting client: {e}")
+            self._clients.pop(client.ws, None)
+            await self._close(client.ws)
+
+    @staticmethod
+    async def _close(ws):
+        try:
+            await ws.close()
+        except Exception as e:
+            Log.debug(f"Websocket close failed: {e}")
+
+    def metrics(self) -> dict:
+        """
+        Returns the send queue depth and counters of every client
+        """
+        clients = [{"remote": client.remote,
+                    "queue_depth": client.depth,
+                    "sent": client.sent,
+                    "dropped": client.dropped}
+                   for client in self._clients.values()]
+        return {
+            "seq": self._seq,
+            "clients": len(clients),
+            "max_queue_depth": max((c["queue_depth"] for c in clients), default=0),
+            "queue_size": self._queue_size,
+            "client_queues": clients
+        }
+
+    async def close(self):
+        """
+        Stops all the sender tasks
+        """
+        for ws in list(self._clients):
+            self.remove(ws)
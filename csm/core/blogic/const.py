@@ -303,6 +303,12 @@ PERMISSION_ERROR_MSG = "Failed to cleanup {path} due to insufficient permissions
 
 # CSM Stats Related
 AGGREGATION_RULE = '{}/schema/stats_aggregation_rule.json'.format(CSM_PATH)
+STATS_PROVIDER_CONNECTIONS = 'STATS.PROVIDER.connections'
+STATS_PROVIDER_TIMEOUT = 'STATS.PROVIDER.timeout'
+STATS_PROVIDER_CONNECT_TIMEOUT = 'STATS.PROVIDER.connect_timeout'
+STATS_PROVIDER_RETRIES = 'STATS.PROVIDER.retries'
+STATS_PROVIDER_CACHE_SIZE = 'STATS.PROVIDER.cache_size'
+STATS_PANEL_CONCURRENCY = 'STATS.panel_concurrency'
 
 # CSM Roles Related
 ROLES_MANAGEMENT = '{}/schema/roles.json'.format(CSM_PATH)
@@ -317,6 +323,16 @@ S3_PORT = 'S3.s3_port'
 S3_MAX_RETRIES_NUM = 'S3.max_retries_num'
 S3_LDAP_LOGIN = 'S3.ldap_login'
 S3_LDAP_PASSWORD = 'S3.ldap_password'
+S3_CLIENT_POOL_SIZE = 'S3.client_pool_size'
+S3_CLIENT_TTL = 'S3.client_ttl'
+S3_CLIENT_WORKERS = 'S3.client_workers'
+S3_CLIENT_BACKEND = 'S3.client_backend'
+S3_CLIENT_BACKEND_BOTO = 'boto'
+S3_CLIENT_BACKEND_NATIVE = 'native'
+S3_CLIENT_CONNECTIONS = 'S3.client_connections'
+S3_DELETE_CONCURRENCY = 'S3.delete_concurrency'
+S3_DELETE_WAIT = 'S3.delete_wait'
+S3_DELETE_JOB_TTL = 'S3.delete_job_ttl'
 
 S3_IAM_CMD_CREATE_ACCESS_KEY = 'CreateAccessKey'
 S3_IAM_CMD_CREATE_ACCESS_KEY_RESP = 'CreateAccessKeyResponse'
@@ -348,6 +364,9 @@ UDS_DOMAIN_CERTIFICATE_FILENAME = 'domain.crt'
 
 # USL S3 configuration (CES2020 only!)
 USL_S3_CONF = '/etc/uds/uds_s3.toml'
+USL_TAG_CHECK_CONCURRENCY = 'UDS.tag_check_concurrency'
+USL_TAG_CACHE_TTL = 'UDS.tag_cache_ttl'
+USL_RESPONSE_CACHE_TTL = 'UDS.response_cache_ttl'
 # IAM User Related
 PASSWORD_SPECIAL_CHARACTER = ["!", "@", "#", "$", "%", "^", "&", "*", "(", ")",
                               "_", "+", "-", "=", "[", "]", "{", "}", "|", "'"]
@@ -452,6 +471,7 @@ LOGROTATE_DIR_DEST = "/etc/logrotate.d"
 
 # https status code
 STATUS_CREATED = 201
+STATUS_ACCEPTED = 202
 STATUS_CONFLICT = 409
 
 SOURCE_LOGROTATE_PATH = "{0}/conf{1}/csm/csm_agent_log.conf".format(CSM_PATH, LOGROTATE_DIR)
@@ -574,6 +594,16 @@ DATA_NW = "data_nw"
 ROAMING_IP = "roaming_ip"
 CONSUL_HOST_KEY = "databases.consul_db.config.host"
 HEALTH_SCHEMA_KEY = "HEALTH.health_schema"
+HEALTH_VERIFY_COUNTERS = "HEALTH.verify_counters"
+HEALTH_POLL_INTERVAL = "HEALTH.poll_interval"
+HEALTH_POLL_JITTER = "HEALTH.poll_jitter"
+HEALTH_REQUEST_TIMEOUT = "HEALTH.request_timeout"
+HEALTH_MAX_BACKOFF = "HEALTH.max_backoff"
+HEALTH_SNAPSHOT_PATH = "HEALTH.snapshot_path"
+HEALTH_SNAPSHOT_INTERVAL = "HEALTH.snapshot_interval"
+HEALTH_SNAPSHOT_VERSION = 1
+# Alerts updated this many seconds before a snapshot are replayed again
+HEALTH_SNAPSHOT_OVERLAP = 60
 MINION_NODE1_ID = "srvnode-1"
 MINION_NODE2_ID = "srvnode-2"
 SAS_RESOURCE_TYPE = "node:interface:sas"
@@ -598,6 +628,27 @@ EDGE_INSTALL_TYPE ={ "nodes": 1,
 #unsupported feature
 UNSUPPORTED_FEATURE_SCHEMA='{}/schema/unsupported_features.json'.format(CSM_PATH)
 FEATURE_ENDPOINT_MAPPING_SCHEMA = '{}/schema/feature_endpoint_mapping.json'.format(CSM_PATH)
+FEATURE_SUPPORT_TTL = "CSM_SERVICE.CSM_AGENT.feature_support_ttl"
+WS_QUEUE_SIZE = "CSM_SERVICE.CSM_AGENT.websocket.queue_size"
+WS_LAG_POLICY = "CSM_SERVICE.CSM_AGENT.websocket.lag_policy"
+WS_SEND_TIMEOUT = "CSM_SERVICE.CSM_AGENT.websocket.send_timeout"
+WS_HISTORY_SIZE = "CSM_SERVICE.CSM_AGENT.websocket.history_size"
+WS_METRICS_INTERVAL = "CSM_SERVICE.CSM_AGENT.websocket.metrics_interval"
+WS_TOPIC_ALERTS = "alerts"
+WS_TOPIC_HEALTH = "health"
+SESSION_BACKEND = "CSM_SERVICE.CSM_AGENT.session.backend"
+SESSION_PATH = "CSM_SERVICE.CSM_AGENT.session.path"
+SESSION_SWEEP_INTERVAL = "CSM_SERVICE.CSM_AGENT.session.sweep_interval"
+SESSION_DEFAULT_PATH = "/var/csm/sessions"
+USER_CACHE_TTL = "CSM_SERVICE.CSM_AGENT.user_cache_ttl"
+USER_CACHE_SIZE = 256
+LOGIN_PASSWD_WORKERS = "CSM_SERVICE.CSM_AGENT.login.passwd_workers"
+LOGIN_PASSWD_MAX_PENDING = "CSM_SERVICE.CSM_AGENT.login.passwd_max_pending"
+LOGIN_MAX_PER_USER = "CSM_SERVICE.CSM_AGENT.login.max_per_user"
+LOGIN_MAX_PER_REMOTE = "CSM_SERVICE.CSM_AGENT.login.max_per_remote"
+LOGIN_FAILURE_CACHE_TTL = "CSM_SERVICE.CSM_AGENT.login.failure_cache_ttl"
+LOGIN_TRUSTED_PROXIES = "CSM_SERVICE.CSM_AGENT.login.trusted_proxies"
+LOGIN_FAILURE_CACHE_SIZE = 1024
 L18N_SCHEMA = '{}/schema/l18n.json'.format(CSM_PATH)
 DEPENDENT_ON = "dependent_on"
 CSM_COMPONENT_NAME = "csm"
@@ -611,3 +662,8 @@ EMPTY_PASS_FIELD = "Password field can't be empty."
 HEALTH_REQUIRED_FIELDS = {'health', 'severity', 'alert_uuid', 'alert_type'}
 SHUTDOWN_CRON_TIME = "shutdown_cron_time"
 ES_RETRY = "ELASTICSEARCH.retry"
+ALERT_BATCH_SIZE = "ALERTS.batch_size"
+ALERT_BATCH_LINGER = "ALERTS.batch_linger"
+ALERT_CONSUMER = "ALERTS.consumer"
+ALERT_PREFETCH_COUNT = "ALERTS.prefetch_count"
+ASYNC_CONSUMER = "asyncio"
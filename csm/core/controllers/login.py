@@ -15,6 +15,8 @@
 
 import json
 from cortx.utils.log import Log
+from csm.common.conf import Conf
+from csm.core.blogic import const
 from csm.core.services.sessions import LoginService
 from csm.common.errors import InvalidRequest
 from .view import CsmView, CsmResponse, CsmAuth
@@ -25,6 +27,22 @@ from aiohttp import web
 @CsmAuth.public
 class LoginView(CsmView):
 
+    def _client_address(self):
+        """
+        Address the login attempts are throttled by. X-Forwarded-For is
+        honored only for requests coming from a trusted proxy, and then only
+        its last hop, the one added by the proxy, as the client can set the
+        others.
+        """
+        remote = self.request.remote
+        trusted_proxies = Conf.get(const.CSM_GLOBAL_INDEX,
+                                   const.LOGIN_TRUSTED_PROXIES,
+                                   ['127.0.0.1', '::1'])
+        forwarded = self.request.headers.get('X-Forwarded-For')
+        if forwarded and remote in trusted_proxies:
+            remote = forwarded.split(',')[-1].strip() or remote
+        return remote
+
     async def post(self):
         try:
             body = await self.request.json()
@@ -37,7 +55,8 @@ class LoginView(CsmView):
         if not username or not password:
             raise InvalidRequest(message_args="Username or password is missing")
 
-        session_id = await self.request.app.login_service.login(username, password)
+        session_id = await self.request.app.login_service.login(
+            username, password, remote=self._client_address())
         Log.debug(f"Obtained session id for {username}")
         if not session_id:
             raise web.HTTPUnauthorized()
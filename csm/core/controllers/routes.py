@@ -14,6 +14,7 @@
 # please email opensource@seagate.com or cortx-questions@seagate.com.
 
 # To add new route import from view file
+from aiohttp import hdrs
 from .view import CsmView
 from .stats import StatsView
 from .login import LoginView, LogoutView
@@ -47,3 +48,16 @@ class CsmRoutes():
         Add routes to Web application
         """
         app.add_routes(CsmView._app_routes)
+
+    @staticmethod
+    def add_auth_metadata(app):
+        """
+        Precompute the auth metadata of every registered route, so it is not
+        looked up on the handlers for every request.
+        Called once, after all the routes of the application are added.
+        """
+        for route in app.router.routes():
+            methods = hdrs.METH_ALL if route.method == hdrs.METH_ANY \
+                else (route.method,)
+            for method in methods:
+                CsmView.get_auth_metadata(route.handler, method)
@@ -18,10 +18,12 @@ from marshmallow import Schema, fields, validate
 from marshmallow.exceptions import ValidationError
 from csm.core.controllers.validators import BucketNameValidator
 from csm.common.permission_names import Resource, Action
-from csm.core.controllers.view import CsmView, CsmAuth
+from csm.core.controllers.view import CsmView, CsmAuth, CsmResponse
 from csm.core.controllers.s3.base import S3AuthenticatedView
 from cortx.utils.log import Log
+from csm.common.conf import Conf
 from csm.common.errors import InvalidRequest
+from csm.core.blogic import const
 from csm.core.providers.providers import Response
 
 
@@ -94,14 +96,45 @@ class S3BucketView(S3AuthenticatedView):
     @CsmAuth.permissions({Resource.S3BUCKETS: {Action.DELETE}})
     async def delete(self):
         """
-        DELETE REST implementation for s3 bucket delete request
+        DELETE REST implementation for s3 bucket delete request.
+        A deletion taking longer than S3.delete_wait seconds goes on in the
+        background, its progress is returned with the 202 status and can be
+        polled at /api/v1/s3/bucket/{bucket_name}/deletion.
         :return:
         """
         Log.debug(f"Handling s3 bucket delete request."
                   f" user_id: {self.request.session.credentials.user_id}")
         bucket_name = self.request.match_info["bucket_name"]
+        timeout = Conf.get(const.CSM_GLOBAL_INDEX, const.S3_DELETE_WAIT, 10)
         with self._guard_service():
-            return await self._service.delete_bucket(bucket_name, self._s3_session)
+            result = await self._service.delete_bucket(bucket_name, self._s3_session,
+                                                       timeout=float(timeout))
+        if "status" in result:
+            return CsmResponse(result, status=const.STATUS_ACCEPTED)
+        return result
+
+
+@CsmView._app_routes.view("/api/v1/s3/bucket/{bucket_name}/deletion")
+class S3BucketDeletionView(S3AuthenticatedView):
+    """
+    S3 Bucket Deletion View for GET REST API implementation:
+        1. Get the progress of the bucket deletion
+    """
+
+    def __init__(self, request):
+        super().__init__(request, 's3_bucket_service')
+
+    @CsmAuth.permissions({Resource.S3BUCKETS: {Action.DELETE}})
+    async def get(self):
+        """
+        GET REST implementation for s3 bucket deletion progress request
+        :return:
+        """
+        Log.debug(f"Handling s3 bucket deletion progress request."
+                  f" user_id: {self.request.session.credentials.user_id}")
+        bucket_name = self.request.match_info["bucket_name"]
+        with self._guard_service():
+            return await self._service.get_bucket_deletion(bucket_name, self._s3_session)
 
 
 @CsmView._app_routes.view("/api/v1/s3/bucket_policy/{bucket_name}")
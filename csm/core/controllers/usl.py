@@ -17,7 +17,8 @@ from aiohttp import web
 from ipaddress import ip_address
 from json import JSONDecodeError
 from marshmallow import Schema, ValidationError, fields, validates
-from typing import Any, Dict, List, Type
+from functools import partial
+from typing import Any, Awaitable, Callable, Dict, List, Type
 
 from csm.common.decorators import Decorators
 from csm.common.errors import CsmError, CsmPermissionDenied, CsmNotFoundError
@@ -82,6 +83,19 @@ class _SecuredView(_View):
         if not key_correct:
             raise web.HTTPUnauthorized()
 
+    async def _cached_response(self, key: str, compute: Callable[[], Awaitable]) -> web.Response:
+        """
+        Responds with the cached response of the endpoint and its ETag.
+        A client polling with the ETag of the current response in If-None-Match
+        gets 304 Not Modified without the body.
+        """
+        response = await self._service.get_cached_response(key, compute)
+        headers = {'ETag': response.etag}
+        if response.matches(self.request.headers.get('If-None-Match')):
+            return web.Response(status=304, headers=headers)
+        return web.Response(body=response.body, content_type=response.content_type,
+                            headers=headers)
+
 
 @Decorators.decorate_if(not Options.debug, _Proxy.on_loopback_only)
 @CsmView._app_routes.view("/usl/v1/registerDevice")
@@ -141,8 +155,9 @@ class DeviceView(_SecuredView):
     """
     Devices list view.
     """
-    async def get(self) -> List[Dict[str, str]]:
-        return await self._service.get_device_list()
+    async def get(self) -> web.Response:
+        return await self._cached_response(self._service.CACHE_DEVICES,
+                                           self._service.get_device_list)
 
 
 @Decorators.decorate_if(not Options.debug, _Proxy.on_loopback_only)
@@ -264,8 +279,9 @@ class SystemView(_SecuredView):
     """
     System information view.
     """
-    async def get(self) -> Dict[str, str]:
-        return await self._service.get_system()
+    async def get(self) -> web.Response:
+        return await self._cached_response(self._service.CACHE_SYSTEM,
+                                           self._service.get_system)
 
 
 @Decorators.decorate_if(not Options.debug, _Proxy.on_loopback_only)
@@ -324,8 +340,9 @@ class SystemCertificatesByTypeView(_SecuredView):
 
         try:
             params = MethodSchema().load(self.request.match_info)
-            certificate = await self._service.get_system_certificates_by_type(params['type'])
-            return web.Response(body=certificate)
+            return await self._cached_response(
+                self._service.CACHE_CERTIFICATES + params['type'],
+                partial(self._service.get_system_certificates_by_type, params['type']))
         except ValidationError as e:
             desc = 'Malformed path'
             Log.error(f'{desc}: {e}')
@@ -341,5 +358,6 @@ class NetworkInterfacesView(_SecuredView):
     """
     Network interfaces list view.
     """
-    async def get(self) -> List[Dict[str, Any]]:
-        return await self._service.get_network_interfaces()
+    async def get(self) -> web.Response:
+        return await self._cached_response(self._service.CACHE_NETWORK_INTERFACES,
+                                           self._service.get_network_interfaces)
@@ -31,6 +31,7 @@ class CsmAuth:
     UNAUTH = {'WWW-Authenticate': TYPE}
     ATTR_PUBLIC = '_csm_auth_public_'
     ATTR_PERMISSIONS = '_csm_auth_permissions_'
+    REQUEST_METADATA = 'csm_auth_metadata'
 
     @classmethod
     def public(cls, handler):
@@ -89,6 +90,9 @@ class CsmView(web.View):
     # common routes to used by subclass
     _app_routes = web.RouteTableDef()
 
+    # (handler, method) -> (is_public, permissions)
+    _auth_metadata = {}
+
     def __init__(self, request):
         super(CsmView, self).__init__(request)
 
@@ -132,6 +136,21 @@ class CsmView(web.View):
             permissions = view_permissions
         return permissions
 
+    @classmethod
+    def get_auth_metadata(cls, handler, method, cache=True):
+        ''' Obtain the public flag and the required permissions of
+            a particular method of the handler. They are computed once per
+            handler and method, as the handlers do not change at runtime '''
+
+        key = (handler, method.upper())
+        metadata = cls._auth_metadata.get(key)
+        if metadata is None:
+            metadata = (cls.is_public(handler, method),
+                        cls.get_permissions(handler, method))
+            if cache:
+                cls._auth_metadata[key] = metadata
+        return metadata
+
     @classmethod
     def asyncio_shield(cls, func):
         def wrapper(*arg, **kw):
@@ -61,20 +61,21 @@ class User(CsmModel):
     created_time = DateTimeType()
 
     def update(self, new_values: dict):
-        if 'password' in new_values:
-            self.password_hash = Passwd.hash(new_values['password'])
-            new_values.pop('password')
+        """
+        Sets the new values. Passwords are hashed by the caller, off the
+        event loop, and passed as password_hash.
+        """
         for key in new_values:
             setattr(self, key, new_values[key])
 
         self.updated_time = datetime.now(timezone.utc)
 
     @staticmethod
-    def instantiate_csm_user(user_id, password, email="", roles=[], alert_notification=True):
+    def instantiate_csm_user(user_id, password_hash, email="", roles=[], alert_notification=True):
         user = User()
         user.user_id = user_id
         user.user_type = UserType.CsmUser.value
-        user.password_hash = Passwd.hash(password)
+        user.password_hash = password_hash
         user.roles = roles
         user.email = email
         user.alert_notification = alert_notification
@@ -50,12 +50,92 @@ ALERTS_MSG_TOO_LONG_COMMENT = "alerts_too_long_comment"
 ALERTS_MSG_RESOLVED_AND_ACKED_ERROR = "alerts_resolved_and_acked"
 ALERTS_MSG_NON_SORTABLE_COLUMN = "alerts_non_sortable_column"
 
+class OpenAlertsIndex:
+    """
+    In-memory index of the open alerts, i.e. alerts which are not both
+    resolved and acknowledged, keyed by (sensor_info, module_type).
+    It is warmed from the DB once and then kept in sync by AlertRepository
+    so that the previous alert of a resource can be found without a DB read.
+    The index is only accessed from the event loop.
+    """
+
+    def __init__(self):
+        self._alerts = {}
+        self.ready = False
+
+    @staticmethod
+    def key(sensor_info, module_type):
+        return (str(sensor_info), str(module_type))
+
+    @staticmethod
+    def is_open(alert: AlertModel) -> bool:
+        return not (alert.acknowledged and alert.resolved)
+
+    def load(self, alerts: Iterable[AlertModel]):
+        """
+        Replaces the index content with the passed open alerts.
+        """
+        self._alerts = {}
+        for alert in alerts:
+            self.put(alert)
+        self.ready = True
+
+    def put(self, alert: AlertModel):
+        """
+        Adds the alert to the index or drops it if the alert is closed.
+        """
+        key = self.key(alert.sensor_info, alert.module_type)
+        if self.is_open(alert):
+            self._alerts[key] = AlertModel(alert.to_native())
+        else:
+            self._alerts.pop(key, None)
+
+    def update(self, sensor_info, module_type, update_params: dict):
+        """
+        Applies the partial update to the indexed alert of the resource.
+        """
+        key = self.key(sensor_info, module_type)
+        alert = self._alerts.get(key)
+        if not alert:
+            return
+        for field, value in update_params.items():
+            if field in (const.ALERT_CREATED_TIME, const.ALERT_UPDATED_TIME) \
+                    and isinstance(value, int):
+                value = datetime.utcfromtimestamp(value).replace(tzinfo=timezone.utc)
+            alert[field] = value
+        if not self.is_open(alert):
+            self._alerts.pop(key, None)
+
+    def get(self, sensor_info, module_type) -> Optional[AlertModel]:
+        """
+        Returns a copy of the open alert of the resource, so callers may
+        modify it before it is stored.
+        """
+        alert = self._alerts.get(self.key(sensor_info, module_type))
+        return AlertModel(alert.to_native()) if alert else None
+
+    def __len__(self):
+        return len(self._alerts)
+
+
 class AlertRepository(IAlertStorage):
     def __init__(self, storage: DataBaseProvider):
         self.db = storage
+        self.open_alerts = OpenAlertsIndex()
+
+    async def warm_open_alerts_index(self):
+        """
+        Loads the open alerts from the DB into the in-memory index.
+        Until the index is warmed the previous alerts are read from the DB.
+        """
+        query = Query().filter_by(Or(Compare(AlertModel.acknowledged, '=', False),
+                                     Compare(AlertModel.resolved, '=', False)))
+        self.open_alerts.load(await self.db(AlertModel).get(query))
+        Log.info(f"Open alerts index is loaded with {len(self.open_alerts)} alerts")
 
     async def store(self, alert: AlertModel):
         await self.db(AlertModel).store(alert)
+        self.open_alerts.put(alert)
 
     async def store_alerts_history(self, alert: AlertsHistoryModel):
         await self.db(AlertsHistoryModel).store(alert)
@@ -69,6 +149,8 @@ class AlertRepository(IAlertStorage):
         return next(iter(await self.db(AlertsHistoryModel).get(query)), None)
 
     async def retrieve_by_sensor_info(self, sensor_info, module_type) -> AlertModel:
+        if self.open_alerts.ready:
+            return self.open_alerts.get(sensor_info, module_type)
         filter = And(And(Compare(AlertModel.sensor_info, '=', \
                 str(sensor_info)), Compare(AlertModel.module_type, "=", \
                 str(module_type))), Or(Compare(AlertModel.acknowledged, '=', \
@@ -76,8 +158,46 @@ class AlertRepository(IAlertStorage):
         query = Query().filter_by(filter)
         return next(iter(await self.db(AlertModel).get(query)), None)
 
+    async def retrieve_by_sensor_infos(self, sensor_keys) -> Iterable[AlertModel]:
+        """
+        Retrieves the unresolved alerts for several resources with one query.
+        :param sensor_keys: Iterable of (sensor_info, module_type) tuples
+        :return: List of AlertModel objects
+        """
+        if self.open_alerts.ready:
+            alerts = (self.open_alerts.get(sensor_info, module_type)
+                      for sensor_info, module_type in sensor_keys)
+            return [alert for alert in alerts if alert]
+        resources = [And(Compare(AlertModel.sensor_info, '=', str(sensor_info)),
+                         Compare(AlertModel.module_type, '=', str(module_type)))
+                     for sensor_info, module_type in sensor_keys]
+        if not resources:
+            return []
+        filter = And(Or(*resources), Or(Compare(AlertModel.acknowledged, '=', False),
+                                        Compare(AlertModel.resolved, '=', False)))
+        query = Query().filter_by(filter)
+        return await self.db(AlertModel).get(query)
+
+    async def store_bulk(self, alerts: Iterable[AlertModel]):
+        """
+        Stores several alerts at once.
+        The generic DB layer has no bulk API, so the writes are issued
+        concurrently instead of one round trip after another.
+        """
+        await asyncio.gather(*(self.db(AlertModel).store(alert) for alert in alerts))
+        for alert in alerts:
+            self.open_alerts.put(alert)
+
+    async def store_alerts_history_bulk(self, alerts: Iterable[AlertsHistoryModel]):
+        """
+        Stores several alert history records at once.
+        """
+        await asyncio.gather(*(self.db(AlertsHistoryModel).store(alert)
+                               for alert in alerts))
+
     async def update(self, alert: AlertModel):
         await self.db(AlertModel).store(alert)
+        self.open_alerts.put(alert)
 
     async def update_by_sensor_info(self, sensor_info, module_type, update_params):
         filter = And(And(Compare(AlertModel.sensor_info, '=', \
@@ -85,6 +205,7 @@ class AlertRepository(IAlertStorage):
                 str(module_type))), Or(Compare(AlertModel.acknowledged, '=', \
                 False), Compare(AlertModel.resolved, '=', False)))
         await self.db(AlertModel).update(filter, update_params)
+        self.open_alerts.update(sensor_info, module_type, update_params)
 
     def _prepare_time_range(self, field, time_range: DateTimeRange):
         db_conditions = []
@@ -154,6 +275,16 @@ class AlertRepository(IAlertStorage):
         Log.debug(f"Alerts service Retrive by range: {query_filter}")
         return await self.db(AlertModel).get(query)
 
+    async def retrieve_updated_since(self, updated_time: datetime) -> Iterable[AlertModel]:
+        """
+        Retrieves the alerts updated at or after the provided time, oldest first
+        :param updated_time: datetime
+        :return: list of AlertModel
+        """
+        query = Query().filter_by(Compare(AlertModel.updated_time, '>=', updated_time))\
+            .order_by(AlertModel.updated_time, SortOrder.ASC)
+        return await self.db(AlertModel).get(query)
+
     async def count_by_range(self, create_time_range: DateTimeRange, show_all: bool = True,
             severity: str = None, resolved: bool = None,
             acknowledged: bool = None, show_active: bool = False) -> int:
@@ -558,6 +689,8 @@ class AlertMonitorService(Service, Observable):
     Alert Monitor takes action on the received alerts using a callback.
     Actions include (1) storing on the DB and (2) sending to subscribers, i.e.
     web server.
+    With ALERTS.consumer set to asyncio, the alerts are consumed by
+    AsyncAmqpComm inside the event loop instead of a dedicated thread.
     """
 
     def __init__(self, repo: AlertRepository, plugin, health_plugin, \
@@ -574,8 +707,27 @@ class AlertMonitorService(Service, Observable):
         self._health_plugin = health_plugin
         self._http_notfications = http_notifications
         self._es_retry = Conf.get(const.CSM_GLOBAL_INDEX, const.ES_RETRY, 5)
+        self._is_async = Conf.get(const.CSM_GLOBAL_INDEX, const.ALERT_CONSUMER, \
+                "thread") == const.ASYNC_CONSUMER
+        self._monitor_task = None
         super().__init__()
 
+    async def _monitor_async(self):
+        """
+        Counterpart of _monitor for the asyncio consumer. It runs as a task
+        in the event loop and returns once the consumer is registered.
+        """
+        for count in range(0, self._es_retry):
+            try:
+                await self.repo.warm_open_alerts_index()
+                break
+            except Exception as ex:
+                Log.warn(f"Unable to load open alerts index. Retrying : {count+1}.{ex}")
+                await asyncio.sleep(2**count)
+        await self._alert_plugin.init_async(callback_fn=self._consume_async, \
+                health_plugin=self._health_plugin)
+        await self._alert_plugin.listen_async()
+
     def _monitor(self):
         """
         This method acts as a thread function.
@@ -583,14 +735,24 @@ class AlertMonitorService(Service, Observable):
         This method passes consume_alert as a callback function to alert plugin.
         """
         self._thread_running = True
+        self._warm_open_alerts_index()
         self._alert_plugin.init(callback_fn=self._consume, \
-                health_plugin=self._health_plugin)
+                health_plugin=self._health_plugin, \
+                batch_callback_fn=self._consume_batch)
         self._alert_plugin.process_request(cmd='listen')
 
     def start(self):
         """
         This method creats and starts an alert monitor thread
         """
+        if self._is_async:
+            """
+            The task starts once the event loop of the REST API runs.
+            """
+            Log.info("Starting Alert monitor in the event loop")
+            if not self._monitor_task:
+                self._monitor_task = self._loop.create_task(self._monitor_async())
+            return
         Log.info("Starting Alert monitor thread")
         try:
             if not self._thread_running and not self._thread_started:
@@ -601,7 +763,21 @@ class AlertMonitorService(Service, Observable):
         except Exception as e:
             Log.warn(f"Error in starting alert monitor thread: {e}")
 
+    async def shutdown(self, app=None):
+        """
+        Stops the asyncio consumer. It is registered as a shutdown handler of
+        the REST API, as the event loop is closed by the time stop is called.
+        """
+        if self._is_async and self._monitor_task:
+            Log.info("Stopping Alert monitor in the event loop")
+            if not self._monitor_task.done():
+                self._monitor_task.cancel()
+            await self._alert_plugin.stop_async()
+            self._monitor_task = None
+
     def stop(self):
+        if self._is_async:
+            return
         try:
             Log.info("Stopping Alert monitor thread")
             self._alert_plugin.stop()
@@ -611,6 +787,20 @@ class AlertMonitorService(Service, Observable):
         except Exception as e:
             Log.warn(f"Error in stopping alert monitor thread: {e}")
 
+    def _warm_open_alerts_index(self):
+        """
+        Loads the open alerts index before consuming the alerts, so that
+        the previous alerts are looked up in memory. If the DB is not
+        reachable the previous alerts keep being read from the DB.
+        """
+        for count in range(0, self._es_retry):
+            try:
+                self._run_coroutine(self.repo.warm_open_alerts_index())
+                return
+            except Exception as ex:
+                Log.warn(f"Unable to load open alerts index. Retrying : {count+1}.{ex}")
+                time.sleep(2**count)
+
     def _get_previous_alert(self, sensor_info, module_type):
         """
         This method fetches the prev alert. Before saving the alert into
@@ -665,21 +855,9 @@ class AlertMonitorService(Service, Observable):
         """ After saving/ updating alert, update the in memory health schema """
         try:
             Log.debug(f"Incoming alert: {message}")
-            for key in [const.ALERT_CREATED_TIME, const.ALERT_UPDATED_TIME]:
-                message[key] = datetime.utcfromtimestamp(message[key])\
-                        .replace(tzinfo=timezone.utc)
+            self._prepare_alert(message)
             sensor_info = message.get(const.ALERT_SENSOR_INFO, "")
             module_type = message.get(const.ALERT_MODULE_TYPE, "")
-            is_node_alert = self._is_node_alert(message[const.ALERT_MODULE_NAME])
-            is_high_risk_severity = self._is_high_risk_severity(\
-                message[const.ALERT_SEVERITY])
-            """
-            Checking for node hw alert.
-            If the alert is node hw alert and severity is in the category of
-            high risk, then we will prepend the description field with support message.
-            """
-            if is_node_alert and is_high_risk_severity:
-                self._add_support_message(message)
             prev_alert = self._get_previous_alert(sensor_info, module_type)
             alert = AlertModel(message)
             if not prev_alert:
@@ -713,7 +891,202 @@ class AlertMonitorService(Service, Observable):
 
         return True
 
-    def _resolve_alert(self, new_alert, prev_alert):
+    def _prepare_alert(self, message):
+        """
+        Converts the alert timestamps and adds the support message for
+        high risk node hw alerts.
+        :param message: Alert dict received from the alert plugin
+        :return: None
+        """
+        for key in [const.ALERT_CREATED_TIME, const.ALERT_UPDATED_TIME]:
+            message[key] = datetime.utcfromtimestamp(message[key])\
+                    .replace(tzinfo=timezone.utc)
+        is_node_alert = self._is_node_alert(message[const.ALERT_MODULE_NAME])
+        is_high_risk_severity = self._is_high_risk_severity(\
+            message[const.ALERT_SEVERITY])
+        """
+        Checking for node hw alert.
+        If the alert is node hw alert and severity is in the category of
+        high risk, then we will prepend the description field with support message.
+        """
+        if is_node_alert and is_high_risk_severity:
+            self._add_support_message(message)
+
+    def _get_previous_alerts(self, sensor_keys):
+        """
+        Batch counterpart of _get_previous_alert. Fetches the previous alerts
+        for all the resources of a batch with a single query.
+        Unlike _get_previous_alert the error is raised once the retries are
+        exhausted, so the whole batch is re-delivered instead of storing
+        alerts that may have a previous state.
+        :param sensor_keys: Iterable of (sensor_info, module_type) tuples
+        :return: Dict of (sensor_info, module_type) to AlertModel
+        """
+        for count in range(0, self._es_retry):
+            try:
+                prev_alerts = self._run_coroutine(\
+                    self.repo.retrieve_by_sensor_infos(sensor_keys))
+                return {(alert.sensor_info, alert.module_type): alert
+                        for alert in prev_alerts}
+            except Exception as ex:
+                Log.warn(f"Unable to fetch previous alerts. Retrying : {count+1}.{ex}")
+                if count + 1 == self._es_retry:
+                    raise
+                time.sleep(2**count)
+        return {}
+
+    def _store_batch(self, alerts, alerts_history):
+        """
+        Stores the alerts and the alert history records of a batch, retrying
+        the same way as _get_previous_alert does.
+        :param alerts: List of AlertModel objects
+        :param alerts_history: List of AlertsHistoryModel objects
+        :return: None
+        """
+        for count in range(0, self._es_retry):
+            try:
+                self._run_coroutine(self.repo.store_bulk(alerts))
+                self._run_coroutine(self.repo.store_alerts_history_bulk(alerts_history))
+                return
+            except Exception as ex:
+                Log.warn(f"Unable to store alerts batch. Retrying : {count+1}.{ex}")
+                if count + 1 == self._es_retry:
+                    raise
+                time.sleep(2**count)
+
+    def _consume_batch(self, messages):
+        """
+        Batch counterpart of _consume. It is called by the alert plugin
+        with a list of alerts when batching is enabled.
+            1. Fetch the previous alerts of all the resources in one query.
+            2. Resolve and dedupe the alerts in memory, the same way _consume
+               does, so only the final state of every alert is written.
+            3. Store the alerts and the history records with bulk writes.
+            4. Update the health map and publish the alerts.
+            5. Return a boolean value to signal whether the plugin should
+               acknowledge the batch to the RabbitMQ.
+        """
+        try:
+            Log.debug(f"Incoming alerts batch of {len(messages)} alerts")
+            for message in messages:
+                self._prepare_alert(message)
+            sensor_keys = {(message.get(const.ALERT_SENSOR_INFO, ""),
+                            message.get(const.ALERT_MODULE_TYPE, ""))
+                           for message in messages}
+            prev_alerts = self._get_previous_alerts(sensor_keys)
+            """
+            Alerts which are to be written, keyed by resource. They also act
+            as the previous alert for the later alerts of the same resource.
+            """
+            batch = {}
+            published = []
+            alerts_history = []
+            for message in messages:
+                key = (message.get(const.ALERT_SENSOR_INFO, ""),
+                       message.get(const.ALERT_MODULE_TYPE, ""))
+                prev_alert = batch.get(key) or prev_alerts.get(key)
+                alert = AlertModel(message)
+                publish_http = None
+                if not prev_alert:
+                    batch[key] = alert
+                    publish_http = True
+                elif self._resolve_alert(message, prev_alert, batch):
+                    alert.alert_uuid = prev_alert.alert_uuid
+                    publish_http = False
+                published.append((alert, publish_http))
+                alerts_history.append(AlertsHistoryModel(message))
+            self._store_batch(list(batch.values()), alerts_history)
+            Log.debug(f"Alerts batch stored successfully. Alerts: {len(batch)}, "
+                      f"History: {len(alerts_history)}")
+        except Exception as e:
+            Log.warn(f"Error in consuming alerts batch: {e}")
+            return False
+
+        for alert, publish_http in published:
+            try:
+                self._update_publish_state(alert, publish_http)
+                self._notify_listeners(alert, loop=self._loop)
+            except Exception as e:
+                Log.warn(f"Error in publishing alert {alert.alert_uuid}: {e}")
+        return True
+
+    def _update_publish_state(self, alert, publish_http):
+        """
+        Same as in _consume, only the new alerts are pushed over http
+        notifications and the health map is updated with new and updated
+        alerts.
+        :param alert: AlertModel object to be published
+        :param publish_http: True for new, False for updated and None for
+        duplicate alerts.
+        """
+        if publish_http is None:
+            return
+        if publish_http:
+            self.add_listener(self._http_notfications.handle_alert)
+        else:
+            self.remove_listener(self._http_notfications.handle_alert)
+        self._health_plugin.update_health_map_with_alert(alert.to_primitive())
+
+    async def _es_retry_async(self, coro_fn, *args):
+        """
+        Awaits the DB operation retrying it the same way _get_previous_alert
+        does, without blocking the event loop. The error is raised once the
+        retries are exhausted.
+        """
+        for count in range(0, self._es_retry):
+            try:
+                return await coro_fn(*args)
+            except Exception as ex:
+                Log.warn(f"DB operation failed. Retrying : {count+1}.{ex}")
+                if count + 1 == self._es_retry:
+                    raise
+                await asyncio.sleep(2**count)
+
+    async def _consume_async(self, message):
+        """
+        Counterpart of _consume for the asyncio consumer. The alerts of
+        different resources are processed concurrently while the alerts of
+        the same resource are passed one after another.
+        The alert is resolved in memory the same way _consume_batch does it
+        and stored without blocking the event loop.
+        """
+        try:
+            Log.debug(f"Incoming alert: {message}")
+            self._prepare_alert(message)
+            sensor_info = message.get(const.ALERT_SENSOR_INFO, "")
+            module_type = message.get(const.ALERT_MODULE_TYPE, "")
+            prev_alert = await self._es_retry_async(\
+                self.repo.retrieve_by_sensor_info, sensor_info, module_type)
+            alert = AlertModel(message)
+            batch = {}
+            publish_http = None
+            if not prev_alert:
+                batch[(sensor_info, module_type)] = alert
+                publish_http = True
+            elif self._resolve_alert(message, prev_alert, batch):
+                alert.alert_uuid = prev_alert.alert_uuid
+                publish_http = False
+            if batch:
+                await self._es_retry_async(self.repo.store_bulk, list(batch.values()))
+            await self._es_retry_async(self.repo.store_alerts_history, \
+                AlertsHistoryModel(message))
+            Log.debug(f"Alert stored successfully. Alert ID : {alert.alert_uuid}")
+        except Exception as e:
+            Log.warn(f"Error in consuming alert: {e}")
+            return False
+
+        try:
+            """
+            The listeners are taken before awaiting, so that concurrent alerts
+            do not change them for this one.
+            """
+            self._update_publish_state(alert, publish_http)
+            await self._async_notify_listeners(alert, observers=set(self._observers))
+        except Exception as e:
+            Log.warn(f"Error in publishing alert {alert.alert_uuid}: {e}")
+        return True
+
+    def _resolve_alert(self, new_alert, prev_alert, batch=None):
         alert_updated = False
         if not self._is_duplicate_alert(new_alert, prev_alert):
             if self._is_good_alert(new_alert):
@@ -722,10 +1095,10 @@ class AlertMonitorService(Service, Observable):
                 """
                 if self._is_good_alert(prev_alert):
                     """ Previous alert is a good one so updating. """
-                    self._update_alert(new_alert, prev_alert)
+                    self._update_alert(new_alert, prev_alert, batch=batch)
                 else:
                     """ Previous alert is a bad one so resolving it. """
-                    self._resolve(new_alert, prev_alert)
+                    self._resolve(new_alert, prev_alert, batch)
                 alert_updated = True
             if self._is_bad_alert(new_alert):
                 """
@@ -733,16 +1106,16 @@ class AlertMonitorService(Service, Observable):
                 """
                 if self._is_bad_alert(prev_alert):
                     """ Previous alert is a bad one so updating. """
-                    self._update_alert(new_alert, prev_alert)
+                    self._update_alert(new_alert, prev_alert, batch=batch)
                 else:
                     """
                     Previous alert is a good one so updating and marking the
                     resolved status to False.
                     """
-                    self._update_alert(new_alert, prev_alert, True)
+                    self._update_alert(new_alert, prev_alert, True, batch)
                 alert_updated = True
         else:
-            self._update_duplicate_alert(new_alert, prev_alert)
+            self._update_duplicate_alert(new_alert, prev_alert, batch)
         return alert_updated
 
     def _is_duplicate_alert(self, new_alert, prev_alert):
@@ -757,13 +1130,15 @@ class AlertMonitorService(Service, Observable):
             ret = True
         return ret
 
-    def _update_alert(self, alert, prev_alert, update_resolve=False):
+    def _update_alert(self, alert, prev_alert, update_resolve=False, batch=None):
         """
         Update the alerts to storage.
         :param alert : Alert object
         :param prev_alert : Previous Alert object
         :param update_resolve : If set to True, we will mark resolved state to
         False
+        :param batch : Pending alerts of a batch. If passed, prev_alert is
+        updated in memory and stored with the batch.
         :return: None
         """
         update_params = {}
@@ -791,6 +1166,13 @@ class AlertMonitorService(Service, Observable):
                 alert.get(const.ALERT_CREATED_TIME, "")
             update_params[const.DESCRIPTION] = alert.get(const.DESCRIPTION, "")
         self._update_params_cleanup(update_params)
+        if batch is not None:
+            update_params[const.ALERT_UPDATED_TIME] = datetime.utcfromtimestamp(\
+                update_params[const.ALERT_UPDATED_TIME]).replace(tzinfo=timezone.utc)
+            for key, value in update_params.items():
+                prev_alert[key] = value
+            batch[(prev_alert.sensor_info, prev_alert.module_type)] = prev_alert
+            return
         self._run_coroutine(self.repo.update_by_sensor_info\
                 (prev_alert.sensor_info, prev_alert.module_type, update_params))
 
@@ -821,7 +1203,7 @@ class AlertMonitorService(Service, Observable):
             ret = True
         return ret
 
-    def _resolve(self, alert, prev_alert):
+    def _resolve(self, alert, prev_alert, batch=None):
         """
         Get the previous alert with the same alert_uuid.
         :param alert: Alert Object.
@@ -833,9 +1215,9 @@ class AlertMonitorService(Service, Observable):
             the current alert is good.
             """
             prev_alert.resolved = True
-            self._update_alert(alert, prev_alert)
+            self._update_alert(alert, prev_alert, batch=batch)
 
-    def _update_duplicate_alert(self, new_alert, prev_alert):
+    def _update_duplicate_alert(self, new_alert, prev_alert, batch=None):
         """
         If we found that the incoming alert is duplicate, then we will
         replace the old alert stroed in ES db with the new one.
@@ -850,6 +1232,9 @@ class AlertMonitorService(Service, Observable):
             alert.acknowledged = prev_alert.acknowledged
             alert.comments = prev_alert.comments
             alert.updated_time = int(time.time())
+            if batch is not None:
+                batch[(prev_alert.sensor_info, prev_alert.module_type)] = alert
+                return
             self._run_coroutine(self.repo.update(alert))
         except Exception as ex:
             Log.error(f"Updation of duplicate alert failed. Alert: {new_alert}")
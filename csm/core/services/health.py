@@ -13,6 +13,10 @@
 # For any questions about this software or licensing,
 # please email opensource@seagate.com or cortx-questions@seagate.com.
 
+import json
+import os
+import time
+from datetime import datetime, timezone
 from csm.core.blogic import const
 from typing import Optional, Iterable, Dict
 from csm.common.services import Service, ApplicationService
@@ -21,14 +25,216 @@ from csm.core.blogic.models.alerts import AlertModel
 from csm.common.conf import Conf
 from cortx.utils.log import Log
 from csm.common.observer import Observable
+from csm.common.periodic import Periodic
 from threading import Event, Thread
 from csm.core.services.alerts import AlertRepository
 import asyncio
 from csm.common.errors import CsmError
 
+class HealthCounters:
+    """
+    Health counters of a subtree of the health map: number of non-empty
+    leaves, count of leaves per "<health>-<severity>" status and the alert
+    uuids seen per status.
+    """
+
+    def __init__(self):
+        self.total = 0
+        self._health = {}
+        self._alerts = {}
+
+    @staticmethod
+    def contribution(leaf):
+        """
+        Returns what a leaf adds to the counters of its ancestors
+        :param leaf: Leaf dict of the health map
+        :return: (health status, counted, alert uuid)
+        """
+        health = (leaf.get(const.ALERT_HEALTH) or "").lower()
+        severity = (leaf.get(const.ALERT_SEVERITY) or "").lower()
+        return (f'{health}-{severity}', bool(leaf.get(const.ALERT_HEALTH)),
+                leaf.get(const.ALERT_UUID) or None)
+
+    def add(self, contribution, count=1):
+        status, counted, alert_uuid = contribution
+        self.total += count
+        if counted:
+            self._health[status] = self._health.get(status, 0) + count
+            if not self._health[status]:
+                del self._health[status]
+        if alert_uuid:
+            alert_uuids = self._alerts.setdefault(status, {})
+            alert_uuids[alert_uuid] = alert_uuids.get(alert_uuid, 0) + count
+            if not alert_uuids[alert_uuid]:
+                del alert_uuids[alert_uuid]
+            if not alert_uuids:
+                del self._alerts[status]
+
+    def remove(self, contribution):
+        self.add(contribution, -1)
+
+    def health_count_map(self):
+        return dict(self._health)
+
+    def alert_uuid_map(self):
+        return {status: list(alert_uuids)
+                for status, alert_uuids in self._alerts.items()}
+
+class HealthMapIndex:
+    """
+    Flat index over the in-memory health map.
+    Every key of a non-leaf node is recorded together with the dict holding it
+    and the path of that dict, in the same depth-first order in which the
+    recursive search visits them. A lookup scoped to a subtree therefore only
+    looks at the few places where the key occurs instead of walking the map.
+    Leaf dicts are updated in place, so the index stays valid across health
+    updates and only has to be rebuilt when the structure of the map changes.
+    Each indexed node also keeps the HealthCounters of its subtree, which are
+    adjusted along the path of a leaf whenever the leaf is refreshed.
+    """
+
+    def __init__(self, health_map: Optional[dict] = None):
+        self._map = None
+        self._nodes = {}
+        self._entries = {}
+        self._counters = {}
+        self._leaves = {}
+        if health_map is not None:
+            self.build(health_map)
+
+    @staticmethod
+    def has_child_dict(obj):
+        """
+        Check if the obj has child dicts
+        :param obj:
+        :return:
+        """
+        return any(isinstance(value, dict) for value in obj.values())
+
+    def build(self, health_map: dict):
+        """
+        (Re)builds the index for the provided health map
+        :param health_map: Health map dict
+        :return: None
+        """
+        self._map = health_map
+        self._nodes = {}
+        self._entries = {}
+        self._counters = {}
+        self._leaves = {}
+        self._index_node(health_map, (), [])
+
+    def _index_node(self, node, path, ancestors):
+        self._nodes[id(node)] = (node, path)
+        counters = HealthCounters()
+        self._counters[id(node)] = counters
+        ancestors = ancestors + [counters]
+        for key, value in node.items():
+            self._entries.setdefault(key, []).append((node, path))
+            if isinstance(value, dict):
+                if self.has_child_dict(value):
+                    self._index_node(value, path + (key,), ancestors)
+                elif value:
+                    self._add_leaf(value, ancestors)
+
+    def _add_leaf(self, leaf, ancestors):
+        contribution = HealthCounters.contribution(leaf)
+        for counters in ancestors:
+            counters.add(contribution)
+        self._leaves.setdefault(id(leaf), []).append(
+            [leaf, ancestors, contribution])
+
+    def refresh(self, leaf: dict):
+        """
+        Updates the counters of all the subtrees holding the leaf after its
+        health was changed in place.
+        :param leaf: Leaf dict of the health map
+        :return: True if the leaf is indexed, False otherwise
+        """
+        entries = [entry for entry in self._leaves.get(id(leaf), [])
+                   if entry[0] is leaf]
+        contribution = HealthCounters.contribution(leaf)
+        for entry in entries:
+            _, ancestors, previous = entry
+            if previous != contribution:
+                for counters in ancestors:
+                    counters.remove(previous)
+                    counters.add(contribution)
+                entry[2] = contribution
+        return bool(entries)
+
+    def counters(self, node=None):
+        """
+        Returns the counters of an indexed node, None if it is not indexed
+        :param node: Node of the health map, whole map if not provided
+        :return: HealthCounters
+        """
+        if self.path(node) is None:
+            return None
+        return self._counters.get(id(self._map if node is None else node))
+
+    def path(self, node=None):
+        """
+        Returns the path of an indexed node, None if the node is not indexed
+        :param node: Node of the health map, whole map if not provided
+        :return: tuple of keys
+        """
+        if node is None or node is self._map:
+            return ()
+        indexed_node, path = self._nodes.get(id(node), (None, None))
+        return path if indexed_node is node else None
+
+    def _matches(self, key, root_path):
+        depth = len(root_path)
+        for parent, path in self._entries.get(key, ()):
+            if path[:depth] == root_path:
+                yield parent, len(path) == depth
+
+    def get(self, key, root=None):
+        """
+        Returns the first value stored under key in the subtree of root
+        :param key: Key to look for
+        :param root: Indexed node to search in, whole map if not provided
+        :return: value or None
+        :raises KeyError: if root is not indexed
+        """
+        root_path = self.path(root)
+        if root_path is None:
+            raise KeyError(key)
+        for parent, is_child in self._matches(key, root_path):
+            value = parent.get(key)
+            """
+            Same as the recursive search, an empty value found deeper in the
+            tree does not stop the lookup.
+            """
+            if is_child or value:
+                return value
+        return None
+
+    def set(self, key, value, root=None):
+        """
+        Sets value for every occurrence of key in the subtree of root
+        :param key: Key to be set
+        :param value: New value
+        :param root: Indexed node to update, whole map if not provided
+        :return: None
+        :raises KeyError: if root is not indexed
+        """
+        root_path = self.path(root)
+        if root_path is None:
+            raise KeyError(key)
+        replaced = False
+        for parent, _ in list(self._matches(key, root_path)):
+            if parent.get(key) is not value:
+                parent[key] = value
+                replaced = True
+        if replaced and isinstance(value, dict):
+            self.build(self._map)
+
 class HealthRepository:
     def __init__(self):
         self._health_schema = None
+        self._index = HealthMapIndex()
 
     @property
     def health_schema(self):
@@ -47,6 +253,17 @@ class HealthRepository:
         :returns: None
         """
         self._health_schema = health_schema
+        self._index = HealthMapIndex(
+            health_schema.data() if health_schema is not None else None)
+
+    @property
+    def index(self):
+        """
+        returns the index of the health schema
+        :param None
+        :returns: HealthMapIndex
+        """
+        return self._index
 
 class HealthAppService(ApplicationService):
     """
@@ -61,8 +278,19 @@ class HealthAppService(ApplicationService):
         self._health_plugin = plugin
         self._node_hostname_map = dict()
         self._hostname_node_map = dict()
+        self._verify_counters = Conf.get(const.CSM_GLOBAL_INDEX,
+                                         const.HEALTH_VERIFY_COUNTERS, False)
+        self._snapshot_path = Conf.get(const.CSM_GLOBAL_INDEX,
+                                       const.HEALTH_SNAPSHOT_PATH, "")
+        self._high_water_mark = None
+        self._snapshotter = None
         self._create_node_hostname_map()
         self._init_health_schema()
+        if self._snapshot_path:
+            interval = int(Conf.get(const.CSM_GLOBAL_INDEX,
+                                    const.HEALTH_SNAPSHOT_INTERVAL, 300))
+            self._snapshotter = Periodic(interval, self.save_health_snapshot)
+            self._snapshotter.start(now=False)
 
     def set_default_values(self, health_schema):
         """
@@ -119,9 +347,109 @@ class HealthAppService(ApplicationService):
             self.repo.health_schema = self._health_schema
             self.repo.health_schema.dump()
             self.set_default_values(self.repo.health_schema.data())
+            self._load_health_snapshot(health_schema_path)
+            self.repo.index.build(self.repo.health_schema.data())
         except Exception as ex:
             Log.error(f"Error occured in reading health schema. Path: {health_schema_path}, {ex}")
 
+    def _load_health_snapshot(self, health_schema_path):
+        """
+        Restores the health of the resources from the last snapshot, if any.
+        The snapshot is applied on top of the loaded health schema, so the
+        resources added to the schema since then keep their default values.
+        Only the alerts newer than the snapshot high-water mark are replayed
+        afterwards by update_health_schema_with_db.
+        :param health_schema_path: Path of the loaded health schema
+        :return: None
+        """
+        if not self._snapshot_path or not os.path.exists(self._snapshot_path):
+            return
+        try:
+            with open(self._snapshot_path) as snapshot_file:
+                snapshot = json.load(snapshot_file)
+            if snapshot.get("version") != const.HEALTH_SNAPSHOT_VERSION or \
+                    snapshot.get("health_schema") != health_schema_path:
+                Log.warn(f"Ignoring stale health map snapshot: {self._snapshot_path}")
+                return
+            self._merge_health_map(self.repo.health_schema.data(),
+                                   snapshot.get("health_map", {}))
+            self._high_water_mark = snapshot.get("high_water_mark")
+            Log.info(f"Health map restored from snapshot. "
+                     f"High-water mark: {self._high_water_mark}")
+        except Exception as ex:
+            Log.warn(f"Loading health map snapshot failed: {ex}")
+
+    def _merge_health_map(self, health_map, snapshot):
+        """
+        Copies the leaf values of the snapshot into the health map
+        :param health_map:
+        :param snapshot:
+        :return: None
+        """
+        for key, value in snapshot.items():
+            node = health_map.get(key)
+            if not isinstance(node, dict) or not isinstance(value, dict):
+                continue
+            if self._checkchilddict(node):
+                self._merge_health_map(node, value)
+            else:
+                node.update(value)
+
+    async def save_health_snapshot(self):
+        """
+        Writes a compact snapshot of the health map along with the alert
+        high-water mark, i.e. the time up to which alerts are reflected in it.
+        :param None
+        :return: None
+        """
+        if not self._snapshot_path or not self._is_map_updated_with_db:
+            """
+            Until the map is updated with the DB, a snapshot would claim alerts
+            which were never applied to it.
+            """
+            return
+        high_water_mark = int(time.time())
+        try:
+            snapshot = json.dumps({
+                "version": const.HEALTH_SNAPSHOT_VERSION,
+                "health_schema": Conf.get(const.CSM_GLOBAL_INDEX,
+                                          const.HEALTH_SCHEMA_KEY),
+                "high_water_mark": high_water_mark,
+                "health_map": self.repo.health_schema.data()
+            }, separators=(',', ':'))
+        except RuntimeError as ex:
+            """
+            The alert monitor thread may update the map while it is dumped, the
+            next period will take the snapshot.
+            """
+            Log.warn(f"Health map changed during snapshot: {ex}")
+            return
+        loop = asyncio.get_event_loop()
+        await loop.run_in_executor(None, self._write_health_snapshot, snapshot)
+        Log.debug(f"Health map snapshot saved. High-water mark: {high_water_mark}")
+
+    def _write_health_snapshot(self, snapshot):
+        directory = os.path.dirname(self._snapshot_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self._snapshot_path}.tmp"
+        with open(tmp_path, "w") as snapshot_file:
+            snapshot_file.write(snapshot)
+        os.replace(tmp_path, self._snapshot_path)
+
+    async def shutdown(self, app=None):
+        """
+        Stops the periodic snapshots and saves the last one
+        :param app: aiohttp application, when used as a shutdown handler
+        :return: None
+        """
+        if self._snapshotter:
+            self._snapshotter.stop()
+            try:
+                await self.save_health_snapshot()
+            except Exception as ex:
+                Log.warn(f"Saving health map snapshot failed: {ex}")
+
     async def fetch_health_view(self, **kwargs):
         """
         Fetches health details like health summary and alerts for the provides
@@ -273,11 +601,7 @@ class HealthAppService(ApplicationService):
         """
         await self.update_health_schema_with_db()
         health_schema = self._get_schema()
-        health_count_map = {}
-        leaf_nodes = []
-        self._get_leaf_node_health(health_schema, health_count_map, leaf_nodes, {})
-        return {
-            const.HEALTH_SUMMARY: self._get_health_count(health_count_map, leaf_nodes)}
+        return {const.HEALTH_SUMMARY: self._get_health_summary(health_schema)}
 
     async def _get_node_health_details(self, node_id):
         """
@@ -285,13 +609,9 @@ class HealthAppService(ApplicationService):
         :param node_id:
         :return:
         """
-        health_count_map = {}
-        leaf_nodes = []
         alert_uuid_map = {}
         health_schema = self._get_schema(node_id)
-        self._get_leaf_node_health(health_schema, health_count_map,
-                                   leaf_nodes, alert_uuid_map)
-        health_summary = self._get_health_count(health_count_map, leaf_nodes)
+        health_summary = self._get_health_summary(health_schema, alert_uuid_map)
         alerts = await self._get_node_alerts(alert_uuid_map)
         node_details = {node_id: {const.HEALTH_SUMMARY: health_summary, const.ALERTS_COMMAND: alerts}}
         return node_details
@@ -324,13 +644,8 @@ class HealthAppService(ApplicationService):
         :param node_id:
         :return:
         """
-        health_count_map = {}
-        leaf_nodes = []
-        alert_uuid_map = {}
         health_schema = self._get_schema(node_id)
-        self._get_leaf_node_health(health_schema, health_count_map,
-                                   leaf_nodes, alert_uuid_map)
-        health_summary = self._get_health_count(health_count_map, leaf_nodes)
+        health_summary = self._get_health_summary(health_schema)
         if "node" in node_id:
             hostname = self.get_hostname(node_id.split(':')[1])
             node_id = f"node:{hostname}"
@@ -348,16 +663,69 @@ class HealthAppService(ApplicationService):
             alerts = [alert.to_primitive() for alert in alerts_list]
         return alerts
 
-    def _get_health_count(self, health_count_map, leaf_nodes):
+    def _get_health_summary(self, health_schema, alert_uuid_map=None):
+        """
+        Get the health summary of the provided schema from the counters kept
+        in the health map index. Schemas which are not indexed are walked.
+        :param health_schema:
+        :param alert_uuid_map: Filled with the alert uuids per health status
+        :return: Health summary
+        """
+        if alert_uuid_map is None:
+            alert_uuid_map = {}
+        counters = self.repo.index.counters(health_schema) \
+            if isinstance(health_schema, dict) else None
+        if counters is None:
+            health_count_map = {}
+            leaf_nodes = []
+            self._get_leaf_node_health(health_schema, health_count_map,
+                                       leaf_nodes, alert_uuid_map)
+            return self._get_health_count(health_count_map, leaf_nodes)
+        if self._verify_counters and \
+                not self._verify_health_counters(health_schema, counters):
+            counters = self.repo.index.counters(health_schema)
+        alert_uuid_map.update(counters.alert_uuid_map())
+        return self._get_health_count(counters.health_count_map(), None,
+                                      counters.total)
+
+    def _verify_health_counters(self, health_schema, counters):
+        """
+        Recomputes the health counters of the schema from scratch and compares
+        them with the maintained ones. On drift the index is rebuilt.
+        :param health_schema:
+        :param counters: HealthCounters of the schema
+        :return: True if the counters are consistent
+        """
+        health_count_map = {}
+        leaf_nodes = []
+        alert_uuid_map = {}
+        self._get_leaf_node_health(health_schema, health_count_map,
+                                   leaf_nodes, alert_uuid_map)
+        expected_alerts = {status: set(alert_uuids)
+                           for status, alert_uuids in alert_uuid_map.items()}
+        actual_alerts = {status: set(alert_uuids) for status, alert_uuids
+                         in counters.alert_uuid_map().items()}
+        if (len(leaf_nodes) == counters.total
+                and health_count_map == counters.health_count_map()
+                and expected_alerts == actual_alerts):
+            return True
+        Log.error(f"Health counters drifted. Expected: {health_count_map}, "
+                  f"total: {len(leaf_nodes)}. Actual: "
+                  f"{counters.health_count_map()}, total: {counters.total}")
+        self.repo.index.build(self.repo.health_schema.data())
+        return False
+
+    def _get_health_count(self, health_count_map, leaf_nodes, total=None):
         """
         Get the health count based on the health status
         :param health_count_map:
         :param leaf_nodes:
+        :param total: Number of leaf nodes, if leaf_nodes is not provided
         :return:
         """
         critical_health_count = 0
         warning_health_count = 0
-        total_leaf_nodes = len(leaf_nodes)
+        total_leaf_nodes = len(leaf_nodes) if total is None else total
         health_summary = {}
         health_summary[const.TOTAL] = total_leaf_nodes
         """
@@ -518,6 +886,13 @@ class HealthAppService(ApplicationService):
         :param node_key:
         :return:
         """
+        if not isinstance(obj, dict):
+            return None
+        try:
+            return self.repo.index.get(node_key, obj)
+        except KeyError:
+            Log.debug(f"Health schema not indexed, searching for: {node_key}")
+
         def getvalue(obj):
             try:
                 for key, value in obj.items():
@@ -541,6 +916,13 @@ class HealthAppService(ApplicationService):
         "param node_value:
         :return:
         """
+        if not isinstance(obj, dict):
+            return
+        try:
+            self.repo.index.set(node_key, node_value, obj)
+            return
+        except KeyError:
+            Log.debug(f"Health schema not indexed, searching for: {node_key}")
         try:
             for key, value in obj.items():
                 if (node_key == key):
@@ -558,7 +940,6 @@ class HealthAppService(ApplicationService):
         try:
             resource_map = {}
             resource_node_map = {}
-            update_key = None
             is_node_response = msg_body.get(const.NODE_RESPONSE, False)
             resource_key = msg_body.get(const.RESOURCE_KEY, "")
             sub_resource_map = self.repo.health_schema.get(resource_key)
@@ -570,10 +951,8 @@ class HealthAppService(ApplicationService):
             if is_node_response:
                 resource_map = self._get_health_schema_by_key\
                         (sub_resource_map, node_id)
-                update_key = node_id
             else:
                 resource_map = sub_resource_map
-                update_key = resource_key
 
             for items in msg_body.get(const.RESOURCE_LIST, []):
                 key = items.get(const.KEY, "")
@@ -592,16 +971,14 @@ class HealthAppService(ApplicationService):
                         = items.get(const.ALERT_HEALTH, "NA")
                     resource_schema_dict[const.ALERT_DURABLE_ID] \
                         = items.get(const.ALERT_DURABLE_ID, "NA")
-                    self._set_health_schema_by_key\
-                            (resource_map, key, resource_schema_dict)
+                    self.repo.index.refresh(resource_schema_dict)
                     Log.debug(f"Health map updated for: {key}")
                 else:
                     Log.warn(f"Resource not found in health map. Key :{key}")
             """
-            Updating the health map with sub-resource map
+            Resources are updated in place in the health map, so there is no
+            need to write the sub-resource map back.
             """
-            self._set_health_schema_by_key(self.repo.health_schema.data(),\
-                    update_key, resource_map)
             Log.debug(f"Health map updated successfully.")
             return_value = True
         except Exception as ex:
@@ -612,7 +989,8 @@ class HealthAppService(ApplicationService):
     async def update_health_schema_with_db(self):
         """
         Updates the in memory health schema after CSM init.
-        1.) Fetches all the non-resolved alerts from DB
+        1.) Fetches all the alerts from DB, or only the ones updated after the
+        snapshot the map was restored from
         2.) Update the initialized and loaded in-memory health schema
         :param None
         :return: None
@@ -620,9 +998,23 @@ class HealthAppService(ApplicationService):
         if not self._is_map_updated_with_db:
             Log.debug(f"Updating health schema_with db.")
             try:
-                alerts = await self.alerts_repo.retrieve_by_range(create_time_range=None)
+                if self._high_water_mark is not None:
+                    """
+                    The map was restored from a snapshot, replay only the
+                    alerts updated after it was taken.
+                    """
+                    since = datetime.fromtimestamp(self._high_water_mark -
+                        const.HEALTH_SNAPSHOT_OVERLAP, timezone.utc)
+                    alerts = await self.alerts_repo.retrieve_updated_since(since)
+                else:
+                    alerts = await self.alerts_repo.retrieve_by_range(create_time_range=None)
+                """
+                The replayed alerts were published when they were raised, so
+                the map is updated without notifying the listeners.
+                """
                 for alert in alerts:
-                    self._health_plugin.update_health_map_with_alert(alert.to_primitive())
+                    self._health_plugin.update_health_map_with_alert(
+                        alert.to_primitive(), callback=self.update_health_map)
                 self._is_map_updated_with_db = True
             except Exception as e:
                 Log.warn(f"Error in update_health_schema_with db: {e}")
@@ -685,9 +1077,14 @@ class HealthMonitorService(Service, Observable):
         """
         This is a callback function which will receive
         a message from the health plugin as a dictionary.
+        The listeners are notified of every applied health update.
         """
-        self._health_service.update_health_map(message)
+        if self._health_service.update_health_map(message):
+            self._notify_listeners(message, loop=self._loop)
         return True
 
     def _update_map_with_db(self):
-        self._run_coroutine(self._health_service.update_health_schema_with_db())
+        if self._in_loop():
+            self._loop.create_task(self._health_service.update_health_schema_with_db())
+        else:
+            self._run_coroutine(self._health_service.update_health_schema_with_db())
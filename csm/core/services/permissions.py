@@ -13,14 +13,76 @@
 # For any questions about this software or licensing,
 # please email opensource@seagate.com or cortx-questions@seagate.com.
 
+class PermissionLayout:
+    '''
+    Bit layout of the (resource, action) pairs shared by all permission sets.
+    A pair gets the next free bit the first time it is seen, so the layout is
+    fixed by the roles loaded at startup and by the permissions the REST
+    handlers require. Bits are never reused.
+    '''
+
+    _bits = {}
+    _pairs = []
+
+    @classmethod
+    def register(cls, items: dict) -> None:
+        ''' Assigns bits to the pairs of the dictionary in a stable order '''
+
+        for resource, actions in items.items():
+            for action in sorted(actions):
+                if (resource, action) not in cls._bits:
+                    cls._bits[(resource, action)] = len(cls._pairs)
+                    cls._pairs.append((resource, action))
+
+    @classmethod
+    def mask(cls, items: dict) -> int:
+        ''' Compiles a dictionary of resources and actions to a bit mask '''
+
+        cls.register(items)
+        mask = 0
+        for resource, actions in items.items():
+            for action in actions:
+                mask |= 1 << cls._bits[(resource, action)]
+        return mask
+
+    @classmethod
+    def items(cls, mask: int) -> dict:
+        ''' Decompiles a bit mask to a dictionary of resources and actions '''
+
+        items = {}
+        while mask:
+            low = mask & -mask
+            resource, action = cls._pairs[low.bit_length() - 1]
+            items.setdefault(resource, set()).add(action)
+            mask ^= low
+        return items
+
+
 class PermissionSet:
-    ''' Permission Set stored in a compact way as a dictionary '''
+    ''' Permission Set stored in a compact way as a bit mask '''
 
     def __init__(self, items: dict = {}):
-        self._items = {
-            resource: set(actions)
-                for resource, actions in items.items()
-                    if len(actions) > 0
+        self._mask = PermissionLayout.mask(items)
+
+    @classmethod
+    def _from_mask(cls, mask: int) -> 'PermissionSet':
+        result = cls.__new__(cls)
+        result._mask = mask
+        return result
+
+    @property
+    def _items(self) -> dict:
+        return PermissionLayout.items(self._mask)
+
+    def copy(self) -> 'PermissionSet':
+        return self._from_mask(self._mask)
+
+    def to_dict(self) -> dict:
+        ''' Dictionary of the resources and their sorted actions '''
+
+        return {
+            resource: sorted(actions)
+                for resource, actions in self._items.items()
         }
 
     def __str__(self) -> str:
@@ -31,56 +93,26 @@ class PermissionSet:
     def __eq__(self, other: 'PermissionSet') -> bool:
         ''' Equality Operator '''
 
-        return self._items == other._items
+        return self._mask == other._mask
 
     def __or__(self, other: 'PermissionSet') -> 'PermissionSet':
         ''' Union Operator '''
 
-        result = PermissionSet()
-        resources = set(self._items.keys()) | set(other._items.keys())
-        for resource in resources:
-            lhs_actions = self._items.get(resource, set())
-            rhs_actions = other._items.get(resource, set())
-            actions = lhs_actions | rhs_actions
-            if len(actions) > 0:
-                result._items[resource] = actions
-        return result
+        return self._from_mask(self._mask | other._mask)
 
     def __and__(self, other: 'PermissionSet') -> 'PermissionSet':
         ''' Intersection Operator '''
 
-        result = PermissionSet()
-        resources = set(self._items.keys()) & set(other._items.keys())
-        for resource in resources:
-            lhs_actions = self._items.get(resource, set())
-            rhs_actions = other._items.get(resource, set())
-            actions = lhs_actions & rhs_actions
-            if len(actions) > 0:
-                result._items[resource] = actions
-        return result
+        return self._from_mask(self._mask & other._mask)
 
     def __ior__(self, other: 'PermissionSet') -> 'PermissionSet':
         ''' In-place Union Operator '''
 
-        for resource in other._items.keys():
-            lhs_actions = self._items.get(resource, set())
-            rhs_actions = other._items.get(resource, set())
-            actions = lhs_actions | rhs_actions
-            if len(actions) > 0:
-                self._items[resource] = actions
-            else:
-                self._items.pop(resource, None)
+        self._mask |= other._mask
         return self
 
     def __iand__(self, other: 'PermissionSet') -> 'PermissionSet':
         ''' In-place Intersection Operator '''
 
-        for resource in self._items.keys():
-            lhs_actions = self._items.get(resource, set())
-            rhs_actions = other._items.get(resource, set())
-            actions = lhs_actions & rhs_actions
-            if len(actions) > 0:
-                self._items[resource] = actions
-            else:
-                self._items.pop(resource, None)
+        self._mask &= other._mask
         return self
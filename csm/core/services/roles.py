@@ -17,7 +17,7 @@ from typing import Iterable, Text
 from cortx.utils.log import Log
 from csm.common.validate import Validator
 from csm.common.services import ApplicationService
-from csm.core.services.permissions import PermissionSet
+from csm.core.services.permissions import PermissionLayout, PermissionSet
 
 
 class Role:
@@ -87,23 +87,33 @@ class RoleManager:
         Log.info(f'Initializing role manager with predefined roles')
         self._validate_roles(predefined_roles)
 
+        for value in predefined_roles.values():
+            PermissionLayout.register(value['permissions'])
         self._roles = {
             name: Role(name, PermissionSet(value['permissions']))
                 for name, value in predefined_roles.items()
         }
+        # Effective permissions per sorted tuple of role names
+        self._effective_permissions = {}
 
     async def calc_effective_permissions(self, *role_names):
         """
         Calculate effective set of permissions from a given set of user roles.
+        The result is memoized until the roles are changed.
         """
 
-        permissions = PermissionSet()
-        for role_name in role_names:
-            role = self._roles.get(role_name, self.NO_ROLE)
-            if role.name is None:
-                Log.warn(f"Invalid role name '{role_name}'")
-            permissions |= role.permissions
-        return permissions
+        key = tuple(sorted(set(role_names)))
+        permissions = self._effective_permissions.get(key)
+        if permissions is None:
+            permissions = PermissionSet()
+            for role_name in key:
+                role = self._roles.get(role_name, self.NO_ROLE)
+                if role.name is None:
+                    Log.warn(f"Invalid role name '{role_name}'")
+                permissions |= role.permissions
+            self._effective_permissions[key] = permissions
+        # Callers may change the set in place, never hand out the cached one
+        return permissions.copy()
 
     async def add_role(self, name, permissions):
         """
@@ -115,6 +125,7 @@ class RoleManager:
             Log.error(f'Role "{name}" is already present')
             return False
         self._roles[name] = Role(name, PermissionSet(permissions))
+        self._effective_permissions.clear()
         Log.info(f'New role "{name}" has been successfully added')
         return True
 
@@ -125,6 +136,7 @@ class RoleManager:
 
         self._validate_name(name)
         if self._roles.pop(name, None) is not None:
+            self._effective_permissions.clear()
             Log.info(f'Existing role "{name}" has been successfully deleted')
         else:
             Log.warn(f'Role "{name}" does not exist')
@@ -13,18 +13,70 @@
 # For any questions about this software or licensing,
 # please email opensource@seagate.com or cortx-questions@seagate.com.
 
-from typing import Dict
+import asyncio
+import time
+from typing import Dict, Optional
 
 from botocore.exceptions import ClientError
 from boto.s3.bucket import Bucket
 
 from cortx.utils.log import Log
+from csm.common.conf import Conf
 from csm.common.service_urls import ServiceUrls
+from csm.core.blogic import const
 
 from csm.plugins.cortx.s3 import S3Plugin, S3Client
 from csm.core.providers.providers import Response
 from csm.core.services.sessions import S3Credentials
-from csm.core.services.s3.utils import S3BaseService, CsmS3ConfigurationFactory
+from csm.core.services.s3.utils import (S3BaseService, S3ServiceError,
+                                        CsmS3ConfigurationFactory)
+
+
+class BucketDeletionJob:
+    """
+    Deletion of a bucket running in the background, with its progress
+    """
+
+    STATUS_RUNNING = "running"
+    STATUS_COMPLETED = "completed"
+    STATUS_FAILED = "failed"
+
+    def __init__(self, bucket_name: str, user_id: str):
+        self.bucket_name = bucket_name
+        self.user_id = user_id
+        self.status = self.STATUS_RUNNING
+        self.deleted_objects = 0
+        self.error = None
+        self.started = time.time()
+        self.finished = None
+        self.task = None
+
+    def progress(self, count: int):
+        self.deleted_objects += count
+
+    def finish(self, error: Optional[Exception] = None):
+        self.error = error
+        self.status = self.STATUS_COMPLETED if error is None else self.STATUS_FAILED
+        self.finished = time.time()
+
+    @property
+    def running(self) -> bool:
+        return self.status == self.STATUS_RUNNING
+
+    def to_dict(self) -> Dict:
+        job = {
+            "bucket_name": self.bucket_name,
+            "status": self.status,
+            "deleted_objects": self.deleted_objects,
+            "started": int(self.started),
+            "finished": int(self.finished) if self.finished else None
+        }
+        if isinstance(self.error, ClientError):
+            job["error_code"] = self.error.response['Error']['Code']
+            job["message"] = self.error.response['Error']['Message']
+        elif self.error is not None:
+            job["message"] = str(self.error)
+        return job
 
 
 # TODO: the access to this service must be restricted to CSM users only (?)
@@ -37,6 +89,12 @@ class S3BucketService(S3BaseService):
         self._s3plugin = s3plugin
         self._s3_connection_config = CsmS3ConfigurationFactory.get_s3_connection_config()
         self._provisioner = provisioner
+        self._delete_concurrency = int(Conf.get(const.CSM_GLOBAL_INDEX,
+                                                const.S3_DELETE_CONCURRENCY, 4))
+        self._delete_job_ttl = int(Conf.get(const.CSM_GLOBAL_INDEX,
+                                            const.S3_DELETE_JOB_TTL, 3600))
+        # Deletion jobs keyed by the user and the bucket name
+        self._deletion_jobs = {}  # type: Dict[tuple, BucketDeletionJob]
 
     async def get_s3_client(self, s3_session: S3Credentials) -> S3Client:
         """
@@ -107,8 +165,55 @@ class S3BucketService(S3BaseService):
             for bucket in bucket_list]
         return {"buckets": bucket_list}
 
+    def _purge_deletion_jobs(self):
+        expired = time.time() - self._delete_job_ttl
+        for key, job in list(self._deletion_jobs.items()):
+            if not job.running and job.finished < expired:
+                del self._deletion_jobs[key]
+
+    async def _run_deletion(self, job: BucketDeletionJob, s3_client: S3Client):
+        try:
+            await s3_client.delete_bucket(job.bucket_name,
+                                          concurrency=self._delete_concurrency,
+                                          progress=job.progress)
+        except asyncio.CancelledError:
+            job.finish(asyncio.CancelledError("Bucket deletion is cancelled"))
+            raise
+        except Exception as e:
+            Log.error(f"Bucket {job.bucket_name} deletion failed after "
+                      f"{job.deleted_objects} objects: {e}")
+            job.finish(e)
+        else:
+            Log.info(f"Bucket {job.bucket_name} is deleted with "
+                     f"{job.deleted_objects} objects")
+            job.finish()
+
+    async def start_bucket_deletion(self, bucket_name: str,
+                                    s3_session: S3Credentials) -> BucketDeletionJob:
+        """
+        Start deleting the bucket with all of its objects in the background.
+        A deletion of the same bucket which is still running is reused.
+
+        :param bucket_name: name of bucket for deletion
+        :type bucket_name: str
+        :param s3_session: s3 user session
+        :type s3_session: S3Credentials
+        :return: BucketDeletionJob
+        """
+        self._purge_deletion_jobs()
+        key = (s3_session.user_id, bucket_name)
+        job = self._deletion_jobs.get(key)
+        if job is not None and job.running:
+            return job
+        s3_client = await self.get_s3_client(s3_session)
+        job = BucketDeletionJob(bucket_name, s3_session.user_id)
+        job.task = asyncio.ensure_future(self._run_deletion(job, s3_client))
+        self._deletion_jobs[key] = job
+        return job
+
     @Log.trace_method(Log.INFO)
-    async def delete_bucket(self, bucket_name: str, s3_session: S3Credentials):
+    async def delete_bucket(self, bucket_name: str, s3_session: S3Credentials,
+                            timeout: Optional[float] = None):
         """
         Delete bucket by given name
 
@@ -116,17 +221,54 @@ class S3BucketService(S3BaseService):
         :type bucket_name: str
         :param s3_session: s3 user session
         :type s3_session: S3Credentials
-        :return:
+        :param timeout: Time in seconds to wait for the deletion, which goes on
+                        in the background afterwards. Waits until it is done
+                        by default.
+        :type timeout: float
+        :return: The deletion job state if it is still running
         """
         Log.debug(f"Requested to delete bucket by name = {bucket_name}")
-
-        s3_client = await self.get_s3_client(s3_session)  # TODO: s3_client can't be returned
-        try:
-            # NOTE: returns None if deletion is successful
-            await s3_client.delete_bucket(bucket_name)
-        except ClientError as e:
-            self._handle_error(e)
+        job = await self.start_bucket_deletion(bucket_name, s3_session)
+        await asyncio.wait({job.task}, timeout=timeout)
+        if job.running:
+            return job.to_dict()
+        if isinstance(job.error, ClientError):
+            self._handle_error(job.error)
+        if job.error is not None:
+            raise job.error
         return {"message": "Bucket Deleted Successfully."}
+
+    async def get_bucket_deletion(self, bucket_name: str, s3_session: S3Credentials) -> Dict:
+        """
+        Get the progress of the bucket deletion
+
+        :param bucket_name: name of the bucket being deleted
+        :type bucket_name: str
+        :param s3_session: s3 user session
+        :type s3_session: S3Credentials
+        :return: The deletion job state
+        """
+        self._purge_deletion_jobs()
+        job = self._deletion_jobs.get((s3_session.user_id, bucket_name))
+        if job is None:
+            raise S3ServiceError(404, "NoSuchDeletion",
+                                 f"There is no deletion of the bucket {bucket_name}")
+        return job.to_dict()
+
+    async def shutdown(self, app=None):
+        """
+        Cancels the running bucket deletions
+        """
+        jobs = [job for job in self._deletion_jobs.values() if job.running]
+        for job in jobs:
+            job.task.cancel()
+        if jobs:
+            await asyncio.wait([job.task for job in jobs])
+        # Jobs cancelled before they started have not been finished
+        for job in jobs:
+            if job.running:
+                job.finish(asyncio.CancelledError("Bucket deletion is cancelled"))
+
     @Log.trace_method(Log.INFO)
     async def get_bucket_policy(self, s3_session: S3Credentials,
                                 bucket_name: str) -> Dict:
@@ -13,22 +13,31 @@
 # For any questions about this software or licensing,
 # please email opensource@seagate.com or cortx-questions@seagate.com.
 
+import asyncio
+import heapq
+import hmac
+import json
+import os
+import time
 import uuid
 from abc import ABC, abstractmethod
+from contextlib import contextmanager
 from enum import Enum
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 from cortx.utils.log import Log
 from csm.common.conf import Conf
+from csm.common.passwd import PasswdPool
+from csm.common.periodic import Periodic
 from csm.core.blogic import const
 from csm.plugins.cortx.s3 import S3Plugin
 from csm.core.data.models.s3 import S3ConnectionConfig, IamError
 # TODO: from csm.common.passwd import Passwd
-from csm.core.data.models.users import UserType, User, Passwd
+from csm.core.data.models.users import UserType, User
 from csm.core.services.users import UserManager
 from csm.core.services.roles import RoleManager
 from csm.core.services.permissions import PermissionSet
-from csm.common.errors import CsmError, CSM_ERR_INVALID_VALUE
+from csm.common.errors import CsmError, CsmTooManyRequests, CSM_ERR_INVALID_VALUE
 
 
 class SessionCredentials:
@@ -117,12 +126,260 @@ class Session:
         return self._permissions
 
 
-class SessionManager:
-    """ Session management class """
+class SessionBackend(ABC):
+    """ Base abstract class for the session storages """
+
+    @abstractmethod
+    async def store(self, session: Session) -> None:
+        """ Saves the whole session record """
+        ...
+
+    @abstractmethod
+    async def load(self, session_id: Session.Id) -> Optional[Session]:
+        ...
+
+    @abstractmethod
+    async def load_all(self) -> list:
+        ...
+
+    @abstractmethod
+    async def delete(self, session_id: Session.Id) -> None:
+        """ Deletes the session, does nothing if it does not exist """
+        ...
+
+    @abstractmethod
+    async def touch(self, session_id: Session.Id, expiry_time: datetime) -> None:
+        """ Updates only the expiry time of the session """
+        ...
+
+    @abstractmethod
+    async def delete_expired(self, now: datetime) -> int:
+        """
+        Deletes the sessions expired by now
+        :return: Number of deleted sessions
+        """
+        ...
+
+
+class InMemorySessionBackend(SessionBackend):
+    """
+    Process local session storage.
+    The sessions are ordered by expiry time in a heap. Refreshing a session
+    pushes a new entry, the outdated one is skipped when it is popped and the
+    heap is rebuilt when the outdated entries outnumber the sessions.
+    """
 
     def __init__(self):
         self._stg = {}
+        self._expiry = []
+
+    def _push(self, session_id: Session.Id, expiry_time: datetime) -> None:
+        heapq.heappush(self._expiry, (expiry_time, session_id))
+        if len(self._expiry) > 2 * len(self._stg) + 64:
+            self._expiry = [(session.expiry_time, session_id)
+                            for session_id, session in self._stg.items()]
+            heapq.heapify(self._expiry)
+
+    async def store(self, session: Session) -> None:
+        self._stg[session.session_id] = session
+        self._push(session.session_id, session.expiry_time)
+
+    async def load(self, session_id: Session.Id) -> Optional[Session]:
+        return self._stg.get(session_id, None)
+
+    async def load_all(self) -> list:
+        return list(self._stg.values())
+
+    async def delete(self, session_id: Session.Id) -> None:
+        self._stg.pop(session_id, None)
+
+    async def touch(self, session_id: Session.Id, expiry_time: datetime) -> None:
+        session = self._stg.get(session_id, None)
+        if session:
+            session.expiry_time = expiry_time
+            self._push(session_id, expiry_time)
+
+    async def delete_expired(self, now: datetime) -> int:
+        count = 0
+        while self._expiry and self._expiry[0][0] <= now:
+            _, session_id = heapq.heappop(self._expiry)
+            session = self._stg.get(session_id, None)
+            if session and session.expiry_time <= now:
+                del self._stg[session_id]
+                count += 1
+        return count
+
+
+class FileSessionBackend(SessionBackend):
+    """
+    Session storage in a directory shared by several agent processes.
+    Every session is a JSON file named after the session id, its expiry time
+    is the modification time of the file, so refreshing a session does not
+    rewrite the record. The files hold the S3 credentials and are only
+    readable by the owner.
+    """
+
+    CREDENTIALS = {
+        cls.__name__: cls
+        for cls in (LocalCredentials, LdapCredentials, S3Credentials)
+    }
+
+    def __init__(self, path: str):
+        self._path = path
+        os.makedirs(path, mode=0o700, exist_ok=True)
+
+    def _session_file(self, session_id: Session.Id) -> Optional[str]:
+        # Session ids come from the requests, never let them leave the directory
+        if not session_id or not session_id.isalnum():
+            return None
+        return os.path.join(self._path, f'{session_id}.json')
+
+    @staticmethod
+    async def _run(func, *args):
+        return await asyncio.get_event_loop().run_in_executor(None, func, *args)
+
+    def _to_dict(self, session: Session) -> dict:
+        credentials = session.credentials
+        record = {
+            'type': type(credentials).__name__,
+            'user_id': credentials.user_id
+        }
+        if isinstance(credentials, S3Credentials):
+            record.update(access_key=credentials.access_key,
+                          secret_key=credentials.secret_key,
+                          session_token=credentials.session_token)
+        return {
+            'session_id': session.session_id,
+            'credentials': record,
+            'permissions': session.permissions.to_dict()
+        }
+
+    def _from_dict(self, record: dict, expiry_time: datetime) -> Session:
+        credentials = dict(record['credentials'])
+        credentials_cls = self.CREDENTIALS[credentials.pop('type')]
+        return Session(record['session_id'], expiry_time,
+                       credentials_cls(**credentials),
+                       PermissionSet(record['permissions']))
+
+    def _store(self, session: Session) -> None:
+        path = self._session_file(session.session_id)
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w') as f:
+            json.dump(self._to_dict(session), f)
+        expiry = session.expiry_time.timestamp()
+        os.utime(tmp_path, (expiry, expiry))
+        os.replace(tmp_path, path)
+
+    def _load(self, path: str) -> Optional[Session]:
+        try:
+            with open(path) as f:
+                record = json.load(f)
+            mtime = os.stat(path).st_mtime
+        except FileNotFoundError:
+            return None
+        except (ValueError, KeyError) as e:
+            Log.warn(f'Invalid session file {path}: {e}')
+            return None
+        return self._from_dict(record, datetime.fromtimestamp(mtime, timezone.utc))
+
+    def _load_all(self) -> list:
+        sessions = []
+        with os.scandir(self._path) as entries:
+            for entry in entries:
+                if entry.name.endswith('.json'):
+                    session = self._load(entry.path)
+                    if session:
+                        sessions.append(session)
+        return sessions
+
+    def _delete_expired(self, now: float) -> int:
+        count = 0
+        with os.scandir(self._path) as entries:
+            for entry in entries:
+                try:
+                    if entry.name.endswith('.json') and \
+                            entry.stat().st_mtime <= now:
+                        os.remove(entry.path)
+                        count += 1
+                except FileNotFoundError:
+                    # Removed by another agent process
+                    pass
+        return count
+
+    @staticmethod
+    def _remove(path: str) -> None:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    @staticmethod
+    def _utime(path: str, expiry: float) -> None:
+        try:
+            os.utime(path, (expiry, expiry))
+        except FileNotFoundError:
+            pass
+
+    async def store(self, session: Session) -> None:
+        if self._session_file(session.session_id) is None:
+            raise CsmError(CSM_ERR_INVALID_VALUE,
+                           f'Invalid session id: {session.session_id}')
+        await self._run(self._store, session)
+
+    async def load(self, session_id: Session.Id) -> Optional[Session]:
+        path = self._session_file(session_id)
+        if path is None:
+            return None
+        return await self._run(self._load, path)
+
+    async def load_all(self) -> list:
+        return await self._run(self._load_all)
+
+    async def delete(self, session_id: Session.Id) -> None:
+        path = self._session_file(session_id)
+        if path:
+            await self._run(self._remove, path)
+
+    async def touch(self, session_id: Session.Id, expiry_time: datetime) -> None:
+        path = self._session_file(session_id)
+        if path:
+            await self._run(self._utime, path, expiry_time.timestamp())
+
+    async def delete_expired(self, now: datetime) -> int:
+        return await self._run(self._delete_expired, now.timestamp())
+
+
+class SessionManager:
+    """
+    Session management class.
+    The sessions are kept by a SessionBackend, selected by the configuration
+    unless given. Expired sessions are deleted periodically.
+    """
+
+    BACKEND_MEMORY = 'memory'
+    BACKEND_FILE = 'file'
+
+    def __init__(self, backend: Optional[SessionBackend] = None):
+        self._backend = backend or self._create_backend()
         self._expiry_interval = timedelta(minutes=60)  # TODO: Load from config
+        sweep_interval = Conf.get(const.CSM_GLOBAL_INDEX,
+                                  const.SESSION_SWEEP_INTERVAL, 60)
+        self._sweeper = Periodic(int(sweep_interval), self.delete_expired)
+        self._sweeper.start(now=False)
+
+    @classmethod
+    def _create_backend(cls) -> SessionBackend:
+        backend = Conf.get(const.CSM_GLOBAL_INDEX, const.SESSION_BACKEND,
+                           cls.BACKEND_MEMORY)
+        if backend == cls.BACKEND_MEMORY:
+            return InMemorySessionBackend()
+        if backend == cls.BACKEND_FILE:
+            path = Conf.get(const.CSM_GLOBAL_INDEX, const.SESSION_PATH,
+                            const.SESSION_DEFAULT_PATH)
+            Log.info(f'Sessions are stored in {path}')
+            return FileSessionBackend(path)
+        raise CsmError(CSM_ERR_INVALID_VALUE, f'Invalid session backend: {backend}')
 
     @property
     def expiry_interval(self):
@@ -140,20 +397,40 @@ class SessionManager:
         session_id = self._generate_sid()
         expiry_time = self.calc_expiry_time()
         session = Session(session_id, expiry_time, credentials, permissions)
-        self._stg[session_id] = session
+        await self._backend.store(session)
         return session
 
     async def delete(self, session_id: Session.Id) -> None:
-        self._stg.pop(session_id)
+        await self._backend.delete(session_id)
 
     async def get(self, session_id: Session.Id) -> Optional[Session]:
-        return self._stg.get(session_id, None)
+        return await self._backend.load(session_id)
 
     async def get_all(self):
-        return list(self._stg.values())
+        return await self._backend.load_all()
 
     async def update(self, session: Session) -> None:
-        self._stg[session.session_id] = session
+        await self._backend.store(session)
+
+    async def refresh(self, session: Session) -> None:
+        """
+        Extends the session by the expiry interval
+        :param session: Session to be refreshed
+        """
+        session.expiry_time = self.calc_expiry_time()
+        await self._backend.touch(session.session_id, session.expiry_time)
+
+    async def delete_expired(self) -> None:
+        count = await self._backend.delete_expired(datetime.now(timezone.utc))
+        if count:
+            Log.debug(f'Deleted {count} expired sessions')
+
+    async def shutdown(self, app=None) -> None:
+        """
+        Stops deleting the expired sessions
+        :param app: aiohttp application, when used as a shutdown handler
+        """
+        self._sweeper.stop()
 
 
 class AuthPolicy(ABC):
@@ -165,11 +442,41 @@ class AuthPolicy(ABC):
 
 
 class LocalAuthPolicy(AuthPolicy):
-    """ Local CSM user authentication policy """
+    """
+    Local CSM user authentication policy.
+    Passwords are verified in the password pool. Failed attempts are
+    remembered for a short time, so repeating a wrong password is rejected
+    without hashing it again. The attempts are keyed by an HMAC of the
+    password with a per-process key and by the password hash of the user,
+    so changing the password forgets them.
+    """
+
+    def __init__(self, passwd_pool: PasswdPool):
+        self._passwd_pool = passwd_pool
+        self._failure_ttl = float(Conf.get(const.CSM_GLOBAL_INDEX,
+                                           const.LOGIN_FAILURE_CACHE_TTL, 30))
+        self._failures = {}
+        self._key = os.urandom(32)
+
+    def _failure_key(self, user: User, password: str) -> tuple:
+        digest = hmac.new(self._key, password.encode('utf-8'), 'sha256').digest()
+        return (user.user_id, user.password_hash, digest)
 
     async def authenticate(self, user: User, password: str) -> Optional[SessionCredentials]:
-        if Passwd.verify(password, user.password_hash):
+        key = self._failure_key(user, password)
+        expiry = self._failures.get(key)
+        if expiry is not None:
+            if expiry > time.monotonic():
+                Log.debug(f'Repeated failed login of {user.user_id}')
+                return None
+            del self._failures[key]
+
+        if await self._passwd_pool.verify(password, user.password_hash):
             return LocalCredentials(user.user_id)
+
+        if len(self._failures) >= const.LOGIN_FAILURE_CACHE_SIZE:
+            self._failures.clear()
+        self._failures[key] = time.monotonic() + self._failure_ttl
         return None
 
 
@@ -212,9 +519,9 @@ class AuthService:
     """ Generic authentication service. Allows to use different
     authentication policies for different user types. """
 
-    def __init__(self):
+    def __init__(self, passwd_pool: Optional[PasswdPool] = None):
         self._policies = {
-            UserType.CsmUser.value: LocalAuthPolicy(),
+            UserType.CsmUser.value: LocalAuthPolicy(passwd_pool or PasswdPool()),
             UserType.LdapUser.value: LdapAuthPolicy(),
             UserType.S3AccountUser.value: S3AuthPolicy(),
         }
@@ -227,6 +534,47 @@ class AuthService:
         return None
 
 
+class LoginThrottle:
+    """
+    Limits the number of logins in progress per user and per remote address.
+    Logins over the limit are rejected with CsmTooManyRequests.
+    """
+
+    def __init__(self, max_per_user: int, max_per_remote: int):
+        self._max_per_user = max_per_user
+        self._max_per_remote = max_per_remote
+        self._in_progress = {}
+
+    def _acquire(self, key, limit: int) -> bool:
+        count = self._in_progress.get(key, 0)
+        if count >= limit:
+            return False
+        self._in_progress[key] = count + 1
+        return True
+
+    def _release(self, key) -> None:
+        count = self._in_progress.pop(key, 0) - 1
+        if count > 0:
+            self._in_progress[key] = count
+
+    @contextmanager
+    def limit(self, user_id: str, remote: Optional[str] = None):
+        keys = []
+        try:
+            for key, limit in ((('user', user_id.lower()), self._max_per_user),
+                               (('remote', remote), self._max_per_remote)):
+                if key[1] is None:
+                    continue
+                if not self._acquire(key, limit):
+                    Log.warn(f'Too many logins in progress for {key[0]} {key[1]}')
+                    raise CsmTooManyRequests('Too many login attempts in progress')
+                keys.append(key)
+            yield
+        finally:
+            for key in keys:
+                self._release(key)
+
+
 class LoginService:
     """ Login service. Authenticates a user with authentication service
     and creates a new session on login. Deletes existing session on logout.
@@ -240,10 +588,16 @@ class LoginService:
         self._user_manager = user_manager
         self._role_manager = role_manager
         self._session_manager = session_manager
+        self._throttle = LoginThrottle(
+            int(Conf.get(const.CSM_GLOBAL_INDEX, const.LOGIN_MAX_PER_USER, 2)),
+            int(Conf.get(const.CSM_GLOBAL_INDEX, const.LOGIN_MAX_PER_REMOTE, 8)))
 
-    async def login(self, user_id, password):
+    async def login(self, user_id, password, remote=None):
         Log.debug(f'Logging in user {user_id}')
+        with self._throttle.limit(user_id, remote):
+            return await self._login(user_id, password)
 
+    async def _login(self, user_id, password):
         user = await self._user_manager.get(user_id)
         credentials = None
         if user:
@@ -286,7 +640,7 @@ class LoginService:
             raise CsmError(CSM_ERR_INVALID_VALUE, 'Session expired')
 
         # Refresh Expiry Time
-        session.expiry_time = self._session_manager.calc_expiry_time()
+        await self._session_manager.refresh(session)
 
         return session
 
@@ -23,12 +23,15 @@
 import asyncio
 import re
 from datetime import datetime, timedelta
-from typing import Dict
+from typing import Dict, List, Tuple
 from cortx.utils.log import Log
+from csm.common.conf import Conf
 from csm.common.services import Service, ApplicationService
 from csm.common.errors import CsmInternalError
+from csm.core.blogic import const
 
 STATS_DATA_MSG_NOT_FOUND = "stats_not_found"
+STATS_PANEL_MSG_FAILED = "Failed to fetch the stats of the panel"
 
 class StatsAppService(ApplicationService):
     """
@@ -37,6 +40,48 @@ class StatsAppService(ApplicationService):
 
     def __init__(self, stats_provider):
         self._stats_provider = stats_provider
+        self._panel_concurrency = int(Conf.get(const.CSM_GLOBAL_INDEX,
+                                               const.STATS_PANEL_CONCURRENCY, 4))
+
+    async def _process_panels(self, stats_id, panel_requests: List[Tuple[str, Dict]]) -> Dict:
+        """
+        Request the stats of several panels concurrently, at most
+        STATS.panel_concurrency at once. A failed panel does not fail the
+        others: it is reported in the "errors" list of the output with a
+        generic message, the error itself is only logged. Only if all the
+        panels fail the first error is raised.
+        :param panel_requests: Panels with their process_request arguments
+        :return: Output with the metrics of all the panels in the given order
+        """
+        semaphore = asyncio.Semaphore(max(1, self._panel_concurrency))
+
+        async def _process(panel, request):
+            async with semaphore:
+                return await self._stats_provider.process_request(
+                    stats_id=stats_id, panel=panel, **request)
+
+        results = await asyncio.gather(
+            *(_process(panel, request) for panel, request in panel_requests),
+            return_exceptions=True)
+        output = {}
+        if stats_id:
+            output["id"] = stats_id
+        data_list = []
+        errors = []
+        for (panel, _), result in zip(panel_requests, results):
+            # A cancelled panel request is a BaseException only
+            if isinstance(result, BaseException):
+                Log.error(f"Stats request of panel {panel} failed: {result!r}")
+                errors.append({"panel": panel, "message": STATS_PANEL_MSG_FAILED})
+            else:
+                data_list.extend(result["list"])
+        if errors and len(errors) == len(results):
+            raise next(result for result in results if isinstance(result, BaseException))
+        output["metrics"] = data_list
+        if errors:
+            output["errors"] = errors
+        Log.debug(f"Stats Request Output: {output}")
+        return output
 
     async def get(self, stats_id, panel, from_t, to_t,
                   metric_list, interval, total_sample, unit, output_format, query) -> Dict:
@@ -90,25 +135,15 @@ class StatsAppService(ApplicationService):
         Fetch statistics for selected panels list (simplified - reduced parameter set)
         """
         Log.debug(f"Get stats for panels: {panels_list}")
-        output = {}
-        if stats_id:
-            output["id"]=stats_id
-        data_list = []
-        for panel in panels_list:
-            panel_data = await self._stats_provider.process_request(
-                                                  stats_id = stats_id,
-                                                  panel = panel,
-                                                  from_t = from_t, duration_t = to_t,
-                                                  metric_list = "",
-                                                  interval = interval,
-                                                  total_sample = total_sample,
-                                                  unit = "",
-                                                  output_format = output_format,
-                                                  query = "")
-            data_list.extend(panel_data["list"])
-        output["metrics"] = data_list
-        Log.debug(f"Stats Request Output: {output}")
-        return output
+        panel_requests = [(panel, dict(from_t = from_t, duration_t = to_t,
+                                       metric_list = "",
+                                       interval = interval,
+                                       total_sample = total_sample,
+                                       unit = "",
+                                       output_format = output_format,
+                                       query = ""))
+                          for panel in panels_list]
+        return await self._process_panels(stats_id, panel_requests)
 
     async def get_metrics(self, stats_id, metrics_list, from_t, to_t, interval,
                           total_sample, output_format) -> Dict:
@@ -117,7 +152,6 @@ class StatsAppService(ApplicationService):
         panels : { "<panel>": {"metric":[...], "unit":[...]}}
         """
         Log.debug("Get metrics requested: id=%s, interval=%s" %(str(stats_id), interval))
-        output = {}
         panels = {}
         try:
             for metric in metrics_list:
@@ -133,21 +167,12 @@ class StatsAppService(ApplicationService):
         except:
             raise CsmInternalError("Stats: Invalid metric list %s" %metrics_list)
 
-        if stats_id:
-            output["id"]=stats_id
-        data_list = []
-        for panel in panels.keys():
-            panel_data = await self._stats_provider.process_request(
-                                                  stats_id = stats_id,
-                                                  panel = panel,
-                                                  from_t = from_t, duration_t = to_t,
-                                                  metric_list = panels[panel]["metric"],
-                                                  interval = interval,
-                                                  total_sample = total_sample,
-                                                  unit = panels[panel]["unit"],
-                                                  output_format = output_format,
-                                                  query = "")
-            data_list.extend(panel_data["list"])
-        output["metrics"] = data_list
-        Log.debug(f"Stats Request Output: {output}")
-        return output
+        panel_requests = [(panel, dict(from_t = from_t, duration_t = to_t,
+                                       metric_list = panels[panel]["metric"],
+                                       interval = interval,
+                                       total_sample = total_sample,
+                                       unit = panels[panel]["unit"],
+                                       output_format = output_format,
+                                       query = ""))
+                          for panel in panels.keys()]
+        return await self._process_panels(stats_id, panel_requests)
@@ -16,6 +16,7 @@
 from typing import List
 
 from csm.common.errors import CsmNotFoundError
+from csm.common.observer import Observable
 from csm.common.email import EmailSender, EmailError
 from csm.common.queries import SortBy
 from csm.common.services import ApplicationService
@@ -122,9 +123,11 @@ class SystemConfigManager:
         return await self.storage(OnboardingLicense).store(license)
 
 
-class SystemConfigAppService(ApplicationService):
+class SystemConfigAppService(ApplicationService, Observable):
     """
     Service that exposes system config management actions.
+    The listeners are notified with the config id whenever a system config
+    is created, updated or deleted.
     """
 
     def __init__(self, storage: DataBaseProvider, provisioner: ProvisionerPlugin,
@@ -135,6 +138,7 @@ class SystemConfigAppService(ApplicationService):
         self._storage = storage
         self._provisioner = provisioner
         self._security_service = security_service
+        Observable.__init__(self)
 
     async def create_system_config(self, config_id: str, **kwargs) -> dict:
         """
@@ -146,6 +150,7 @@ class SystemConfigAppService(ApplicationService):
         system_config = SystemConfigSettings.instantiate_system_config(config_id)
         await system_config.update(kwargs)
         await self.system_config_mgr.create(system_config)
+        await self._async_notify_listeners(config_id)
         return system_config.to_primitive()
 
     async def get_system_config_list(self):
@@ -206,6 +211,7 @@ class SystemConfigAppService(ApplicationService):
                     CertificateInstallationStatus.NOT_INSTALLED.value):
                     await self._security_service.install_certificate()
 
+        await self._async_notify_listeners(config_id)
         return system_config.to_primitive()
 
     async def delete_system_config(self, config_id: str):
@@ -220,6 +226,7 @@ class SystemConfigAppService(ApplicationService):
             raise CsmNotFoundError("There is no such system config",
                                    SYSTEM_CONFIG_NOT_FOUND)
         await self.system_config_mgr.delete(config_id)
+        await self._async_notify_listeners(config_id)
         return {}
 
     async def test_email_config(self, config_data: dict) -> bool:
@@ -297,5 +304,6 @@ class SystemConfigAppService(ApplicationService):
         if config_data.get(const.DATE_TIME_SETTING, {}):
             ntp_config = config_data.get(const.DATE_TIME_SETTING, {}).get(const.NTP, {})
             await self._provisioner.set_ntp(ntp_config)
-  
+
+        await self._async_notify_listeners(config_id)
         return system_config.to_primitive()
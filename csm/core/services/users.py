@@ -22,7 +22,8 @@ from typing import Dict, List, Optional
 from cortx.utils.log import Log
 from csm.common.services import Service, ApplicationService
 from csm.common.queries import SortBy, SortOrder, QueryLimits, DateTimeRange
-from csm.core.data.models.users import User, UserType, Passwd
+from csm.core.data.models.users import User, UserType
+from csm.common.passwd import PasswdPool
 from csm.common.errors import (CsmNotFoundError, CsmError, InvalidRequest,
                                 CsmPermissionDenied, ResourceExist)
 import time
@@ -42,6 +43,39 @@ class UserManager:
     """
     def __init__(self, storage: DataBaseProvider) -> None:
         self.storage = storage
+        self._cache_ttl = float(Conf.get(const.CSM_GLOBAL_INDEX,
+                                         const.USER_CACHE_TTL, 60))
+        # Users by lower case user id, with their expiry time. The callers
+        # get copies, so their changes are not seen before they are saved
+        self._cache = {}
+        # Stored user ids by lower case user id, for case insensitive lookups
+        self._user_ids = None
+        self._user_ids_expiry = 0
+
+    def _remember(self, user: User) -> None:
+        if len(self._cache) >= const.USER_CACHE_SIZE:
+            self._cache.clear()
+        self._cache[user.user_id.lower()] = (User(user.to_native()),
+                                             time.monotonic() + self._cache_ttl)
+
+    def _forget(self, user_id: str) -> None:
+        self._cache.pop(user_id.lower(), None)
+
+    async def _get_by_id(self, user_id: str) -> Optional[User]:
+        query = Query().filter_by(Compare(User.user_id, '=', user_id))
+        return next(iter(await self.storage(User).get(query)), None)
+
+    async def _resolve_user_id(self, user_id: str) -> Optional[str]:
+        """
+        Maps a user id to the stored one, ignoring case.
+        The storage has no case insensitive comparison, so the stored ids are
+        read once and kept for the cache TTL.
+        """
+        if self._user_ids is None or self._user_ids_expiry <= time.monotonic():
+            users = await self.get_list()
+            self._user_ids = {user.user_id.lower(): user.user_id for user in users}
+            self._user_ids_expiry = time.monotonic() + self._cache_ttl
+        return self._user_ids.get(user_id.lower())
 
     async def create(self, user: User) -> User:
         """
@@ -53,26 +87,38 @@ class UserManager:
         if existing_user:
             raise ResourceExist(f"User already exists: {existing_user.user_id}", USERS_MSG_ALREADY_EXISTS)
 
-        return await self.storage(User).store(user)
+        result = await self.storage(User).store(user)
+        if self._user_ids is not None:
+            self._user_ids[user.user_id.lower()] = user.user_id
+        return result
 
     async def get(self, user_id) -> User:
         """
-        Fetches a single user.
+        Fetches a single user, ignoring the case of the user id.
+        The user is looked up by the id as given first, and by the stored id
+        with a different case only if that fails.
         :param user_id: User identifier
         :returns: User object in case of success. None otherwise.
         """
         Log.debug(f"Get user service user id:{user_id}")
-        # TODO In absence of ComapareIgnoreCase manually filtering 
-        # query = Query().filter_by(Compare(User.to_native("user_id").lower(), '=', user_id.lower()))
-        # return next(iter(await self.storage(User).get(query)), None)
-        all_users = await self.get_list()
-        for user in all_users:
-            if user["user_id"].lower() == user_id.lower():
-                return user
-        return None
+        cached = self._cache.get(user_id.lower())
+        if cached and cached[1] > time.monotonic():
+            return User(cached[0].to_native())
+
+        user = await self._get_by_id(user_id)
+        if user is None:
+            stored_user_id = await self._resolve_user_id(user_id)
+            if stored_user_id is not None and stored_user_id != user_id:
+                user = await self._get_by_id(stored_user_id)
+        if user is not None:
+            self._remember(user)
+        return user
 
     async def delete(self, user_id: str) -> None:
         Log.debug(f"Delete user service user id:{user_id}")
+        self._forget(user_id)
+        if self._user_ids is not None:
+            self._user_ids.pop(user_id.lower(), None)
         await self.storage(User).delete(Compare(User.user_id, '=', user_id))
 
     async def get_list(self, offset: int = None, limit: int = None,
@@ -112,7 +158,12 @@ class UserManager:
         :param user:
         """
         # TODO: validate the model
-        await self.storage(User).store(user)
+        self._forget(user.user_id)
+        try:
+            await self.storage(User).store(user)
+        finally:
+            # A lookup during the store may have cached the previous state
+            self._forget(user.user_id)
 
 
 USERS_MSG_USER_NOT_FOUND = "users_not_found"
@@ -126,9 +177,11 @@ class CsmUserService(ApplicationService):
     """
     Service that exposes csm user management actions from the csm core.
     """
-    def __init__(self, provisioner, user_mgr: UserManager):
+    def __init__(self, provisioner, user_mgr: UserManager,
+                 passwd_pool: Optional[PasswdPool] = None):
         self.user_mgr = user_mgr
         self._provisioner = provisioner
+        self._passwd_pool = passwd_pool or PasswdPool()
 
     def _user_to_dict(self, user: User):
         """ Helper method to convert user model into a dictionary repreentation """
@@ -153,7 +206,8 @@ class CsmUserService(ApplicationService):
         In case of error, an exception is raised.
         """
         Log.debug(f"Create user service. user_id: {user_id}")
-        user = User.instantiate_csm_user(user_id, password)
+        password_hash = await self._passwd_pool.hash(password)
+        user = User.instantiate_csm_user(user_id, password_hash)
         user.update(kwargs)
         user['alert_notification'] = True
         await self.user_mgr.create(user)
@@ -181,7 +235,8 @@ class CsmUserService(ApplicationService):
         roles = [const.CSM_SUPER_USER_ROLE, const.CSM_MANAGE_ROLE]
         if ( Conf.get(const.CSM_GLOBAL_INDEX, "DEPLOYMENT.mode") != const.DEV ):
             await self._provisioner.create_system_user(user_id, password)
-        user = User.instantiate_csm_user(user_id, password, email=email, roles=roles,
+        password_hash = await self._passwd_pool.hash(password)
+        user = User.instantiate_csm_user(user_id, password_hash, email=email, roles=roles,
                                          alert_notification=True)
         await self.user_mgr.create(user)
         return self._user_to_dict(user)
@@ -282,19 +337,22 @@ class CsmUserService(ApplicationService):
         else:
             await self._validation_for_update_by_normal_user(user_id, loggedin_user_id, new_values)
         
-        if current_password and not self._verfiy_current_password(user, current_password):
+        if current_password and not await self._verfiy_current_password(user, current_password):
             raise InvalidRequest("Cannot update user details without valid current password",
                                       USERS_MSG_UPDATE_NOT_ALLOWED)
-        
+
+        if 'password' in new_values:
+            new_values['password_hash'] = await self._passwd_pool.hash(
+                new_values.pop('password'))
         user.update(new_values)
         await self.user_mgr.save(user)
         return self._user_to_dict(user)
 
-    def _verfiy_current_password(self, user: User, password):
+    async def _verfiy_current_password(self, user: User, password):
         """
         Verify current password of user .
         """
-        return Passwd.verify(password, user.password_hash)
+        return await self._passwd_pool.verify(password, user.password_hash)
 
     def is_super_user(self, user: User):
         """ Check if user is super user """
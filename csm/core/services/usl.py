@@ -19,6 +19,7 @@ import time
 from aiohttp import ClientSession, TCPConnector
 from aiohttp import ClientError as HttpClientError
 from boto.s3.bucket import Bucket
+from botocore.exceptions import ClientError
 from datetime import date
 from random import SystemRandom
 from marshmallow import ValidationError
@@ -30,6 +31,7 @@ from csm.common.conf import Conf
 from csm.common.errors import (
     CsmGatewayTimeout, CsmInternalError, CsmNotFoundError, CsmPermissionDenied)
 from csm.common.periodic import Periodic
+from csm.common.response_cache import CachedResponse, ResponseCache
 from cortx.utils.data.access import Query
 from cortx.utils.log import Log
 from csm.common.runtime import Options
@@ -85,6 +87,12 @@ class UslService(ApplicationService):
     _native_certificate_manager: USLNativeCertificateManager
     _api_key_dispatch: UslApiKeyDispatcher
 
+    # Keys of the cached responses
+    CACHE_SYSTEM = 'system'
+    CACHE_DEVICES = 'devices'
+    CACHE_NETWORK_INTERFACES = 'network_interfaces'
+    CACHE_CERTIFICATES = 'certificates/'
+
     def __init__(self, s3_plugin, storage, provisioner) -> None:
         """
         Constructor.
@@ -99,6 +107,30 @@ class UslService(ApplicationService):
         self._domain_certificate_manager = USLDomainCertificateManager(secure_storage)
         self._native_certificate_manager = USLNativeCertificateManager()
         self._api_key_dispatch = UslApiKeyDispatcher(self._storage)
+        self._tag_check_concurrency = int(Conf.get(
+            const.CSM_GLOBAL_INDEX, const.USL_TAG_CHECK_CONCURRENCY, 8))
+        self._tag_cache_ttl = float(Conf.get(
+            const.CSM_GLOBAL_INDEX, const.USL_TAG_CACHE_TTL, 60))
+        # Lyve Pilot verdicts of the buckets with their expiration time
+        self._lyve_pilot_buckets: Dict[str, Tuple[bool, float]] = {}
+        self._response_cache = ResponseCache(float(Conf.get(
+            const.CSM_GLOBAL_INDEX, const.USL_RESPONSE_CACHE_TTL, 60)))
+
+    async def get_cached_response(self, key: str, compute) -> CachedResponse:
+        """
+        Provides the cached response of a polled endpoint.
+
+        :param key: Endpoint name, see the CACHE_* keys
+        :param compute: Coroutine function returning the response when it is not cached
+        :return: The response with its ETag
+        """
+        return await self._response_cache.get(key, compute)
+
+    def invalidate_responses(self, *args, **kwargs) -> None:
+        """
+        Drops all cached responses, e.g. when the system configuration changes
+        """
+        self._response_cache.invalidate()
 
     async def _get_system_friendly_name(self) -> str:
         entries = await self._storage(ApplianceName).get(Query())
@@ -164,6 +196,7 @@ class UslService(ApplicationService):
         try:
             if bucket_name is not None:
                 Log.debug(f'Deleting bucket {bucket_name}')
+                self._forget_lyve_pilot_bucket(bucket_name)
                 await s3_bucket_service.delete_bucket(bucket_name, s3_credentials)
             if iam_user_name is not None:
                 Log.debug(f'Deleting IAM user {iam_user_name}')
@@ -233,10 +266,32 @@ class UslService(ApplicationService):
         Checks if bucket is enabled for Lyve Pilot
 
         Buckets enabled for Lyve Pilot contain tag {Key=udx,Value=enabled}
+        The verdict is cached for UDS.tag_cache_ttl seconds, unless the tags
+        could not be read.
         """
 
-        tags = await s3_cli.get_bucket_tagging(bucket)
-        return tags.get('udx', 'disabled') == 'enabled'
+        cached = self._lyve_pilot_buckets.get(bucket.name)
+        if cached is not None and cached[1] > time.monotonic():
+            return cached[0]
+        try:
+            tags = await s3_cli.get_bucket_tagging(bucket)
+        except ClientError as e:
+            # The bucket is checked again on the next listing
+            Log.warn(f'Tags of the bucket {bucket.name} are not read: {e}')
+            return False
+        enabled = tags.get('udx', 'disabled') == 'enabled'
+        self._lyve_pilot_buckets[bucket.name] = (enabled, time.monotonic() + self._tag_cache_ttl)
+        return enabled
+
+    def _forget_lyve_pilot_bucket(self, bucket_name: str) -> None:
+        """
+        Drops the cached Lyve Pilot verdict of the bucket, and the expired ones
+        """
+        self._lyve_pilot_buckets.pop(bucket_name, None)
+        now = time.monotonic()
+        for name, (_, expiry) in list(self._lyve_pilot_buckets.items()):
+            if expiry <= now:
+                del self._lyve_pilot_buckets[name]
 
     async def _tag_lyve_pilot_bucket(self, s3_credentials: S3Credentials,
                                      s3_bucket_service: S3BucketService, bucket_name: str) -> None:
@@ -244,6 +299,7 @@ class UslService(ApplicationService):
         Puts the Lyve Pilot tag on a specified bucket
         """
         bucket_tags = {"udx": "enabled"}
+        self._forget_lyve_pilot_bucket(bucket_name)
         await s3_bucket_service.put_bucket_tagging(s3_credentials, bucket_name, bucket_tags)
         Log.info(f'Lyve Pilot bucket {bucket_name} is taggged with {bucket_tags}')
 
@@ -273,19 +329,19 @@ class UslService(ApplicationService):
         Log.info(
             f'Lyve Pilot policy is set for bucket {bucket_name} and IAM user (arn) {iam_user_arn}')
 
-    async def _get_volume_name(self, bucket_name: str) -> str:
-        return await self._get_system_friendly_name() + ": " + bucket_name
+    def _get_volume_name(self, friendly_name: str, bucket_name: str) -> str:
+        return friendly_name + ": " + bucket_name
 
     def _get_volume_uuid(self, bucket_name: str) -> UUID:
         """Generates the CORTX volume (bucket) UUID from CORTX device UUID and bucket name."""
         return uuid5(self._device_uuid, bucket_name)
 
-    async def _format_bucket_as_volume(self, bucket: Bucket) -> Volume:
+    def _format_bucket_as_volume(self, bucket: Bucket, friendly_name: str,
+                                 capacity_details: Dict[str, Any]) -> Volume:
         bucket_name = bucket.name
-        volume_name = await self._get_volume_name(bucket_name)
+        volume_name = self._get_volume_name(friendly_name, bucket_name)
         device_uuid = self._device_uuid
         volume_uuid = self._get_volume_uuid(bucket_name)
-        capacity_details = await StorageCapacityService(self._provisioner).get_capacity_details()
         capacity_size = capacity_details[const.SIZE]
         capacity_used = capacity_details[const.USED]
         return Volume.instantiate(
@@ -297,11 +353,23 @@ class UslService(ApplicationService):
         s3_client = self._s3plugin.get_s3_client(
             access_key_id, secret_access_key, CsmS3ConfigurationFactory.get_s3_connection_config()
         )
+        buckets = list(await s3_client.get_all_buckets())
+        semaphore = asyncio.Semaphore(self._tag_check_concurrency)
+
+        async def _is_enabled(bucket):
+            async with semaphore:
+                return await self._is_bucket_lyve_pilot_enabled(s3_client, bucket)
+
+        enabled = await asyncio.gather(*(_is_enabled(bucket) for bucket in buckets))
+        lyve_pilot_buckets = [bucket for bucket, on in zip(buckets, enabled) if on]
         volumes = {}
-        for bucket in await s3_client.get_all_buckets():
-            if not await self._is_bucket_lyve_pilot_enabled(s3_client, bucket):
-                continue
-            volume = await self._format_bucket_as_volume(bucket)
+        if not lyve_pilot_buckets:
+            return volumes
+        # The friendly name and the capacity are the same for all the volumes
+        friendly_name = await self._get_system_friendly_name()
+        capacity_details = await StorageCapacityService(self._provisioner).get_capacity_details()
+        for bucket in lyve_pilot_buckets:
+            volume = self._format_bucket_as_volume(bucket, friendly_name, capacity_details)
             volumes[volume.uuid] = volume
         return volumes
 
@@ -604,6 +672,7 @@ class UslService(ApplicationService):
             reason = 'Domain certificate already exists'
             raise CsmPermissionDenied(reason)
         await self._domain_certificate_manager.create_private_key_file(overwrite=False)
+        self._response_cache.invalidate(self.CACHE_CERTIFICATES)
         private_key_bytes = await self._domain_certificate_manager.get_private_key_bytes()
         if private_key_bytes is None:
             reason = 'Could not read USL private key'
@@ -626,6 +695,8 @@ class UslService(ApplicationService):
             reason = 'Could not update USL certificate'
             Log.error(f'{reason}: {e}')
             raise CsmInternalError(reason)
+        finally:
+            self._response_cache.invalidate(self.CACHE_CERTIFICATES)
 
     async def delete_system_certificates(self) -> None:
         """
@@ -633,6 +704,7 @@ class UslService(ApplicationService):
         """
 
         deleted = await self._domain_certificate_manager.delete_key_material()
+        self._response_cache.invalidate(self.CACHE_CERTIFICATES)
         if not deleted:
             reason = 'Failed to delete the domain certificate'
             raise CsmPermissionDenied(reason)
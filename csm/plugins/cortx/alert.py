@@ -17,15 +17,16 @@ import json
 import os
 import time
 import asyncio
-from csm.common.comm import AmqpComm
+from csm.common.comm import AmqpComm, AsyncAmqpComm
 from csm.common.errors import CsmError
 from cortx.utils.log import Log
-from csm.common.payload import Payload, Json, JsonMessage, Dict
+from csm.common.payload import Json, JsonMessage, CompiledMapping
 from csm.common.plugin import CsmPlugin
 from csm.core.blogic import const
 from marshmallow import Schema, fields, ValidationError
 from concurrent.futures import ThreadPoolExecutor
 from csm.common.services import Service
+from csm.common.conf import Conf
 try:
     from cortx.utils.ha.dm.decision_maker import DecisionMaker
 except ModuleNotFoundError:
@@ -110,32 +111,145 @@ class AlertPlugin(CsmPlugin):
         super().__init__()
         try:
             self.comm_client = AmqpComm()
+            self.async_comm_client = None
             self.monitor_callback = None
+            self.monitor_async_callback = None
+            self.monitor_batch_callback = None
             self.health_plugin = None
+            self.batch_size = int(Conf.get(const.CSM_GLOBAL_INDEX, \
+                    const.ALERT_BATCH_SIZE, 1))
+            self.batch_linger = int(Conf.get(const.CSM_GLOBAL_INDEX, \
+                    const.ALERT_BATCH_LINGER, 200)) / 1000
+            self.prefetch_count = int(Conf.get(const.CSM_GLOBAL_INDEX, \
+                    const.ALERT_PREFETCH_COUNT, 16))
             self.mapping_dict = Json(const.ALERT_MAPPING_TABLE).load()
+            self._compile_mapping()
+            self._alert_validator = AlertSchemaValidator()
             self.decision_maker_service = DecisionMakerService()
         except Exception as e:
             Log.exception(e)
 
-    def init(self, callback_fn, health_plugin):
+    def init(self, callback_fn, health_plugin, batch_callback_fn=None):
         """
         Establish connection with the RMQ Server.
         AlertPlugin's _listen method acts as the thread function.
         Parameters -
         1. callback_fn :- This parameter specifies the name AlertMonitor 
            class function to which plugin will send the alerts as JSON string.  
+        2. batch_callback_fn :- AlertMonitor class function to which plugin
+           will send the list of alerts when batching is enabled.
         """
         try:
             self.monitor_callback = callback_fn
+            self.monitor_batch_callback = batch_callback_fn
             self.health_plugin = health_plugin
             self.comm_client.init()
         except Exception as e:
             Log.error(f"Error occured while calling alert plugin init. {e}")
 
+    async def init_async(self, callback_fn, health_plugin):
+        """
+        Establish connection with the RMQ Server for consuming the alerts
+        inside the event loop.
+        Parameters -
+        1. callback_fn :- AlertMonitor class coroutine function to which
+           plugin will send the alerts.
+        """
+        try:
+            self.monitor_async_callback = callback_fn
+            self.health_plugin = health_plugin
+            self.async_comm_client = AsyncAmqpComm(self.prefetch_count)
+            await self.async_comm_client.init()
+        except Exception as e:
+            Log.error(f"Error occured while calling alert plugin async init. {e}")
+
+    async def listen_async(self):
+        """
+        Registers the consumer. The alerts are then consumed by the event loop.
+        """
+        try:
+            await self.async_comm_client.recv(self._plugin_async_callback,
+                                              key_fn=self._message_key)
+        except Exception as e:
+            Log.warn(e)
+
+    async def stop_async(self):
+        """
+        Stops consuming and waits for the alerts being processed.
+        """
+        if self.async_comm_client:
+            await self.async_comm_client.stop()
+
+    def _message_key(self, body):
+        """
+        Parses the message and returns the key used by the async comm to
+        keep the order of messages of the same resource.
+        Alerts are keyed by the resource info, actuator responses share one key.
+        :param body: Actual alert JSON string
+        :return: Tuple of the key and the (body, parsed message) pair
+        """
+        sensor_queue_msg = JsonMessage(body).load()
+        title = sensor_queue_msg.get("title", "").lower()
+        key = title
+        if "sensor" in title:
+            info = sensor_queue_msg.get(const.ALERT_MESSAGE, {}).get(\
+                const.ALERT_SENSOR_TYPE, {}).get(const.ALERT_INFO, {})
+            key = tuple(str(info.get(field, "")) for field in (
+                const.ALERT_SITE_ID, const.ALERT_RACK_ID, const.ALERT_NODE_ID,
+                const.ALERT_CLUSTER_ID, const.ALERT_RESOURCE_ID,
+                const.ALERT_RESOURCE_TYPE))
+        return key, (body, sensor_queue_msg)
+
+    async def _plugin_async_callback(self, message):
+        """
+        Counterpart of _plugin_callback for the async comm.
+        Actuator responses are passed to the health plugin and acknowledged.
+        Alerts are acknowledged if AlertMonitor returns True or if they fail
+        the validation.
+        :param message: Tuple of the alert JSON string and the parsed alert
+        :return: True if the message is to be acknowledged.
+        """
+        body, sensor_queue_msg = message
+        Log.info(f"Message on sensor queue: {sensor_queue_msg}")
+        title = sensor_queue_msg.get("title", "")
+        if "actuator" in title.lower():
+            self.health_plugin.health_plugin_callback(body)
+            return True
+        status = False
+        if "sensor" in title.lower() and self.monitor_async_callback:
+            try:
+                alert = self._convert_to_csm_schema(sensor_queue_msg)
+                alert_data = self._alert_validator.load(alert, unknown='EXCLUDE')
+                Log.debug(f"Alert validated : {alert_data}")
+                status = await self.monitor_async_callback(alert_data)
+                if self.decision_maker_service and status:
+                    await self.decision_maker_service.decision_maker_callback_async(\
+                        sensor_queue_msg)
+            except ValidationError as ve:
+                Log.warn(f"Acknowledge incase of validation error {ve}")
+                status = True
+            except Exception as e:
+                Log.warn(f"Error occured during processing alerts: {e}")
+        return status
+
+    def _compile_mapping(self):
+        """
+        Compiles the common and per resource type mappings of the alert
+        mapping table, so that they are not parsed for every alert.
+        """
+        self._common_mapping = CompiledMapping(self.mapping_dict.get(const.COMMON, {}))
+        self._resource_mappings = {
+            resource_type: CompiledMapping(mapping)
+            for resource_type, mapping in self.mapping_dict.items()
+            if resource_type != const.COMMON and mapping}
+
     def process_request(self, **kwargs):
         for key, value in kwargs.items():
             if key == const.CSM_ALERT_CMD and value.strip() == 'listen':
-                self._listen()
+                if self.monitor_batch_callback and self.batch_size > 1:
+                    self._listen_batch()
+                else:
+                    self._listen()
 
     def _plugin_callback(self, message):
         """
@@ -167,10 +281,9 @@ class AlertPlugin(CsmPlugin):
         elif "sensor" in title.lower():
             try:
                 if self.monitor_callback:
-                    alert = self._convert_to_csm_schema(message)
+                    alert = self._convert_to_csm_schema(sensor_queue_msg)
                     """Validating Schema using marshmallow"""
-                    alert_validator = AlertSchemaValidator()
-                    alert_data = alert_validator.load(alert,  unknown='EXCLUDE')
+                    alert_data = self._alert_validator.load(alert,  unknown='EXCLUDE')
                     Log.debug(f"Alert validated : {alert_data}")
                     status = self.monitor_callback(alert_data)
                     """
@@ -191,6 +304,65 @@ class AlertPlugin(CsmPlugin):
             Log.debug(f"Marking sensor response as acknowleged. status: {status}")
             self.comm_client.acknowledge()
 
+    def _plugin_batch_callback(self, messages):
+        """
+        This is the callback method on which we will receive a batch of
+        messages from Comm class when batching is enabled.
+        1. Actuator responses are passed to the health plugin one by one.
+        2. Sensor messages are converted and validated, invalid ones are
+           dropped the same way they are acknowledged in non-batch mode.
+        3. Valid alerts are sent to AlertMonitor in a single call and
+           the whole batch is acknowledged with one multiple-ack. If the
+           monitor fails to process the batch it is rejected so that RMQ
+           re-delivers it.
+        Parameters -
+        1. messages - List of JSON strings received from the queue
+        """
+        alerts = []
+        sensor_queue_msgs = []
+        for message in messages:
+            try:
+                sensor_queue_msg = JsonMessage(message).load()
+                title = sensor_queue_msg.get("title", "")
+                if "actuator" in title.lower():
+                    self.health_plugin.health_plugin_callback(message)
+                elif "sensor" in title.lower():
+                    alert = self._convert_to_csm_schema(sensor_queue_msg)
+                    alert_data = self._alert_validator.load(alert, unknown='EXCLUDE')
+                    alerts.append(alert_data)
+                    sensor_queue_msgs.append(sensor_queue_msg)
+            except ValidationError as ve:
+                Log.warn(f"Dropping alert from batch incase of validation error {ve}")
+            except Exception as e:
+                Log.warn(f"Error occured during processing alerts: {e}")
+        status = True
+        if alerts:
+            try:
+                status = self.monitor_batch_callback(alerts)
+            except Exception as e:
+                Log.warn(f"Error occured during processing alerts batch: {e}")
+                status = False
+        if status:
+            if self.decision_maker_service:
+                for sensor_queue_msg in sensor_queue_msgs:
+                    self.decision_maker_service.decision_maker_callback(sensor_queue_msg)
+            Log.debug(f"Marking batch of {len(messages)} messages as acknowleged.")
+            self.comm_client.acknowledge(multiple=True)
+        else:
+            Log.warn(f"Rejecting batch of {len(messages)} messages.")
+            self.comm_client.reject(multiple=True)
+
+    def _listen_batch(self):
+        """
+        This is thread function.
+        Same as _listen but the messages are consumed in batches.
+        """
+        try:
+            self.comm_client.recv_batch(self._plugin_batch_callback, \
+                    self.batch_size, self.batch_linger)
+        except Exception as e:
+            Log.warn(e)
+
     def _listen(self):
         """
         This is thread function.
@@ -211,12 +383,15 @@ class AlertPlugin(CsmPlugin):
     def _convert_to_csm_schema(self, message):
         """
         Parsing the alert JSON to create the csm schema
+        :param message: Alert JSON string or the already parsed alert dict
         """
         Log.debug(f"Convert to csm schema:{message}")
         csm_schema = {}
         try:
-            json_msg_obj = JsonMessage(message)
-            msg_body = json_msg_obj.load()
+            if isinstance(message, (str, bytes)):
+                msg_body = JsonMessage(message).load()
+            else:
+                msg_body = message
             sub_body = msg_body.get(const.ALERT_MESSAGE, {}).get(
                 const.ALERT_SENSOR_TYPE, {})
             resource_type = sub_body.get("info", {}).get\
@@ -233,15 +408,10 @@ class AlertPlugin(CsmPlugin):
                 """
                 module_type = res_split[len(res_split) - 1]
                 """ Convert  the SSPL Schema to CSM Schema. """
-                input_alert_payload = Payload(JsonMessage(message))
-                csm_alert_payload = Payload(Dict(dict()))
-                input_alert_payload.convert(self.mapping_dict.get\
-                        (const.COMMON), csm_alert_payload)
-                resource_mapping = self.mapping_dict.get(resource_type, "")
+                csm_schema = self._common_mapping.convert(msg_body)
+                resource_mapping = self._resource_mappings.get(resource_type)
                 if resource_mapping:
-                    input_alert_payload.convert(resource_mapping, csm_alert_payload)
-                csm_alert_payload.dump()
-                csm_schema = csm_alert_payload.load()
+                    resource_mapping.convert(msg_body, csm_schema)
                 obj_extended_info = JsonMessage(csm_schema[const.ALERT_EXTENDED_INFO])
                 """
                 Fetching the health information from the alert.
@@ -371,6 +541,26 @@ class DecisionMakerService(Service):
     def decision_maker_callback(self, alert_data):
         self._transmit_alerts_info(alert_data)
 
+    async def decision_maker_callback_async(self, alert_data):
+        """
+        Counterpart of decision_maker_callback for callers running in the
+        event loop.
+        """
+        error = ""
+        if self._decision_maker:
+            for count in range(0, const.ALERT_RETRY_COUNT):
+                try:
+                    Log.debug(f"Sending Alert to Decision Maker for data {alert_data}")
+                    await self._decision_maker.handle_alert(alert_data)
+                except Exception as e:
+                    Log.debug(f"retrying decision_maker {count} : {e}")
+                    error = f"{e}"
+                    await asyncio.sleep(2**count)
+                    continue
+                break
+            else:
+                Log.error(f"Decision Maker Failed {error} for data {alert_data}")
+
     def _transmit_alerts_info(self, alert_data):
         """
         This Method will send the alert to HA system for System check.
@@ -15,7 +15,9 @@
 
 import json
 import os
+import random
 import time
+from threading import Event, Lock
 from csm.common.comm import AmqpActuatorComm
 from csm.common.errors import CsmError
 from cortx.utils.log import Log
@@ -27,6 +29,162 @@ from datetime import datetime
 import uuid
 from csm.common.conf import Conf
 
+class ActuatorRequest:
+    """
+    Polling state of the actuator request of one resource
+    """
+
+    def __init__(self, resource, expected_responses, due):
+        self.resource = resource
+        self.expected_responses = expected_responses
+        self.due = due
+        self.failures = 0
+        self.uuid = None
+        self.deadline = None
+        self.responses = 0
+        self.polled = False
+
+class ActuatorRequestScheduler:
+    """
+    Schedules the actuator requests sent by the health plugin.
+    Every resource is polled once per interval, spread by a random jitter so
+    the requests do not go out in bursts. Responses are correlated to the
+    pending request by the uuid of the message header. A request which gets no
+    response within the timeout is retried with an exponential backoff.
+    The first round callback is called once every resource has been either
+    answered or timed out, so a lost response can not stall it.
+    """
+
+    def __init__(self, resources, send_fn, interval, jitter, timeout,
+                 max_backoff, first_round_fn=None):
+        """
+        :param resources: Dict of resource to the number of expected responses
+        :param send_fn: Function sending the request of a resource,
+            called with the resource and the request uuid
+        :param interval: Polling interval in seconds, 0 polls only once
+        :param jitter: Maximum random delay added to every schedule, in seconds
+        :param timeout: Time to wait for the responses of a request, in seconds
+        :param max_backoff: Maximum delay before retrying a failed resource
+        :param first_round_fn: Called once after the first round of requests
+        """
+        self._send_fn = send_fn
+        self._interval = interval
+        self._jitter = jitter
+        self._timeout = timeout
+        self._max_backoff = max_backoff
+        self._first_round_fn = first_round_fn
+        self._first_round_done = False
+        self._lock = Lock()
+        self._stop_event = Event()
+        self._pending = {}
+        now = time.monotonic()
+        self._requests = [ActuatorRequest(resource, expected,
+                                          now + self._random_delay())
+                          for resource, expected in resources.items()]
+
+    def _random_delay(self):
+        return random.uniform(0, self._jitter) if self._jitter > 0 else 0
+
+    def _schedule_next(self, request, now):
+        request.uuid = None
+        request.deadline = None
+        request.polled = True
+        if request.failures:
+            backoff = self._timeout * 2 ** (request.failures - 1)
+            request.due = now + min(backoff, self._max_backoff) + \
+                self._random_delay()
+        elif self._interval > 0:
+            request.due = now + self._interval + self._random_delay()
+        else:
+            request.due = None
+
+    def on_response(self, request_uuid):
+        """
+        Accounts a response to a pending request
+        :param request_uuid: uuid from the header of the response
+        :return: True if the response matches a pending request
+        """
+        with self._lock:
+            request = self._pending.get(request_uuid)
+            if request is None:
+                return False
+            request.responses += 1
+            if request.responses >= request.expected_responses:
+                del self._pending[request_uuid]
+                request.failures = 0
+                self._schedule_next(request, time.monotonic())
+            first_round_done = self._check_first_round()
+        if first_round_done:
+            self._first_round_fn()
+        return True
+
+    def _expire(self, now):
+        for request_uuid, request in list(self._pending.items()):
+            if request.deadline > now:
+                continue
+            del self._pending[request_uuid]
+            if request.responses:
+                """
+                Some of the nodes answered, the resource is not failing.
+                """
+                request.failures = 0
+            else:
+                request.failures += 1
+                Log.warn(f"Actuator request for {request.resource} timed out. "
+                         f"Failures: {request.failures}")
+            self._schedule_next(request, now)
+
+    def _check_first_round(self):
+        if self._first_round_done or not self._first_round_fn:
+            return False
+        if all(request.polled for request in self._requests):
+            self._first_round_done = True
+            return True
+        return False
+
+    def _next_wakeup(self, now):
+        times = [request.due for request in self._requests
+                 if request.uuid is None and request.due is not None]
+        times.extend(request.deadline for request in self._pending.values())
+        return min(times) - now if times else None
+
+    def run(self):
+        """
+        Sends the due requests until stopped. Blocks the calling thread.
+        """
+        while not self._stop_event.is_set():
+            now = time.monotonic()
+            with self._lock:
+                self._expire(now)
+                due = [request for request in self._requests
+                       if request.uuid is None and request.due is not None
+                       and request.due <= now]
+                for request in due:
+                    request.uuid = str(uuid.uuid1())
+                    request.deadline = now + self._timeout
+                    request.responses = 0
+                    self._pending[request.uuid] = request
+            for request in due:
+                try:
+                    self._send_fn(request.resource, request.uuid)
+                    Log.debug(f"Sent actuator request for : {request.resource}")
+                except Exception as ex:
+                    Log.warn(f"Sending actuator request for {request.resource} "
+                             f"failed. Reason : {ex}")
+                    with self._lock:
+                        if self._pending.pop(request.uuid, None):
+                            request.failures += 1
+                            self._schedule_next(request, time.monotonic())
+            with self._lock:
+                first_round_done = self._check_first_round()
+                wait = self._next_wakeup(time.monotonic())
+            if first_round_done:
+                self._first_round_fn()
+            self._stop_event.wait(None if wait is None else max(wait, 0))
+
+    def stop(self):
+        self._stop_event.set()
+
 class HealthPlugin(CsmPlugin):
     """
     Health Plugin is responsible for listening and sending on the comm channel.
@@ -48,54 +206,57 @@ class HealthPlugin(CsmPlugin):
                     'HEALTH.node_actuator_request')
             self._storage_request_dict = Json(storage_request_path).load()
             self._node_request_dict = Json(node_request_path).load()
-            self._no_of_request = 0
-            self._no_of_responses = 0
+            self._poll_interval = int(Conf.get(const.CSM_GLOBAL_INDEX,
+                    const.HEALTH_POLL_INTERVAL, 600))
+            self._poll_jitter = int(Conf.get(const.CSM_GLOBAL_INDEX,
+                    const.HEALTH_POLL_JITTER, 10))
+            self._request_timeout = int(Conf.get(const.CSM_GLOBAL_INDEX,
+                    const.HEALTH_REQUEST_TIMEOUT, 60))
+            self._max_backoff = int(Conf.get(const.CSM_GLOBAL_INDEX,
+                    const.HEALTH_MAX_BACKOFF, 1800))
+            self._scheduler = None
         except Exception as e:
             Log.exception(e)
 
-    def _send_actuator_request_payload(self):
+    def _get_actuator_resources(self):
+        """
+        Returns the resources to poll with the number of expected responses.
+        Node requests are sent to both node1 and node2, so two responses are
+        expected for them.
+        """
+        resources = {}
+        for resource in const.ACTUATOR_REQUEST_LIST:
+            if resource.split(':')[0] == const.ENCLOSURE:
+                resources[resource] = 1
+            elif resource.split(':')[0] == const.NODE:
+                resources[resource] = 2
+        return resources
+
+    def _send_actuator_request(self, resource, request_uuid):
         today = datetime.now()
-        try:
-            for resource in const.ACTUATOR_REQUEST_LIST:
-                if resource.split(':')[0] == const.ENCLOSURE:
-                    self._send_encl_request(resource, today)
-                elif resource.split(':')[0] == const.NODE:
-                    self._send_node_request(resource, today)
-        except Exception as ex:
-            Log.warn(f"Sending actuator request failed. Reason : {ex}")
+        if resource.split(':')[0] == const.ENCLOSURE:
+            self._send_encl_request(resource, today, request_uuid)
+        elif resource.split(':')[0] == const.NODE:
+            self._send_node_request(resource, today, request_uuid)
 
-    def _send_encl_request(self, key, today):
-        try:
-            self._storage_request_dict[const.TIME] = str(today)
-            self._storage_request_dict[const.ALERT_MESSAGE][const.HEADER]\
-                    [const.UUID] = str(uuid.uuid1())
-            self._storage_request_dict[const.ALERT_MESSAGE][const.ACT_REQ_TYPE]\
-                    [const.STORAGE_ENCL][const.ENCL_REQ] = const.ENCL + str(key)
-            self.comm_client.send(self._storage_request_dict, \
-                    is_storage_request = True)
-            self._no_of_request+=1
-            Log.debug(f"Sent storage enclosure request for : {key}")
-        except Exception as ex:
-            Log.warn(f"Sending enclosure request failed. Reason : {ex}")
+    def _send_encl_request(self, key, today, request_uuid):
+        self._storage_request_dict[const.TIME] = str(today)
+        self._storage_request_dict[const.ALERT_MESSAGE][const.HEADER]\
+                [const.UUID] = request_uuid
+        self._storage_request_dict[const.ALERT_MESSAGE][const.ACT_REQ_TYPE]\
+                [const.STORAGE_ENCL][const.ENCL_REQ] = const.ENCL + str(key)
+        self.comm_client.send(self._storage_request_dict, \
+                is_storage_request = True)
 
-    def _send_node_request(self, key, today):
-        try:
-            self._node_request_dict[const.TIME] = str(today)
-            self._node_request_dict[const.ALERT_MESSAGE][const.HEADER]\
-                    [const.UUID] = str(uuid.uuid1())
-            self._node_request_dict[const.ALERT_MESSAGE][const.ACT_REQ_TYPE]\
-                    [const.NODE_CONTROLLER][const.NODE_REQ] = const.NODE_HW + \
-                    str(key)
-            self.comm_client.send(self._node_request_dict, \
-                    is_storage_request = False)
-            """
-            Incrementing number of request with 2 as we will be sending
-            requests for both node1 and node2.
-            """
-            self._no_of_request+=2
-            Log.debug(f"Sent node request for : {key}")
-        except Exception as ex:
-            Log.warn(f"Sending node request failed. Reason : {ex}")
+    def _send_node_request(self, key, today, request_uuid):
+        self._node_request_dict[const.TIME] = str(today)
+        self._node_request_dict[const.ALERT_MESSAGE][const.HEADER]\
+                [const.UUID] = request_uuid
+        self._node_request_dict[const.ALERT_MESSAGE][const.ACT_REQ_TYPE]\
+                [const.NODE_CONTROLLER][const.NODE_REQ] = const.NODE_HW + \
+                str(key)
+        self.comm_client.send(self._node_request_dict, \
+                is_storage_request = False)
 
     def init(self, callback_fn, db_update_callback_fn):
         """
@@ -125,20 +286,30 @@ class HealthPlugin(CsmPlugin):
         status = False
         if self.health_callback:
             try:
-                self._no_of_responses+=1
-                msg_body = self._parse_response(message)
+                response = JsonMessage(message).load() \
+                        if not isinstance(message, dict) else message
+                request_uuid = response.get(const.ALERT_MESSAGE, {})\
+                        .get(const.HEADER, {}).get(const.UUID)
+                msg_body = self._parse_response(response)
                 status = self.health_callback(msg_body)
-                if self._no_of_request == self._no_of_responses:
-                    self.db_update_callback()
+                if self._scheduler and \
+                        not self._scheduler.on_response(request_uuid):
+                    Log.debug(f"Uncorrelated actuator response: {request_uuid}")
             except Exception as e:
                 Log.warn(f"SOme issue occured in parsing and updating health: {e}")
         return status
 
-    def update_health_map_with_alert(self, alert):
+    def update_health_map_with_alert(self, alert, callback=None):
+        """
+        Converts the alert to a health update and applies it
+        :param alert: Alert dict
+        :param callback: Function applying the health update, health_callback
+            if not provided
+        """
         health_schema = {}
         try:
             health_schema = self._parse_alert(alert)
-            status = self.health_callback(health_schema)
+            status = (callback or self.health_callback)(health_schema)
             if status:
                 Log.debug(f"Updation of health map by alert successfull. status: {status}")
         except Exception as ex:
@@ -208,12 +379,10 @@ class HealthPlugin(CsmPlugin):
                 health = const.OK_HEALTH
         return health
 
-    def _parse_response(self, message):
+    def _parse_response(self, msg_body):
         health_schema = {}
         mapping_dict = {}
         try:
-            json_msg_obj = JsonMessage(message)
-            msg_body = json_msg_obj.load()
             Log.debug(f"Converting to health schema : {msg_body}")
             actuator_response =  msg_body.get(const.ALERT_MESSAGE, {}).get( \
                     "actuator_response_type", {})
@@ -221,7 +390,7 @@ class HealthPlugin(CsmPlugin):
                 info = actuator_response.get(const.ALERT_INFO, {})
                 resource_type = info.get(const.ALERT_RESOURCE_TYPE, "")
                 if resource_type:
-                    actuator_payload = Payload(JsonMessage(message))
+                    actuator_payload = Payload(Dict(msg_body))
                     health_payload = Payload(Dict(dict()))
                     mapping_dict = self._health_mapping_dict.get(const.COMMON)
                     mapping_key = mapping_dict.get(const.KEY, "")
@@ -288,18 +457,22 @@ class HealthPlugin(CsmPlugin):
         """
         This is thread function.
         This method sends the actuator request to RMQ for receiving health of
-        resources.
+        resources. It keeps polling the resources until the plugin is stopped.
         """
         try:
-            """
-            Create and send actuator request.
-            """
-            self._send_actuator_request_payload()
+            self._scheduler = ActuatorRequestScheduler(
+                self._get_actuator_resources(), self._send_actuator_request,
+                self._poll_interval, self._poll_jitter, self._request_timeout,
+                self._max_backoff, first_round_fn=self.db_update_callback)
+            self._scheduler.run()
         except Exception as e:
             Log.warn(e)
 
     def stop(self):
         """
-        This method will call comm's stop to stop consuming from the queue.
+        This method will stop the actuator request scheduler and call comm's
+        stop to stop consuming from the queue.
         """
+        if self._scheduler:
+            self._scheduler.stop()
         self.comm_client.stop()
@@ -16,11 +16,14 @@
 import asyncio
 import boto
 import boto3
+import threading
+import time
+from abc import ABC, abstractmethod
 from botocore.exceptions import ClientError
-from functools import partial
+from collections import OrderedDict
 from enum import Enum
 from concurrent.futures import ThreadPoolExecutor
-from typing import Union, List
+from typing import AsyncIterator, Union, List
 from boto.iam.connection import IAMConnection
 from boto.s3.connection import S3Connection, OrdinaryCallingFormat
 from boto.connection import DEFAULT_CA_CERTS_FILE
@@ -28,6 +31,7 @@ from boto import config as boto_config
 from http import HTTPStatus
 from cortx.utils.log import Log
 import json
+from csm.common.conf import Conf
 from csm.common.errors import CsmInternalError
 from csm.core.blogic import const
 from csm.core.data.models.s3 import (S3ConnectionConfig, IamAccount, ExtendedIamAccount,
@@ -37,18 +41,43 @@ from csm.core.data.models.s3 import (S3ConnectionConfig, IamAccount, ExtendedIam
                                      IamAccessKeyLastUsed, IamErrors, IamError)
 
 
+# Error codes of the tagging requests on buckets without tags
+NO_TAG_SET_ERRORS = ('NoSuchTagSet', 'NoSuchTagSetError')
+
+
 class BaseClient:
     """
     Base class for IAM API operations.
+    The boto connections are not thread safe, so a client shared by the
+    threads of the executor keeps one connection per thread. The calls must
+    use the connection from the thread they run in.
     """
+    # The CA file is set in the global boto config, which is read while the
+    # connection is created, so the threads create their connections one by one
+    _boto_config_lock = threading.Lock()
 
     def __init__(self, access_key: str, secret_key: str, config: S3ConnectionConfig,
-                 loop=asyncio.get_event_loop(), session_token=None):
+                 loop=asyncio.get_event_loop(), session_token=None, executor=None):
         self._loop = loop
-        self._executor = ThreadPoolExecutor()
+        self._executor = executor or ThreadPoolExecutor()
         self._config = config
-        self.connection = self._create_boto_connection(access_key, secret_key,
-                                                       config, session_token)
+        self._credentials = (access_key, secret_key, session_token)
+        self._local = threading.local()
+        self._local.connection = self._create_boto_connection(access_key, secret_key,
+                                                              config, session_token)
+
+    @property
+    def connection(self):
+        """
+        Connection of the calling thread, created on first use
+        """
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            access_key, secret_key, session_token = self._credentials
+            connection = self._create_boto_connection(access_key, secret_key,
+                                                      self._config, session_token)
+            self._local.connection = connection
+        return connection
 
     def _create_boto_connection_object(self, **kwargs):
         raise NotImplementedError
@@ -67,20 +96,22 @@ class BaseClient:
         if config.ca_cert_file:
             ca_cert = config.ca_cert_file
 
-        if not boto_config.has_section('Boto'):
-            boto_config.add_section('Boto')
+        with self._boto_config_lock:
+            if not boto_config.has_section('Boto'):
+                boto_config.add_section('Boto')
 
-        boto_config.set('Boto', 'ca_certificates_file', ca_cert)
+            if boto_config.get('Boto', 'ca_certificates_file') != ca_cert:
+                boto_config.set('Boto', 'ca_certificates_file', ca_cert)
 
-        conn = self._create_boto_connection_object(aws_access_key_id=access_key,
-                                                   aws_secret_access_key=secret_key,
-                                                   host=config.host,
-                                                   port=config.port,
-                                                   is_secure=config.use_ssl,
-                                                   debug=(2 if config.debug else 0),
-                                                   validate_certs=config.verify_ssl_cert,
-                                                   security_token=session_token
-                                                   )
+            conn = self._create_boto_connection_object(aws_access_key_id=access_key,
+                                                       aws_secret_access_key=secret_key,
+                                                       host=config.host,
+                                                       port=config.port,
+                                                       is_secure=config.use_ssl,
+                                                       debug=(2 if config.debug else 0),
+                                                       validate_certs=config.verify_ssl_cert,
+                                                       security_token=session_token
+                                                       )
 
         if config.max_retries_num:
             conn.num_retries = config.max_retries_num
@@ -105,13 +136,14 @@ class BaseClient:
         Log.debug(f"Make query:action:{action}, params:{params}, "
                   f"path:{path}, verb:{verb}, list_marker:{list_marker}")
         def _execute():
-            return self.connection.make_request(action, params, path, verb)
+            # The response is read in the thread owning the connection
+            response = self.connection.make_request(action, params, path, verb)
+            return response.status, response.read()
 
         try:
-            response = await self._run_async(_execute)
-            body = response.read()
-            Log.debug('%s responded with %s status', self._config.host, response.status)
-            return (response.status, self._parse_body(body, list_marker))
+            status, body = await self._run_async(_execute)
+            Log.debug('%s responded with %s status', self._config.host, status)
+            return (status, self._parse_body(body, list_marker))
         except Exception as e:
             raise e  # TODO: create some custom exception for this?
 
@@ -701,7 +733,100 @@ class IamClient(BaseClient):
             return True
 
 
-class S3Client(BaseClient):
+class BulkDeleteMixin(ABC):
+    """
+    Empties buckets with multi-object delete requests.
+    The objects are listed page by page, every page being one batch of keys
+    deleted by a single request. The batches are deleted concurrently, while
+    the next pages are being listed. The clients provide the listing and the
+    deletion of one batch.
+    """
+
+    # Maximum number of keys of one multi-object delete request
+    DELETE_BATCH_SIZE = 1000
+
+    @abstractmethod
+    def _list_object_pages(self, bucket_name: str,
+                           batch_size: int) -> AsyncIterator[List[str]]:
+        """
+        Async generator yielding the keys of the objects of the bucket,
+        one list per page of at most batch_size keys
+        """
+        ...
+
+    @abstractmethod
+    async def _delete_objects(self, bucket_name: str, keys: List[str]) -> int:
+        """
+        Deletes a batch of objects
+        :returns: Number of deleted objects
+        """
+        ...
+
+    @staticmethod
+    def _delete_objects_error(errors: List[dict]) -> ClientError:
+        """
+        Converts the per key errors of a multi-object delete into a ClientError
+        """
+        error = errors[0]
+        code = error.get('Code', 'InternalError')
+        status = HTTPStatus.FORBIDDEN if code == 'AccessDenied' \
+            else HTTPStatus.INTERNAL_SERVER_ERROR
+        return ClientError({
+            'Error': {
+                'Code': code,
+                'Message': f"{len(errors)} objects are not deleted, "
+                           f"{error.get('Key')}: {error.get('Message', '')}"
+            },
+            'ResponseMetadata': {'HTTPStatusCode': status}
+        }, 'DeleteObjects')
+
+    @Log.trace_method(Log.DEBUG)
+    async def empty_bucket(self, bucket_name: str, batch_size: int = DELETE_BATCH_SIZE,
+                           concurrency: int = 4, progress=None) -> int:
+        """
+        Deletes all the objects of the bucket.
+
+        :param bucket_name: s3 bucket name
+        :param batch_size: Number of objects deleted by one request, at most 1000
+        :param concurrency: Number of batches deleted at once
+        :param progress: Function called with the number of objects of every
+                         deleted batch
+        :returns: Number of deleted objects
+        """
+        batch_size = max(1, min(batch_size, self.DELETE_BATCH_SIZE))
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+        pending = set()
+        deleted = 0
+
+        async def _delete(keys):
+            nonlocal deleted
+            try:
+                count = await self._delete_objects(bucket_name, keys)
+            finally:
+                semaphore.release()
+            deleted += count
+            if progress is not None:
+                progress(count)
+
+        try:
+            async for keys in self._list_object_pages(bucket_name, batch_size):
+                await semaphore.acquire()
+                # Stop listing as soon as a batch fails
+                for task in [task for task in pending if task.done()]:
+                    pending.discard(task)
+                    task.result()
+                pending.add(asyncio.ensure_future(_delete(keys)))
+            if pending:
+                await asyncio.gather(*pending)
+        except BaseException:
+            for task in pending:
+                task.cancel()
+            raise
+        Log.debug(f"Deleted {deleted} objects of the bucket {bucket_name}")
+        return deleted
+
+
+class S3Client(BulkDeleteMixin, BaseClient):
     """
     Class represents S3 server connection that manages buckets
     """
@@ -712,12 +837,23 @@ class S3Client(BaseClient):
         is_secure = kwargs.get('is_secure', False)
         proto = 'https' if is_secure else 'http'
         url = f"{proto}://{kwargs.get('host', 'localhost')}:{kwargs.get('port', '80')}"
-        s3 = boto3.resource(service_name='s3', endpoint_url=url,
-                            aws_access_key_id=kwargs['aws_access_key_id'],
-                            aws_secret_access_key=kwargs['aws_secret_access_key'],
-                            aws_session_token=kwargs["security_token"])
+        # Neither the default boto3 session nor its resources are thread safe
+        s3 = boto3.session.Session().resource(
+            service_name='s3', endpoint_url=url,
+            aws_access_key_id=kwargs['aws_access_key_id'],
+            aws_secret_access_key=kwargs['aws_secret_access_key'],
+            aws_session_token=kwargs["security_token"])
         return s3
 
+    async def _run_client(self, operation: str, **kwargs):
+        """
+        Runs an operation of the low level client in the executor
+        """
+        def _run():
+            return getattr(self.connection.meta.client, operation)(**kwargs)
+
+        return await self._loop.run_in_executor(self._executor, _run)
+
     @Log.trace_method(Log.DEBUG)
     async def create_bucket(self, bucket_name):
         """
@@ -726,9 +862,8 @@ class S3Client(BaseClient):
         :returns: S3.Bucket
         """
         Log.debug(f"create bucket: {bucket_name}")
-        return await self._loop.run_in_executor(self._executor,
-                                                partial(self.connection.create_bucket,
-                                                        Bucket=bucket_name))
+        return await self._loop.run_in_executor(
+            self._executor, lambda: self.connection.create_bucket(Bucket=bucket_name))
 
     @Log.trace_method(Log.DEBUG)
     async def get_bucket(self, bucket_name):
@@ -736,43 +871,74 @@ class S3Client(BaseClient):
         Checks if a bucket with a specified name exists and returns it
         """
         Log.debug(f"get bucket: {bucket_name}")
-        bucket = self.connection.Bucket(bucket_name)
+        def _run():
+            self.connection.meta.client.head_bucket(Bucket=bucket_name)
+            return self.connection.Bucket(bucket_name)
+
         try:
-            coro = partial(self.connection.meta.client.head_bucket, Bucket=bucket_name)
-            await self._loop.run_in_executor(self._executor, coro)
+            return await self._loop.run_in_executor(self._executor, _run)
         except ClientError as e:
             if e.response['Error']['Code'] == '404':
-                bucket = None
-            else:
-                raise e
-
-        return bucket
+                return None
+            raise e
+
+    async def _list_object_pages(self, bucket_name: str, batch_size: int):
+        params = {'Bucket': bucket_name, 'MaxKeys': batch_size}
+        while True:
+            page = await self._run_client('list_objects', **params)
+            keys = [obj['Key'] for obj in page.get('Contents', [])]
+            if keys:
+                yield keys
+            if not page.get('IsTruncated') or not keys:
+                return
+            params['Marker'] = page.get('NextMarker') or keys[-1]
+
+    async def _delete_objects(self, bucket_name: str, keys: List[str]) -> int:
+        delete = {'Objects': [{'Key': key} for key in keys], 'Quiet': True}
+        response = await self._run_client('delete_objects', Bucket=bucket_name,
+                                          Delete=delete)
+        errors = response.get('Errors')
+        if errors:
+            raise self._delete_objects_error(errors)
+        return len(keys)
 
     @Log.trace_method(Log.DEBUG)
-    async def delete_bucket(self, bucket_name: str):
+    async def delete_bucket(self, bucket_name: str, concurrency: int = 4, progress=None):
+        """
+        Deletes the bucket with all of its objects
+
+        :param bucket_name: s3 bucket name
+        :param concurrency: Number of object batches deleted at once
+        :param progress: Function called with the number of deleted objects
+        """
         Log.debug(f"delete bucket: {bucket_name}")
-        bucket = await self._loop.run_in_executor(self._executor, self.connection.Bucket, bucket_name)
         # NOTE: according to boto3 documentation all of the keys should be deleted before
         #  bucket deletion itself
-        for key in bucket.objects.all():
-            await self._loop.run_in_executor(self._executor, key.delete)
-
-        await self._loop.run_in_executor(self._executor, bucket.delete)
+        await self.empty_bucket(bucket_name, concurrency=concurrency, progress=progress)
+        await self._run_client('delete_bucket', Bucket=bucket_name)
 
     @Log.trace_method(Log.DEBUG)
     async def get_all_buckets(self):
         Log.debug(f"Get all buckets ")
-        return await self._loop.run_in_executor(self._executor, self.connection.buckets.all)
+        return await self._loop.run_in_executor(
+            self._executor, lambda: list(self.connection.buckets.all()))
 
     @Log.trace_method(Log.DEBUG)
     async def get_bucket_tagging(self, bucket):
         # When the tag_set is not available ClientError is raised
-        # Need to avoid that in order to iterate over tags for all available buckets
+        # A bucket without tags has no tags, the other errors are raised
         Log.debug(f"Get bucket tagging: {bucket}")
+        # Bucket objects are bound to the connection of another thread
+        bucket_name = getattr(bucket, 'name', bucket)
+        def _run():
+            tagging = self.connection.BucketTagging(bucket_name)
+            return tagging.tag_set
+
         try:
-            tagging = await self._loop.run_in_executor(self._executor, bucket.Tagging)
-            tags = tagging.tag_set
-        except ClientError:
+            tags = await self._loop.run_in_executor(self._executor, _run)
+        except ClientError as e:
+            if e.response['Error']['Code'] not in NO_TAG_SET_ERRORS:
+                raise
             tags = []
         # Tags are stored in form [{'Key': <key value>, 'Value' : <actual value>}, ...]
         # Convert to ordinary Python dict
@@ -841,10 +1007,47 @@ class S3Client(BaseClient):
         """
 
         Log.debug(f"Delete bucket tagging: {bucket_name}")
-        bucket = await self._loop.run_in_executor(self._executor,
-                                                  self.connection.BucketPolicy,
-                                                  bucket_name)
-        return await self._loop.run_in_executor(self._executor, bucket.delete)
+        return await self._run_client('delete_bucket_policy', Bucket=bucket_name)
+
+
+class S3ClientPool:
+    """
+    LRU cache of IAM and S3 clients with a time to live.
+    The clients are keyed by their type, credentials and endpoint, so the
+    services reuse the client of a session, and its open connections, instead
+    of creating one per call. An evicted client is not closed, as calls may
+    still be running on it; its connections go away with the client.
+    """
+
+    def __init__(self, size: int = 64, ttl: float = 300):
+        """
+        :param size: Maximum number of clients kept
+        :param ttl: Time in seconds a client is reused
+        """
+        self._size = size
+        self._ttl = ttl
+        self._clients = OrderedDict()
+
+    def get(self, key: tuple, factory):
+        """
+        Returns the client of the key, created by factory if there is none
+        :param key: Client type, credentials and endpoint
+        :param factory: Function creating a new client
+        """
+        now = time.monotonic()
+        entry = self._clients.get(key)
+        if entry is not None and entry[1] > now:
+            self._clients.move_to_end(key)
+            return entry[0]
+        client = factory()
+        self._clients[key] = (client, now + self._ttl)
+        self._clients.move_to_end(key)
+        while len(self._clients) > self._size:
+            self._clients.popitem(last=False)
+        return client
+
+    def clear(self):
+        self._clients.clear()
 
 
 class S3Plugin:
@@ -875,9 +1078,48 @@ class S3Plugin:
     the get_temp_credentials function, e.g.
         creds = await s3plugin.get_temp_credentials('login', 'pwd', connection_config=config)
     """
+    # The clients and the threads or the HTTP session running their calls
+    # are shared by all plugin instances
+    _executor = None
+    _clients = None
+    _session = None
+    _backend = None
+
     def __init__(self):
         Log.info('S3 plugin is loaded')
 
+    @classmethod
+    def _get_client(cls, client_cls, access_key, secret_key, connection_config,
+                    session_token=None):
+        if cls._clients is None:
+            cls._executor = ThreadPoolExecutor(max_workers=int(Conf.get(
+                const.CSM_GLOBAL_INDEX, const.S3_CLIENT_WORKERS, 8)))
+            cls._clients = S3ClientPool(
+                int(Conf.get(const.CSM_GLOBAL_INDEX, const.S3_CLIENT_POOL_SIZE, 64)),
+                float(Conf.get(const.CSM_GLOBAL_INDEX, const.S3_CLIENT_TTL, 300)))
+            cls._backend = Conf.get(const.CSM_GLOBAL_INDEX, const.S3_CLIENT_BACKEND,
+                                    const.S3_CLIENT_BACKEND_BOTO)
+        kwargs = {}
+        if cls._backend == const.S3_CLIENT_BACKEND_NATIVE:
+            # Imported here, the native clients are built on the boto ones
+            from csm.plugins.cortx import s3_native
+            client_cls = {
+                IamClient: s3_native.NativeIamClient,
+                S3Client: s3_native.NativeS3Client
+            }[client_cls]
+            if cls._session is None:
+                cls._session = s3_native.create_session(int(Conf.get(
+                    const.CSM_GLOBAL_INDEX, const.S3_CLIENT_CONNECTIONS, 100)))
+            kwargs['session'] = cls._session
+        key = (client_cls, access_key, secret_key, session_token,
+               connection_config.host, connection_config.port,
+               connection_config.use_ssl, connection_config.verify_ssl_cert,
+               connection_config.ca_cert_file, connection_config.debug,
+               connection_config.max_retries_num)
+        return cls._clients.get(key, lambda: client_cls(
+            access_key, secret_key, connection_config, asyncio.get_event_loop(),
+            session_token, cls._executor, **kwargs))
+
     @Log.trace_method(Log.DEBUG, exclude_args=['access_key','secret_key','session_token'])
     def get_iam_client(self, access_key, secret_key, connection_config=None, session_token=None) -> IamClient:
         """
@@ -886,8 +1128,8 @@ class S3Plugin:
         if not connection_config:
             raise CsmInternalError('Connection configuration must be provided')
 
-        return IamClient(access_key, secret_key, connection_config,
-                         asyncio.get_event_loop(), session_token)
+        return self._get_client(IamClient, access_key, secret_key,
+                                connection_config, session_token)
 
     @Log.trace_method(Log.DEBUG, exclude_args=['access_key','secret_key','session_token'])
     def get_s3_client(self, access_key, secret_key, connection_config=None, session_token=None) -> S3Client:
@@ -897,8 +1139,23 @@ class S3Plugin:
         if not connection_config:
             raise CsmInternalError('Connection configuration must be provided')
 
-        return S3Client(access_key, secret_key, connection_config,
-                        asyncio.get_event_loop(), session_token)
+        return self._get_client(S3Client, access_key, secret_key,
+                                connection_config, session_token)
+
+    @classmethod
+    async def shutdown(cls, app=None):
+        """
+        Drops the cached clients and stops the threads running their calls
+        :param app: aiohttp application, when used as a shutdown handler
+        """
+        if cls._clients is not None:
+            cls._clients.clear()
+            cls._executor.shutdown(wait=False)
+            cls._clients = None
+            cls._executor = None
+        if cls._session is not None:
+            await cls._session.close()
+            cls._session = None
 
 
     @Log.trace_method(Log.DEBUG, exclude_args=['password'])
@@ -915,7 +1172,7 @@ class S3Plugin:
         :returns: An instance of IamTempCredentials object
         """
         Log.debug(f"Get temp credentials: {account_name}, user_name:{user_name}")
-        iamcli = IamClient('', '', connection_config, asyncio.get_event_loop())
+        iamcli = self._get_client(IamClient, '', '', connection_config)
         params = {
             'AccountName': account_name,
             'Password': password
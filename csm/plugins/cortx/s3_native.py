@@ -0,0 +1,475 @@
+# CORTX-CSM: CORTX Management web and CLI interface.
+# Copyright (c) 2020 Seagate Technology LLC and/or its Affiliates
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+
+"""
+S3 and IAM clients running on the event loop.
+The requests are sent with aiohttp, signed with AWS signature version 4, and
+the XML responses are parsed while they are being received. The clients
+provide the same operations as IamClient and S3Client of the boto backend.
+"""
+
+import asyncio
+import base64
+import hashlib
+import hmac
+import json
+import ssl
+from datetime import datetime, timezone
+from urllib.parse import quote
+from xml.etree.ElementTree import XMLPullParser
+from xml.sax.saxutils import escape
+
+import aiohttp
+from botocore.exceptions import ClientError
+from cortx.utils.log import Log
+from yarl import URL
+
+from csm.core.data.models.s3 import S3ConnectionConfig
+from csm.plugins.cortx.s3 import IamClient, BulkDeleteMixin, NO_TAG_SET_ERRORS
+
+IAM_API_VERSION = '2010-05-08'
+XML_CHUNK_SIZE = 16 * 1024
+EMPTY_SHA256 = hashlib.sha256(b'').hexdigest()
+
+
+def create_session(limit: int = 100) -> aiohttp.ClientSession:
+    """
+    Creates the HTTP session shared by the clients, which keeps the
+    connections to the S3 and IAM servers open
+    :param limit: Maximum number of open connections
+    """
+    return aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=limit))
+
+
+def _ssl_context(config: S3ConnectionConfig):
+    if not config.use_ssl:
+        return None
+    if not config.verify_ssl_cert:
+        return False
+    return ssl.create_default_context(cafile=config.ca_cert_file or None)
+
+
+def _quote(value: str, safe: str = '-_.~') -> str:
+    return quote(str(value), safe=safe)
+
+
+class SigV4Signer:
+    """
+    Signs requests with AWS signature version 4
+    """
+
+    ALGORITHM = 'AWS4-HMAC-SHA256'
+
+    def __init__(self, access_key: str, secret_key: str, session_token: str = None,
+                 service: str = 's3', region: str = 'us-east-1'):
+        self._access_key = access_key
+        self._secret_key = secret_key
+        self._session_token = session_token
+        self._service = service
+        self._region = region
+
+    @staticmethod
+    def _hmac(key: bytes, msg: str) -> bytes:
+        return hmac.new(key, msg.encode('utf-8'), hashlib.sha256).digest()
+
+    def _signing_key(self, date: str) -> bytes:
+        key = self._hmac(f'AWS4{self._secret_key}'.encode('utf-8'), date)
+        key = self._hmac(key, self._region)
+        key = self._hmac(key, self._service)
+        return self._hmac(key, 'aws4_request')
+
+    @staticmethod
+    def canonical_query(query: dict) -> str:
+        return '&'.join(f'{_quote(k)}={_quote(v)}' for k, v in sorted(query.items()))
+
+    def sign(self, method: str, path: str, query: dict, headers: dict,
+             payload_hash: str, now: datetime = None) -> dict:
+        """
+        Returns the headers with the date, the security token and the
+        signature added. All the given headers are signed.
+        :param method: HTTP method
+        :param path: URI encoded path
+        :param query: Query parameters
+        :param headers: Request headers, including Host
+        :param payload_hash: SHA256 hex digest of the body
+        :param now: Time of the request, the current time by default
+        """
+        now = now or datetime.now(timezone.utc)
+        amz_date = now.strftime('%Y%m%dT%H%M%SZ')
+        date = amz_date[:8]
+        headers = dict(headers)
+        headers['X-Amz-Date'] = amz_date
+        if self._session_token:
+            headers['X-Amz-Security-Token'] = self._session_token
+
+        canonical_headers = sorted(
+            (name.lower(), ' '.join(str(value).split()))
+            for name, value in headers.items())
+        signed_headers = ';'.join(name for name, _ in canonical_headers)
+        canonical_request = '\n'.join([
+            method,
+            path,
+            self.canonical_query(query),
+            ''.join(f'{name}:{value}\n' for name, value in canonical_headers),
+            signed_headers,
+            payload_hash])
+
+        scope = f'{date}/{self._region}/{self._service}/aws4_request'
+        string_to_sign = '\n'.join([
+            self.ALGORITHM, amz_date, scope,
+            hashlib.sha256(canonical_request.encode('utf-8')).hexdigest()])
+        signature = hmac.new(self._signing_key(date), string_to_sign.encode('utf-8'),
+                             hashlib.sha256).hexdigest()
+        headers['Authorization'] = (
+            f'{self.ALGORITHM} Credential={self._access_key}/{scope}, '
+            f'SignedHeaders={signed_headers}, Signature={signature}')
+        return headers
+
+
+async def _iter_xml(response: aiohttp.ClientResponse):
+    """
+    Yields the ('start'|'end', element) events of an XML response as its
+    chunks are received. Namespaces are stripped from the element tags.
+    """
+    parser = XMLPullParser(events=('start', 'end'))
+    async for chunk in response.content.iter_chunked(XML_CHUNK_SIZE):
+        parser.feed(chunk)
+        for event, elem in parser.read_events():
+            elem.tag = elem.tag.rpartition('}')[2]
+            yield event, elem
+    parser.close()
+    for event, elem in parser.read_events():
+        elem.tag = elem.tag.rpartition('}')[2]
+        yield event, elem
+
+
+async def parse_xml(response: aiohttp.ClientResponse, list_marker: str = 'Set',
+                    item_marker=('member', 'item')) -> dict:
+    """
+    Parses an XML response to the same structure as boto.jsonresponse:
+    elements become dicts, text elements strings, and elements whose name
+    ends with list_marker lists of their item_marker children.
+    """
+    root = {}
+    stack = [root]
+    async for event, elem in _iter_xml(response):
+        parent = stack[-1]
+        if event == 'start':
+            if elem.tag.endswith(list_marker):
+                node = []
+                if isinstance(parent, dict):
+                    parent[elem.tag] = node
+            elif isinstance(parent, list):
+                node = {} if elem.tag in item_marker else parent
+                if node is not parent:
+                    parent.append(node)
+            else:
+                node = {}
+                parent[elem.tag] = node
+            stack.append(node)
+            continue
+
+        node = stack.pop()
+        parent = stack[-1]
+        text = (elem.text or '').strip()
+        if isinstance(node, list):
+            if node is not parent:
+                node[:] = [e for e in node if not (isinstance(e, dict) and not e)]
+        elif text:
+            if isinstance(parent, dict):
+                parent[elem.tag] = text
+            else:
+                parent.append(text)
+        elem.clear()
+    return root
+
+
+class NativeIamClient(IamClient):
+    """
+    IamClient sending the IAM queries with aiohttp
+    """
+
+    def __init__(self, access_key: str, secret_key: str, config: S3ConnectionConfig,
+                 loop=None, session_token=None, executor=None, session=None):
+        self._session = session
+        super().__init__(access_key, secret_key, config,
+                         loop or asyncio.get_event_loop(), session_token, executor)
+
+    def _create_boto_connection(self, access_key, secret_key, config: S3ConnectionConfig,
+                                session_token=None):
+        scheme = 'https' if config.use_ssl else 'http'
+        self._host = f'{config.host}:{config.port}'
+        self._url = f'{scheme}://{self._host}'
+        self._ssl = _ssl_context(config)
+        return SigV4Signer(access_key, secret_key, session_token, service='iam')
+
+    async def _query_conn(self, action, params, path, verb, list_marker=None):
+        Log.debug(f"Make query:action:{action}, params:{list(params)}, "
+                  f"path:{path}, verb:{verb}, list_marker:{list_marker}")
+        query = {'Action': action, 'Version': IAM_API_VERSION, **params}
+        body = SigV4Signer.canonical_query(query).encode('utf-8')
+        headers = {
+            'Host': self._host,
+            'Content-Type': 'application/x-www-form-urlencoded; charset=UTF-8'
+        }
+        retries = self._config.max_retries_num or 0
+        for attempt in range(retries + 1):
+            signed = self.connection.sign(verb, path, {}, headers,
+                                          hashlib.sha256(body).hexdigest())
+            try:
+                async with self._session.request(verb, URL(self._url + path, encoded=True),
+                                                 data=body, headers=signed,
+                                                 ssl=self._ssl) as response:
+                    Log.debug(f'{self._config.host} responded with {response.status} status')
+                    return (response.status,
+                            await parse_xml(response, list_marker or 'Set'))
+            except aiohttp.ClientConnectionError as e:
+                if attempt == retries:
+                    raise e
+                Log.warn(f'IAM query {action} failed, retrying: {e}')
+
+
+class S3Bucket:
+    """
+    Bucket returned by NativeS3Client, in place of a boto3 Bucket
+    """
+
+    def __init__(self, name: str, creation_date: str = None):
+        self.name = name
+        self.creation_date = creation_date
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}({self.name!r})'
+
+
+class NativeS3Client(BulkDeleteMixin):
+    """
+    S3 bucket management with aiohttp, same operations as S3Client.
+    Failures are raised as botocore ClientError, which the S3 services handle.
+    """
+
+    TAGGING = 'tagging'
+    POLICY = 'policy'
+    DELETE = 'delete'
+
+    def __init__(self, access_key: str, secret_key: str, config: S3ConnectionConfig,
+                 loop=None, session_token=None, executor=None, session=None):
+        self._config = config
+        self._session = session
+        scheme = 'https' if config.use_ssl else 'http'
+        self._host = f'{config.host}:{config.port}'
+        self._url = f'{scheme}://{self._host}'
+        self._ssl = _ssl_context(config)
+        self._signer = SigV4Signer(access_key, secret_key, session_token, service='s3')
+
+    @staticmethod
+    def _bucket_name(bucket) -> str:
+        return getattr(bucket, 'name', bucket)
+
+    async def _request(self, operation: str, method: str, path: str = '/',
+                       subresource: str = None, query: dict = None, body: bytes = b'',
+                       headers: dict = None, parse=None, allow_status=()):
+        """
+        Sends a signed request and returns the result of parse(response)
+        :param operation: Operation name for the errors
+        :param path: URI encoded path
+        :param subresource: Query parameter without value, e.g. 'tagging'
+        :param parse: Coroutine function reading a successful response
+        :param allow_status: Error statuses returned as None instead of raised
+        """
+        query = dict(query or {})
+        url = self._url + path
+        params = '&'.join(f'{_quote(k)}={_quote(v)}' for k, v in sorted(query.items()))
+        if subresource:
+            query[subresource] = ''
+            params = f'{subresource}&{params}' if params else subresource
+        if params:
+            url = f'{url}?{params}'
+        payload_hash = hashlib.sha256(body).hexdigest() if body else EMPTY_SHA256
+        headers = dict(headers or {}, Host=self._host)
+        headers['X-Amz-Content-SHA256'] = payload_hash
+        signed = self._signer.sign(method, path, query, headers, payload_hash)
+        async with self._session.request(method, URL(url, encoded=True), data=body or None,
+                                         headers=signed, ssl=self._ssl) as response:
+            if response.status < 300:
+                return await parse(response) if parse else None
+            if response.status in allow_status:
+                return None
+            await self._raise_error(operation, response)
+
+    @staticmethod
+    async def _raise_error(operation: str, response: aiohttp.ClientResponse):
+        error = {'Code': str(response.status), 'Message': response.reason or ''}
+        if response.method != 'HEAD':
+            try:
+                body = await parse_xml(response)
+                error.update(body.get('Error', {}))
+            except Exception as e:
+                Log.debug(f'Unparsable S3 error response: {e}')
+        raise ClientError({
+            'Error': error,
+            'ResponseMetadata': {
+                'HTTPStatusCode': response.status,
+                'RequestId': response.headers.get('x-amz-request-id')
+            }
+        }, operation)
+
+    @Log.trace_method(Log.DEBUG)
+    async def create_bucket(self, bucket_name):
+        Log.debug(f"create bucket: {bucket_name}")
+        await self._request('CreateBucket', 'PUT', f'/{_quote(bucket_name)}')
+        return S3Bucket(bucket_name)
+
+    @Log.trace_method(Log.DEBUG)
+    async def get_bucket(self, bucket_name):
+        Log.debug(f"get bucket: {bucket_name}")
+        found = await self._request('HeadBucket', 'HEAD', f'/{_quote(bucket_name)}',
+                                    parse=self._found, allow_status=(404,))
+        return S3Bucket(bucket_name) if found else None
+
+    @staticmethod
+    async def _found(response) -> bool:
+        return True
+
+    async def _list_object_pages(self, bucket_name: str, batch_size: int):
+        marker = None
+        while True:
+            query = {'max-keys': str(batch_size)}
+            if marker:
+                query['marker'] = marker
+            page = await self._request('ListObjects', 'GET', f'/{_quote(bucket_name)}',
+                                       query=query, parse=self._parse_object_keys)
+            keys, truncated, next_marker = page
+            if keys:
+                yield keys
+            if not truncated or not keys:
+                return
+            marker = next_marker or keys[-1]
+
+    @staticmethod
+    async def _parse_object_keys(response):
+        keys = []
+        truncated = False
+        next_marker = None
+        async for event, elem in _iter_xml(response):
+            if event != 'end':
+                continue
+            if elem.tag == 'Key':
+                keys.append(elem.text or '')
+            elif elem.tag == 'IsTruncated':
+                truncated = (elem.text or '').strip() == 'true'
+            elif elem.tag == 'NextMarker':
+                next_marker = elem.text
+            elif elem.tag == 'Contents':
+                elem.clear()
+        return keys, truncated, next_marker
+
+    async def _delete_objects(self, bucket_name: str, keys) -> int:
+        objects = ''.join(f'<Object><Key>{escape(key)}</Key></Object>' for key in keys)
+        body = f'<Delete><Quiet>true</Quiet>{objects}</Delete>'.encode('utf-8')
+        headers = {
+            'Content-Type': 'application/xml',
+            'Content-MD5': base64.b64encode(hashlib.md5(body).digest()).decode('ascii')
+        }
+        errors = await self._request('DeleteObjects', 'POST', f'/{_quote(bucket_name)}',
+                                     self.DELETE, body=body, headers=headers,
+                                     parse=self._parse_delete_errors)
+        if errors:
+            raise self._delete_objects_error(errors)
+        return len(keys)
+
+    @staticmethod
+    async def _parse_delete_errors(response):
+        body = await parse_xml(response, list_marker='DeleteResult', item_marker=('Error',))
+        errors = body.get('DeleteResult') or []
+        return [error for error in errors if isinstance(error, dict)]
+
+    @Log.trace_method(Log.DEBUG)
+    async def delete_bucket(self, bucket_name, concurrency: int = 4, progress=None):
+        bucket_name = self._bucket_name(bucket_name)
+        Log.debug(f"delete bucket: {bucket_name}")
+        # All of the keys should be deleted before the bucket itself
+        await self.empty_bucket(bucket_name, concurrency=concurrency, progress=progress)
+        await self._request('DeleteBucket', 'DELETE', f'/{_quote(bucket_name)}')
+
+    @Log.trace_method(Log.DEBUG)
+    async def get_all_buckets(self):
+        Log.debug(f"Get all buckets ")
+        return await self._request('ListBuckets', 'GET', '/', parse=self._parse_buckets)
+
+    @staticmethod
+    async def _parse_buckets(response):
+        body = await parse_xml(response, list_marker='Buckets', item_marker=('Bucket',))
+        buckets = body.get('ListAllMyBucketsResult', {}).get('Buckets') or []
+        return [S3Bucket(bucket.get('Name'), bucket.get('CreationDate'))
+                for bucket in buckets if isinstance(bucket, dict)]
+
+    @Log.trace_method(Log.DEBUG)
+    async def get_bucket_tagging(self, bucket):
+        bucket_name = self._bucket_name(bucket)
+        Log.debug(f"Get bucket tagging: {bucket_name}")
+        # A bucket without tags is reported as an error, return no tags then
+        try:
+            return await self._request('GetBucketTagging', 'GET', f'/{_quote(bucket_name)}',
+                                       self.TAGGING, parse=self._parse_tags)
+        except ClientError as e:
+            if e.response['Error']['Code'] not in NO_TAG_SET_ERRORS:
+                raise
+            return {}
+
+    @staticmethod
+    async def _parse_tags(response):
+        body = await parse_xml(response, list_marker='TagSet', item_marker=('Tag',))
+        tags = body.get('Tagging', {}).get('TagSet') or []
+        return {tag['Key']: tag.get('Value', '') for tag in tags
+                if isinstance(tag, dict) and 'Key' in tag}
+
+    @Log.trace_method(Log.DEBUG)
+    async def put_bucket_tagging(self, bucket_name, tags: dict):
+        Log.debug(f"Put bucket tagging: bucket_name:{bucket_name}, tags:{tags}")
+        tag_set = ''.join(f'<Tag><Key>{escape(str(key))}</Key>'
+                          f'<Value>{escape(str(value))}</Value></Tag>'
+                          for key, value in tags.items())
+        body = f'<Tagging><TagSet>{tag_set}</TagSet></Tagging>'.encode('utf-8')
+        headers = {
+            'Content-Type': 'application/xml',
+            'Content-MD5': base64.b64encode(hashlib.md5(body).digest()).decode('ascii')
+        }
+        await self._request('PutBucketTagging', 'PUT', f'/{_quote(bucket_name)}',
+                            self.TAGGING, body=body, headers=headers)
+
+    @Log.trace_method(Log.DEBUG)
+    async def get_bucket_policy(self, bucket_name: str):
+        Log.debug(f"Get bucket policy: {bucket_name}")
+        return await self._request('GetBucketPolicy', 'GET', f'/{_quote(bucket_name)}',
+                                   self.POLICY, parse=self._parse_policy)
+
+    @staticmethod
+    async def _parse_policy(response):
+        return json.loads(await response.text())
+
+    @Log.trace_method(Log.DEBUG)
+    async def put_bucket_policy(self, bucket_name: str, policy: dict):
+        Log.debug(f"Put bucket policy: bucket_name: {bucket_name}, policy: {policy}")
+        body = json.dumps(policy).encode('utf-8')
+        await self._request('PutBucketPolicy', 'PUT', f'/{_quote(bucket_name)}',
+                            self.POLICY, body=body,
+                            headers={'Content-Type': 'application/json'})
+
+    @Log.trace_method(Log.DEBUG)
+    async def delete_bucket_policy(self, bucket_name: str):
+        Log.debug(f"Delete bucket policy: {bucket_name}")
+        await self._request('DeleteBucketPolicy', 'DELETE', f'/{_quote(bucket_name)}',
+                            self.POLICY)
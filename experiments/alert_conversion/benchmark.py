@@ -0,0 +1,100 @@
+# CORTX-CSM: CORTX Management web and CLI interface.
+# Copyright (c) 2020 Seagate Technology LLC and/or its Affiliates
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+
+#!/usr/bin/env python3
+
+"""
+Micro-benchmark of the AlertPlugin sensor message conversion.
+Compares messages per second of the previous conversion (message parsed
+three times, mapping keys split for every field and a new validator per
+alert) with the compiled mapping on a message parsed once.
+
+Usage: python3 benchmark.py [number_of_messages]
+"""
+
+import os
+import sys
+import json
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', '..'))
+from cortx.utils.log import Log
+from csm.common.payload import Payload, JsonMessage, Dict
+from csm.plugins.cortx.alert import AlertPlugin, AlertSchemaValidator
+
+ALERT_INPUT = os.path.join(os.path.dirname(__file__), '..', '..', 'test',
+                           'test_data', 'alert_input.json')
+NUMBER_OF_MESSAGES = 20000
+
+
+class LegacyMapping:
+    """
+    Previous conversion: the raw message is parsed once more into a Payload
+    and every dotted key is split while converting.
+    """
+    raw = None
+
+    def __init__(self, map):
+        self._map = map
+
+    def convert(self, msg_body, result=None):
+        payload = Payload(JsonMessage(LegacyMapping.raw))
+        csm_payload = Payload(Dict(result if result is not None else {}))
+        payload.convert(self._map, csm_payload)
+        csm_payload.dump()
+        return csm_payload.load()
+
+
+def legacy_plugin():
+    plugin = AlertPlugin()
+    plugin._common_mapping = LegacyMapping(plugin.mapping_dict.get('common'))
+    plugin._resource_mappings = {key: LegacyMapping(value)
+                                 for key, value in plugin.mapping_dict.items()}
+    return plugin
+
+
+def run_legacy(plugin, messages):
+    for raw in messages:
+        LegacyMapping.raw = raw
+        JsonMessage(raw).load()
+        alert = plugin._convert_to_csm_schema(raw)
+        AlertSchemaValidator().load(alert, unknown='EXCLUDE')
+
+
+def run_compiled(plugin, messages):
+    for raw in messages:
+        sensor_queue_msg = JsonMessage(raw).load()
+        alert = plugin._convert_to_csm_schema(sensor_queue_msg)
+        plugin._alert_validator.load(alert, unknown='EXCLUDE')
+
+
+def measure(name, func, plugin, messages):
+    start = time.perf_counter()
+    func(plugin, messages)
+    elapsed = time.perf_counter() - start
+    rate = len(messages) / elapsed
+    print(f'{name:>10}: {len(messages)} messages in {elapsed:.2f}s, {rate:.0f} msg/s')
+    return rate
+
+
+if __name__ == '__main__':
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else NUMBER_OF_MESSAGES
+    Log.init('alert_conversion_benchmark', log_path='/tmp', level='ERROR')
+    with open(ALERT_INPUT) as f:
+        samples = [json.dumps(alert) for alert in json.load(f)]
+    messages = [samples[i % len(samples)] for i in range(count)]
+    before = measure('before', run_legacy, legacy_plugin(), messages)
+    after = measure('after', run_compiled, AlertPlugin(), messages)
+    print(f'speedup: {after / before:.2f}x')
@@ -0,0 +1,122 @@
+# CORTX-CSM: CORTX Management web and CLI interface.
+# Copyright (c) 2020 Seagate Technology LLC and/or its Affiliates
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+
+#!/usr/bin/env python3
+
+"""
+Micro-benchmark of the unsupported endpoint check of the REST middleware.
+Compares the previous check (mapping read from disk, a regex built for
+every endpoint and a DB query per feature on every request) with the
+compiled matcher and the cached feature support verdicts.
+The DB is simulated with a fixed latency per query.
+
+Usage: python3 benchmark.py [number_of_requests] [db_latency_ms]
+"""
+
+import os
+import sys
+import json
+import re
+import time
+import asyncio
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', '..'))
+from csm.common.feature_endpoints import FeatureEndpointMatcher, FeatureSupportCache
+
+FEATURE_ENDPOINT_MAPPING = os.path.join(os.path.dirname(__file__), '..', '..',
+                                        'schema', 'feature_endpoint_mapping.json')
+NUMBER_OF_REQUESTS = 5000
+DB_LATENCY_MS = 1
+
+
+class FeaturesDB:
+    """
+    Stands in for UnsupportedFeaturesDB, every query takes the given latency.
+    """
+
+    def __init__(self, latency):
+        self._latency = latency
+        self.queries = 0
+
+    async def is_feature_supported(self, component, feature):
+        self.queries += 1
+        await asyncio.sleep(self._latency)
+        return True
+
+
+async def legacy_check(path, features_db):
+    def getMatchingEndpoint(endpoint_map, path):
+        for key,value in endpoint_map.items():
+            map_re = f'^{key}$'.replace("*", "[\w\d]*")
+            if re.search(rf"{map_re}", path):
+                return value
+
+    with open(FEATURE_ENDPOINT_MAPPING) as mapping_file:
+        feature_endpoint_map = json.load(mapping_file)
+    endpoint = getMatchingEndpoint(feature_endpoint_map, path)
+    if endpoint:
+        for component in endpoint["dependent_on"]:
+            await features_db.is_feature_supported(component, endpoint["feature_name"])
+        await features_db.is_feature_supported("csm", endpoint["feature_name"])
+
+
+async def compiled_check(path, matcher, feature_support):
+    endpoint = matcher.match(path)
+    if endpoint:
+        for component in endpoint["dependent_on"]:
+            await feature_support.is_feature_supported(component, endpoint["feature_name"])
+        await feature_support.is_feature_supported("csm", endpoint["feature_name"])
+
+
+def request_paths():
+    with open(FEATURE_ENDPOINT_MAPPING) as mapping_file:
+        endpoints = list(json.load(mapping_file))
+    paths = [endpoint.replace('*', 'bucket1') for endpoint in endpoints]
+    # Endpoints without a feature, e.g. login and users
+    paths.extend(['/api/v1/login', '/api/v1/csm/users', '/api/v1/permissions'])
+    return paths
+
+
+async def run(check, paths, count):
+    start = time.perf_counter()
+    for i in range(count):
+        await check(paths[i % len(paths)])
+    return time.perf_counter() - start
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else NUMBER_OF_REQUESTS
+    latency = (float(sys.argv[2]) if len(sys.argv) > 2 else DB_LATENCY_MS) / 1000
+    paths = request_paths()
+    loop = asyncio.get_event_loop()
+
+    legacy_db = FeaturesDB(latency)
+    legacy = loop.run_until_complete(
+        run(lambda path: legacy_check(path, legacy_db), paths, count))
+
+    with open(FEATURE_ENDPOINT_MAPPING) as mapping_file:
+        matcher = FeatureEndpointMatcher(json.load(mapping_file))
+    compiled_db = FeaturesDB(latency)
+    feature_support = FeatureSupportCache(compiled_db, 300)
+    compiled = loop.run_until_complete(
+        run(lambda path: compiled_check(path, matcher, feature_support), paths, count))
+
+    print(f"requests: {count}, db latency: {latency * 1000:.1f} ms")
+    print(f"legacy:   {legacy / count * 1e6:10.1f} us/request, {legacy_db.queries} db queries")
+    print(f"compiled: {compiled / count * 1e6:10.1f} us/request, {compiled_db.queries} db queries")
+
+
+if __name__ == '__main__':
+    main()
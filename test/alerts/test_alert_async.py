@@ -0,0 +1,269 @@
+# CORTX-CSM: CORTX Management web and CLI interface.
+# Copyright (c) 2020 Seagate Technology LLC and/or its Affiliates
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+
+import asyncio
+import json
+from unittest import mock
+from csm.common.comm import AsyncAmqpComm
+from csm.common.conf import Conf
+from csm.common.errors import CsmError
+from csm.core.blogic.models.alerts import AlertModel
+from csm.core.services.alerts import AlertMonitorService
+from csm.plugins.cortx.alert import AlertPlugin
+from csm.test.common import TestFailed, assert_equal, async_test
+
+FAN4 = 'Fan Module 4'
+FAN5 = 'Fan Module 5'
+
+
+class FakeAlertRepository:
+    """
+    Keeps the alerts by resource and records the reads and writes.
+    The stores of the blocked resources wait until released.
+    """
+
+    def __init__(self):
+        self.alerts = {}
+        self.events = []
+        self.blocked = {}
+        self.fail = False
+
+    def block(self, resource_id):
+        self.blocked[_sensor_info(resource_id)] = asyncio.Event()
+
+    def release(self, resource_id):
+        self.blocked[_sensor_info(resource_id)].set()
+
+    async def retrieve_by_sensor_info(self, sensor_info, module_type):
+        self.events.append(('retrieve', sensor_info))
+        alert = self.alerts.get(sensor_info)
+        return AlertModel(alert.to_native()) if alert else None
+
+    async def store_bulk(self, alerts):
+        for alert in alerts:
+            self.events.append(('store', alert.sensor_info, alert.state))
+            if alert.sensor_info in self.blocked:
+                await self.blocked[alert.sensor_info].wait()
+        if self.fail:
+            raise CsmError(desc='Storage is not available')
+        for alert in alerts:
+            self.alerts[alert.sensor_info] = alert
+
+    async def store_alerts_history(self, alert_history):
+        pass
+
+
+class FakeHealthPlugin:
+
+    def update_health_map_with_alert(self, alert):
+        pass
+
+
+class FakeHttpNotifications:
+
+    async def handle_alert(self, alert):
+        pass
+
+
+class FakeConnection:
+
+    def __init__(self, comm):
+        self.comm = comm
+        self.is_open = True
+        self.is_closing = False
+
+    def close(self):
+        self.is_open = False
+        self.comm._on_connection_closed(self, 'Closed by the client')
+
+
+class FakeChannel:
+    """ Channel of the sensor queue, the messages are delivered by the test """
+
+    def __init__(self):
+        self.is_open = True
+        self.on_message = None
+        self.cancelled = False
+        self.delivery_tag = 0
+        self.acks = []
+        self.nacks = []
+
+    def basic_consume(self, queue, on_message_callback, consumer_tag=None):
+        self.on_message = on_message_callback
+
+    def basic_cancel(self, consumer_tag=None):
+        self.cancelled = True
+
+    def basic_ack(self, delivery_tag):
+        self.acks.append(delivery_tag)
+
+    def basic_nack(self, delivery_tag, requeue=True):
+        self.nacks.append((delivery_tag, requeue))
+
+    def deliver(self, body):
+        self.delivery_tag += 1
+        self.on_message(self, mock.Mock(delivery_tag=self.delivery_tag), None, body)
+
+
+def _sensor_info(resource_id):
+    return f'1_1_1_1_{resource_id}_enclosure:fru:fan'.replace(' ', '_')
+
+
+def _sensor_message(resource_id, alert_type):
+    """ Sensor response the way SSPL publishes it on the sensor queue """
+    return json.dumps({
+        "title": "SSPL-LL Sensor Response",
+        "message": {
+            "sensor_response_type": {
+                "info": {
+                    "event_time": "1574075909",
+                    "resource_id": resource_id,
+                    "site_id": "1",
+                    "node_id": "1",
+                    "cluster_id": "1",
+                    "rack_id": "1",
+                    "resource_type": "enclosure:fru:fan"
+                },
+                "alert_type": alert_type,
+                "severity": "critical",
+                "specific_info": {"name": resource_id, "health": "Fault"},
+                "alert_id": f"{resource_id}-{alert_type}",
+                "host_id": "s3node-host-1"
+            }
+        }
+    })
+
+
+async def _wait_for(condition):
+    for _ in range(200):
+        if condition():
+            return
+        await asyncio.sleep(0.01)
+    raise TestFailed('Timed out waiting for the alerts to be processed')
+
+
+class Consumer:
+    """
+    Alert monitor consuming the sensor queue with the async comm over a
+    fake channel.
+    """
+
+    async def start(self):
+        self.repo = FakeAlertRepository()
+        with mock.patch.object(Conf, 'get',
+                               side_effect=lambda index, key, default=None: default):
+            plugin = AlertPlugin()
+            self.comm = AsyncAmqpComm(prefetch_count=16)
+        plugin.decision_maker_service = None
+        self.service = AlertMonitorService(self.repo, plugin, FakeHealthPlugin(),
+                                           FakeHttpNotifications())
+        self.service._es_retry = 1
+        plugin.monitor_async_callback = self.service._consume_async
+        plugin.health_plugin = self.service._health_plugin
+        plugin.async_comm_client = self.comm
+        self.channel = FakeChannel()
+        self.comm._loop = asyncio.get_event_loop()
+        self.comm._channel = self.channel
+        self.comm._connection = FakeConnection(self.comm)
+        self.comm._closed = self.comm._loop.create_future()
+        await plugin.listen_async()
+        return self.service, self.repo, self.channel
+
+    async def stop(self):
+        for event in self.repo.blocked.values():
+            event.set()
+        await self.comm.disconnect()
+
+
+def init(args):
+    pass
+
+
+@async_test
+async def test_ordering_per_key(args):
+    consumer = Consumer()
+    service, repo, channel = await consumer.start()
+    try:
+        repo.block(FAN4)
+        channel.deliver(_sensor_message(FAN4, 'missing'))
+        channel.deliver(_sensor_message(FAN4, 'insertion'))
+        channel.deliver(_sensor_message(FAN5, 'missing'))
+        # The other resource is not held up by the blocked store
+        await _wait_for(lambda: channel.acks)
+        assert_equal(channel.acks, [3])
+        # The next alert of the resource waits for the previous one
+        assert_equal([event for event in repo.events if event[1] == _sensor_info(FAN4)],
+                     [('retrieve', _sensor_info(FAN4)),
+                      ('store', _sensor_info(FAN4), 'missing')])
+        repo.release(FAN4)
+        await _wait_for(lambda: len(channel.acks) == 3)
+        assert_equal(channel.acks, [3, 1, 2])
+        # The later alert resolves the earlier one
+        alert = repo.alerts[_sensor_info(FAN4)]
+        assert_equal((alert.alert_uuid, alert.state, alert.resolved),
+                     (f'{FAN4}-missing', 'insertion', True))
+    finally:
+        await consumer.stop()
+
+
+@async_test
+async def test_ack_after_store(args):
+    consumer = Consumer()
+    service, repo, channel = await consumer.start()
+    try:
+        repo.block(FAN4)
+        channel.deliver(_sensor_message(FAN4, 'missing'))
+        await _wait_for(lambda: repo.events and repo.events[-1][0] == 'store')
+        await asyncio.sleep(0.05)
+        assert_equal((channel.acks, channel.nacks), ([], []))
+        repo.release(FAN4)
+        await _wait_for(lambda: channel.acks)
+        assert_equal((channel.acks, channel.nacks), ([1], []))
+        # A failed store re-delivers the alert
+        repo.fail = True
+        channel.deliver(_sensor_message(FAN5, 'missing'))
+        await _wait_for(lambda: channel.nacks)
+        assert_equal((channel.acks, channel.nacks), ([1], [(2, True)]))
+    finally:
+        await consumer.stop()
+
+
+@async_test
+async def test_shutdown_drains(args):
+    consumer = Consumer()
+    service, repo, channel = await consumer.start()
+    try:
+        service._is_async = True
+        service._monitor_task = asyncio.get_event_loop().create_future()
+        repo.block(FAN4)
+        channel.deliver(_sensor_message(FAN4, 'missing'))
+        await _wait_for(lambda: repo.events and repo.events[-1][0] == 'store')
+        shutdown = asyncio.ensure_future(service.shutdown())
+        await asyncio.sleep(0.05)
+        # The consumer is cancelled, the alert in flight is waited for
+        assert_equal((channel.cancelled, shutdown.done()), (True, False))
+        repo.release(FAN4)
+        await asyncio.wait_for(shutdown, 5)
+        assert_equal(channel.acks, [1])
+        assert_equal(service._alert_plugin.async_comm_client._connection, None)
+    finally:
+        await consumer.stop()
+
+
+test_list = [
+    test_ordering_per_key,
+    test_ack_after_store,
+    test_shutdown_drains,
+]
@@ -0,0 +1,285 @@
+# CORTX-CSM: CORTX Management web and CLI interface.
+# Copyright (c) 2020 Seagate Technology LLC and/or its Affiliates
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+
+import asyncio
+import json
+from datetime import datetime, timezone
+from unittest import mock
+from csm.common.conf import Conf
+from csm.common.errors import CsmError
+from csm.core.blogic.models.alerts import AlertModel
+from csm.core.services.alerts import AlertMonitorService
+from csm.plugins.cortx.alert import AlertPlugin
+from csm.test.common import assert_equal, async_test
+
+CREATED_TIME = 1574075909
+
+
+class FakeAlertRepository:
+    """ Keeps the alerts by resource and records the bulk writes """
+
+    def __init__(self, *alerts):
+        self.alerts = {(alert.sensor_info, alert.module_type): alert for alert in alerts}
+        self.stored = []
+        self.history = []
+        self.fail = False
+
+    async def retrieve_by_sensor_infos(self, sensor_keys):
+        return [AlertModel(self.alerts[key].to_native())
+                for key in sensor_keys if key in self.alerts]
+
+    async def store_bulk(self, alerts):
+        if self.fail:
+            raise CsmError(desc='Storage is not available')
+        self.stored.append(alerts)
+        for alert in alerts:
+            self.alerts[(alert.sensor_info, alert.module_type)] = alert
+
+    async def store_alerts_history_bulk(self, alerts_history):
+        self.history.extend(alerts_history)
+
+
+class FakeHealthPlugin:
+
+    def __init__(self):
+        self.alerts = []
+
+    def update_health_map_with_alert(self, alert):
+        self.alerts.append(alert)
+
+    def health_plugin_callback(self, message):
+        return True
+
+
+class FakeHttpNotifications:
+
+    def __init__(self):
+        self.alerts = []
+
+    def handle_alert(self, alert):
+        self.alerts.append(alert)
+
+
+class FakeChannel:
+    """
+    Channel of the sensor queue delivering the messages once, followed by
+    the inactivity marker.
+    """
+
+    def __init__(self, messages):
+        self.messages = messages
+        self.acks = []
+        self.nacks = []
+
+    def basic_qos(self, prefetch_count):
+        pass
+
+    def consume(self, queue, inactivity_timeout=None):
+        for delivery_tag, body in enumerate(self.messages, 1):
+            yield mock.Mock(delivery_tag=delivery_tag), None, body
+        yield None, None, None
+
+    def basic_ack(self, delivery_tag, multiple=False):
+        self.acks.append((delivery_tag, multiple))
+
+    def basic_nack(self, delivery_tag, multiple=False, requeue=True):
+        self.nacks.append((delivery_tag, multiple))
+
+
+def _alert(resource_id, state, created_time=CREATED_TIME):
+    """ Alert as the alert plugin passes it to the monitor """
+    bad = state in ('missing', 'fault')
+    return {
+        'alert_uuid': f'{resource_id}-{state}-{created_time}',
+        'sensor_info': f'1_1_1_1_{resource_id}',
+        'state': state,
+        'created_time': created_time,
+        'updated_time': created_time,
+        'resolved': not bad,
+        'acknowledged': False,
+        'severity': 'critical' if bad else 'informational',
+        'module_type': 'fan',
+        'module_name': 'enclosure:fru:fan',
+        'description': f'{resource_id} {state}',
+        'health': 'Fault' if bad else 'OK',
+    }
+
+
+def _stored_alert(resource_id, state):
+    """ Alert as it was written by an earlier batch """
+    alert = _alert(resource_id, state)
+    for key in ('created_time', 'updated_time'):
+        alert[key] = datetime.fromtimestamp(alert[key], timezone.utc)
+    return AlertModel(alert)
+
+
+def _sensor_message(resource_id, alert_type):
+    """ Sensor response the way SSPL publishes it on the sensor queue """
+    return json.dumps({
+        "title": "SSPL-LL Sensor Response",
+        "message": {
+            "sensor_response_type": {
+                "info": {
+                    "event_time": str(CREATED_TIME),
+                    "resource_id": resource_id,
+                    "site_id": "1",
+                    "node_id": "1",
+                    "cluster_id": "1",
+                    "rack_id": "1",
+                    "resource_type": "enclosure:fru:fan"
+                },
+                "alert_type": alert_type,
+                "severity": "critical",
+                "specific_info": {
+                    "name": resource_id,
+                    "health": "Fault",
+                    "health-reason": "The fan module is not installed.",
+                    "health-recommendation": "Install the missing fan module."
+                },
+                "alert_id": f"{resource_id}-{alert_type}",
+                "host_id": "s3node-host-1"
+            }
+        }
+    })
+
+
+def _monitor_service(repo):
+    service = AlertMonitorService(repo, None, FakeHealthPlugin(), FakeHttpNotifications())
+    service._es_retry = 1
+    return service
+
+
+async def _consume_batch(service, messages):
+    """ The batch callback blocks on the event loop, so it runs in a thread """
+    return await asyncio.get_event_loop().run_in_executor(
+        None, service._consume_batch, messages)
+
+
+def init(args):
+    pass
+
+
+@async_test
+async def test_mixed_batch(args):
+    repo = FakeAlertRepository(_stored_alert('psu1', 'insertion'),
+                               _stored_alert('disk1', 'fault'))
+    service = _monitor_service(repo)
+    messages = [_alert('fan4', 'missing'), _alert('psu1', 'fault'),
+                _alert('disk1', 'insertion')]
+    assert_equal(await _consume_batch(service, messages), True)
+    # Every alert is written by a single bulk write
+    assert_equal(len(repo.stored), 1)
+    stored = {alert.sensor_info: alert for alert in repo.stored[0]}
+    assert_equal(sorted(stored), ['1_1_1_1_disk1', '1_1_1_1_fan4', '1_1_1_1_psu1'])
+    assert_equal(stored['1_1_1_1_fan4'].alert_uuid, 'fan4-missing-1574075909')
+    # The previous alerts keep their ids and take the new state
+    assert_equal((stored['1_1_1_1_psu1'].alert_uuid, stored['1_1_1_1_psu1'].state,
+                  stored['1_1_1_1_psu1'].resolved),
+                 ('psu1-insertion-1574075909', 'fault', False))
+    assert_equal((stored['1_1_1_1_disk1'].alert_uuid, stored['1_1_1_1_disk1'].state,
+                  stored['1_1_1_1_disk1'].resolved),
+                 ('disk1-fault-1574075909', 'insertion', True))
+    assert_equal(len(repo.history), 3)
+    assert_equal(len(service._health_plugin.alerts), 3)
+    # Only the new alert is pushed over the http notifications
+    assert_equal([alert.alert_uuid for alert in service._http_notfications.alerts],
+                 ['fan4-missing-1574075909'])
+
+
+@async_test
+async def test_duplicates(args):
+    repo = FakeAlertRepository(_stored_alert('psu1', 'fault'))
+    service = _monitor_service(repo)
+    messages = [_alert('fan4', 'missing'), _alert('fan4', 'missing', CREATED_TIME + 1),
+                _alert('psu1', 'fault', CREATED_TIME + 1)]
+    assert_equal(await _consume_batch(service, messages), True)
+    stored = {alert.sensor_info: alert for alert in repo.stored[0]}
+    assert_equal(len(repo.stored[0]), 2)
+    # The duplicates replace the alerts they repeat, under the same id
+    assert_equal((stored['1_1_1_1_fan4'].alert_uuid, stored['1_1_1_1_fan4'].description),
+                 ('fan4-missing-1574075909', 'fan4 missing'))
+    assert_equal((stored['1_1_1_1_psu1'].alert_uuid, stored['1_1_1_1_psu1'].resolved),
+                 ('psu1-fault-1574075909', False))
+    # Every alert has a history record, the duplicates are not published
+    assert_equal(len(repo.history), 3)
+    assert_equal([alert['alert_uuid'] for alert in service._health_plugin.alerts],
+                 ['fan4-missing-1574075909'])
+
+
+@async_test
+async def test_resolve_within_batch(args):
+    repo = FakeAlertRepository()
+    service = _monitor_service(repo)
+    messages = [_alert('fan4', 'missing'), _alert('fan4', 'insertion', CREATED_TIME + 1)]
+    assert_equal(await _consume_batch(service, messages), True)
+    # The raised alert is resolved before it is written
+    assert_equal(len(repo.stored[0]), 1)
+    alert = repo.stored[0][0]
+    assert_equal((alert.alert_uuid, alert.state, alert.resolved),
+                 ('fan4-missing-1574075909', 'insertion', True))
+    assert_equal(len(repo.history), 2)
+    # The alerts are published once the batch is stored, in their final state
+    assert_equal([alert['state'] for alert in service._health_plugin.alerts],
+                 ['insertion', 'insertion'])
+    assert_equal(len(service._http_notfications.alerts), 1)
+
+
+@async_test
+async def test_failed_store(args):
+    repo = FakeAlertRepository()
+    repo.fail = True
+    service = _monitor_service(repo)
+    assert_equal(await _consume_batch(service, [_alert('fan4', 'missing')]), False)
+    # Nothing is published for a batch which is re-delivered
+    assert_equal((repo.history, service._health_plugin.alerts,
+                  service._http_notfications.alerts), ([], [], []))
+
+
+@async_test
+async def test_batch_acknowledgement(args):
+    repo = FakeAlertRepository()
+    service = _monitor_service(repo)
+    with mock.patch.object(Conf, 'get',
+                           side_effect=lambda index, key, default=None: default):
+        plugin = AlertPlugin()
+    plugin.decision_maker_service = None
+    plugin.init(None, service._health_plugin, batch_callback_fn=service._consume_batch)
+    channel = FakeChannel([_sensor_message('Fan Module 4', 'missing'),
+                           _sensor_message('Fan Module 5', 'missing')])
+    plugin.comm_client._inChannel._channel = channel
+    loop = asyncio.get_event_loop()
+    await loop.run_in_executor(None, plugin.comm_client.recv_batch,
+                               plugin._plugin_batch_callback, 2, 0.2)
+    # The whole batch is acknowledged with a single ack of the last message
+    assert_equal((channel.acks, channel.nacks), ([(2, True)], []))
+    assert_equal(len(repo.stored[0]), 2)
+    # A failed store rejects the batch instead of acknowledging it
+    repo.fail = True
+    channel = FakeChannel([_sensor_message('Fan Module 6', 'missing'),
+                           _sensor_message('Fan Module 7', 'missing')])
+    plugin.comm_client._inChannel._channel = channel
+    await loop.run_in_executor(None, plugin.comm_client.recv_batch,
+                               plugin._plugin_batch_callback, 2, 0.2)
+    assert_equal((channel.acks, channel.nacks), ([], [(2, True)]))
+    assert_equal(len(repo.stored), 1)
+
+
+test_list = [
+    test_mixed_batch,
+    test_duplicates,
+    test_resolve_within_batch,
+    test_failed_store,
+    test_batch_acknowledgement,
+]
@@ -0,0 +1,128 @@
+# CORTX-CSM: CORTX Management web and CLI interface.
+# Copyright (c) 2020 Seagate Technology LLC and/or its Affiliates
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+
+import json
+from csm.common.payload import CompiledMapping, Dict, Json, JsonMessage, Payload
+from csm.core.blogic import const
+from csm.test.common import assert_equal
+
+SPECIFIC_INFO = {
+    "enclosure:fru:fan": {"location": "left", "enclosure_id": 0, "name": "Fan Module 4",
+                          "fans": [{"name": "Fan Loc:left-PSU 1", "health": "OK"}]},
+    "enclosure:fru:disk": {"location": "0.1", "serial_number": "Z4D0", "slot": 1},
+    "enclosure:cortx:logical_volume": {"disk_group": [{"name": "dg01"}],
+                                       "volume_name": "vol01"},
+    "iem": {"source": "Software", "component": "motr", "module": "io",
+            "IEC": "IEC:BS020010001", "description": "IO failure"},
+}
+
+
+def _sensor_message(resource_type, specific_info):
+    """ SSPL sensor response, the specific info keys left out are missing """
+    message = {
+        "title": "SSPL-LL Sensor Response",
+        "message": {
+            "sensor_response_type": {
+                "info": {
+                    "event_time": "1574075909",
+                    "resource_id": "Fan Module 4",
+                    "site_id": "1",
+                    "node_id": "1",
+                    "cluster_id": "1",
+                    "rack_id": "1",
+                    "resource_type": resource_type
+                },
+                "alert_type": "fault",
+                "severity": "critical",
+                "specific_info": specific_info,
+                "alert_id": "15740759091a4861fb8d3d4b7d9d4b3c3d5d1e0f",
+                "host_id": "s3node-host-1"
+            }
+        }
+    }
+    if specific_info is None:
+        del message["message"]["sensor_response_type"]["specific_info"]
+    return json.dumps(message)
+
+
+def _convert_payload(mapping_dict, message, resource_type):
+    """ Conversion of the alert the way the alert plugin did it with Payload """
+    input_alert_payload = Payload(JsonMessage(message))
+    csm_alert_payload = Payload(Dict(dict()))
+    input_alert_payload.convert(mapping_dict.get(const.COMMON), csm_alert_payload)
+    resource_mapping = mapping_dict.get(resource_type, "")
+    if resource_mapping:
+        input_alert_payload.convert(resource_mapping, csm_alert_payload)
+    csm_alert_payload.dump()
+    return csm_alert_payload.load()
+
+
+def _convert_compiled(mapping_dict, message, resource_type):
+    msg_body = json.loads(message)
+    csm_schema = CompiledMapping(mapping_dict.get(const.COMMON)).convert(msg_body)
+    resource_mapping = mapping_dict.get(resource_type)
+    if resource_mapping:
+        CompiledMapping(resource_mapping).convert(msg_body, csm_schema)
+    return csm_schema
+
+
+def _assert_same_conversion(mapping_dict, resource_type, specific_info):
+    message = _sensor_message(resource_type, specific_info)
+    assert_equal(_convert_compiled(mapping_dict, message, resource_type),
+                 _convert_payload(mapping_dict, message, resource_type))
+
+
+def init(args):
+    pass
+
+
+def test_alert_mapping_table(args):
+    mapping_dict = Json(const.ALERT_MAPPING_TABLE).load()
+    for resource_type in mapping_dict:
+        if resource_type == const.COMMON:
+            continue
+        specific_info = SPECIFIC_INFO.get(resource_type, {})
+        _assert_same_conversion(mapping_dict, resource_type, specific_info)
+        # Only some of the mapped keys
+        _assert_same_conversion(mapping_dict, resource_type,
+                                dict(list(specific_info.items())[:1]))
+        # No specific info at all, the nested keys below it are missing
+        _assert_same_conversion(mapping_dict, resource_type, None)
+    _assert_same_conversion(mapping_dict, 'node:unknown', {"name": "unknown"})
+
+
+def test_nested_keys(args):
+    mapping_dict = {
+        const.COMMON: {
+            "message.sensor_response_type.info": "extended_info.info",
+            "message.sensor_response_type.info.resource_id": "extended_info.info.name",
+            "message.sensor_response_type.severity": "state",
+            "message.sensor_response_type.alert_type": "state.type",
+            "message.sensor_response_type.missing.key": "extended_info.missing",
+        },
+    }
+    message = _sensor_message('enclosure:fru:fan', {})
+    converted = _convert_compiled(mapping_dict, message, 'enclosure:fru:fan')
+    assert_equal(converted, _convert_payload(mapping_dict, message, 'enclosure:fru:fan'))
+    # A later key replaces the value of a parent which is not a dictionary
+    assert_equal(converted['state'], {'type': 'fault'})
+    assert_equal(converted['extended_info']['missing'], None)
+    assert_equal(converted['extended_info']['info']['name'], 'Fan Module 4')
+
+
+test_list = [
+    test_alert_mapping_table,
+    test_nested_keys,
+]
@@ -0,0 +1,202 @@
+# CORTX-CSM: CORTX Management web and CLI interface.
+# Copyright (c) 2020 Seagate Technology LLC and/or its Affiliates
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from unittest import mock
+from csm.core.blogic.models.alerts import AlertModel
+from csm.core.services.alerts import AlertRepository, AlertsAppService
+from csm.test.common import assert_equal, async_test
+
+CREATED_TIME = datetime.fromtimestamp(1574075909, timezone.utc)
+
+
+class FakeQuery:
+    """ Query holding a predicate built by the fake filters """
+
+    def __init__(self):
+        self.filter = lambda alert: True
+
+    def filter_by(self, filter):
+        self.filter = filter
+        return self
+
+
+def _compare(field, operation, value):
+    return lambda alert: alert[field.name] == value
+
+
+def _and(*filters):
+    return lambda alert: all(filter(alert) for filter in filters)
+
+
+def _or(*filters):
+    return lambda alert: any(filter(alert) for filter in filters)
+
+
+class FakeAlertStorage:
+    """ Stores copies of the alerts, as a database would, and counts the reads """
+
+    def __init__(self, *alerts):
+        self.alerts = {alert.alert_uuid: AlertModel(alert.to_native()) for alert in alerts}
+        self.reads = 0
+
+    def __call__(self, model):
+        return self
+
+    async def get(self, query):
+        self.reads += 1
+        return [AlertModel(alert.to_native())
+                for alert in self.alerts.values() if query.filter(alert)]
+
+    async def store(self, alert):
+        # The fields are converted by the validation of the stored model
+        alert.validate()
+        self.alerts[alert.alert_uuid] = AlertModel(alert.to_native())
+
+    async def update(self, filter, update_params):
+        for alert_id, alert in self.alerts.items():
+            if filter(alert):
+                for field, value in update_params.items():
+                    alert[field] = value
+                self.alerts[alert_id] = AlertModel(alert.to_native())
+
+
+def _alert(resource_id, state='fault', resolved=False, acknowledged=False):
+    return AlertModel({
+        'alert_uuid': f'{resource_id}-alert',
+        'sensor_info': f'1_1_1_1_{resource_id}',
+        'module_type': 'fan',
+        'state': state,
+        'severity': 'critical',
+        'resolved': resolved,
+        'acknowledged': acknowledged,
+        'created_time': CREATED_TIME,
+        'updated_time': CREATED_TIME,
+        'comments': [],
+    })
+
+
+@contextmanager
+def _alert_repository(*alerts):
+    """ Alert repository with queries the fake storage understands """
+    with mock.patch('csm.core.services.alerts.Query', FakeQuery), \
+            mock.patch('csm.core.services.alerts.Compare', _compare), \
+            mock.patch('csm.core.services.alerts.And', _and), \
+            mock.patch('csm.core.services.alerts.Or', _or):
+        storage = FakeAlertStorage(*alerts)
+        yield AlertRepository(storage), storage
+
+
+async def _assert_in_sync(repo, storage, resource_id):
+    """ The indexed alert matches the open alert stored in the DB """
+    indexed = repo.open_alerts.get(f'1_1_1_1_{resource_id}', 'fan')
+    stored = storage.alerts[f'{resource_id}-alert']
+    if repo.open_alerts.is_open(stored):
+        assert_equal(indexed.to_primitive(), stored.to_primitive())
+    else:
+        assert_equal(indexed, None)
+
+
+def init(args):
+    pass
+
+
+@async_test
+async def test_fallback_before_warm(args):
+    with _alert_repository(_alert('fan4'), _alert('fan5', resolved=True, acknowledged=True)) \
+            as (repo, storage):
+        # The previous alerts are read from the DB until the index is warmed
+        alert = await repo.retrieve_by_sensor_info('1_1_1_1_fan4', 'fan')
+        assert_equal(alert.alert_uuid, 'fan4-alert')
+        assert_equal(await repo.retrieve_by_sensor_info('1_1_1_1_fan5', 'fan'), None)
+        alerts = await repo.retrieve_by_sensor_infos([('1_1_1_1_fan4', 'fan'),
+                                                      ('1_1_1_1_fan5', 'fan')])
+        assert_equal([alert.alert_uuid for alert in alerts], ['fan4-alert'])
+        assert_equal(storage.reads, 3)
+        # Only the open alerts are indexed
+        await repo.warm_open_alerts_index()
+        assert_equal((repo.open_alerts.ready, len(repo.open_alerts)), (True, 1))
+        reads = storage.reads
+        alert = await repo.retrieve_by_sensor_info('1_1_1_1_fan4', 'fan')
+        assert_equal(alert.alert_uuid, 'fan4-alert')
+        assert_equal(await repo.retrieve_by_sensor_info('1_1_1_1_fan5', 'fan'), None)
+        alerts = await repo.retrieve_by_sensor_infos([('1_1_1_1_fan4', 'fan'),
+                                                      ('1_1_1_1_fan5', 'fan')])
+        assert_equal([alert.alert_uuid for alert in alerts], ['fan4-alert'])
+        assert_equal(storage.reads, reads)
+
+
+@async_test
+async def test_store_and_update(args):
+    with _alert_repository(_alert('fan4')) as (repo, storage):
+        await repo.warm_open_alerts_index()
+        await repo.store(_alert('fan5'))
+        await repo.store_bulk([_alert('fan6'), _alert('fan7')])
+        for resource_id in ('fan4', 'fan5', 'fan6', 'fan7'):
+            await _assert_in_sync(repo, storage, resource_id)
+        # The index keeps its own copies of the alerts
+        alert = await repo.retrieve_by_sensor_info('1_1_1_1_fan5', 'fan')
+        alert.state = 'insertion'
+        alert.comments.append({'comment_id': '1'})
+        await _assert_in_sync(repo, storage, 'fan5')
+        await repo.update(alert)
+        await _assert_in_sync(repo, storage, 'fan5')
+        # A resolved and acknowledged alert is dropped from the index
+        alert.resolved = True
+        alert.acknowledged = True
+        await repo.update(alert)
+        await _assert_in_sync(repo, storage, 'fan5')
+        assert_equal(len(repo.open_alerts), 3)
+
+
+@async_test
+async def test_update_by_sensor_info(args):
+    with _alert_repository(_alert('fan4'), _alert('fan5', acknowledged=True)) \
+            as (repo, storage):
+        await repo.warm_open_alerts_index()
+        update_params = {'state': 'missing', 'severity': 'warning',
+                         'updated_time': 1574076000}
+        await repo.update_by_sensor_info('1_1_1_1_fan4', 'fan', update_params)
+        await _assert_in_sync(repo, storage, 'fan4')
+        alert = await repo.retrieve_by_sensor_info('1_1_1_1_fan4', 'fan')
+        assert_equal((alert.state, alert.updated_time),
+                     ('missing', datetime.fromtimestamp(1574076000, timezone.utc)))
+        # Resolving an acknowledged alert closes it
+        await repo.update_by_sensor_info('1_1_1_1_fan5', 'fan', {'resolved': True})
+        await _assert_in_sync(repo, storage, 'fan5')
+        assert_equal(await repo.retrieve_by_sensor_info('1_1_1_1_fan5', 'fan'), None)
+
+
+@async_test
+async def test_acknowledge_resolved(args):
+    with _alert_repository(_alert('fan4', resolved=True), _alert('fan5')) as (repo, storage):
+        await repo.warm_open_alerts_index()
+        service = AlertsAppService(repo)
+        await service.update_alert('fan5-alert', {'acknowledged': True})
+        await _assert_in_sync(repo, storage, 'fan5')
+        assert_equal((await repo.retrieve_by_sensor_info('1_1_1_1_fan5', 'fan')).acknowledged,
+                     True)
+        await service.update_alert('fan4-alert', {'acknowledged': True})
+        await _assert_in_sync(repo, storage, 'fan4')
+        assert_equal(len(repo.open_alerts), 1)
+
+
+test_list = [
+    test_fallback_before_warm,
+    test_store_and_update,
+    test_update_by_sensor_info,
+    test_acknowledge_resolved,
+]
@@ -0,0 +1,185 @@
+# CORTX-CSM: CORTX Management web and CLI interface.
+# Copyright (c) 2020 Seagate Technology LLC and/or its Affiliates
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+
+import asyncio
+from contextlib import contextmanager
+from unittest import mock
+from csm.common.errors import CsmError, ResourceExist
+from csm.core.data.models.users import User
+from csm.core.services.users import UserManager
+from csm.test.common import assert_equal, assert_raises, async_test
+
+
+class FakeQuery:
+    """ Query by user id, the other options are ignored """
+
+    def __init__(self):
+        self.user_id = None
+
+    def filter_by(self, user_id):
+        self.user_id = user_id
+        return self
+
+    def offset(self, offset):
+        return self
+
+    def limit(self, limit):
+        return self
+
+    def order_by(self, field, order):
+        return self
+
+
+class FakeUserStorage:
+    """ Stores copies of the users, as a database would, and counts the reads """
+
+    def __init__(self, *user_ids):
+        self.users = {}
+        self.lookups = []
+        self.lists = 0
+        self.fail = False
+        for user_id in user_ids:
+            self.users[user_id] = User.instantiate_csm_user(user_id, 'hash', roles=['monitor'])
+
+    def __call__(self, model):
+        return self
+
+    async def get(self, query):
+        if query.user_id is None:
+            self.lists += 1
+            return [User(user.to_native()) for user in self.users.values()]
+        self.lookups.append(query.user_id)
+        user = self.users.get(query.user_id)
+        return [User(user.to_native())] if user else []
+
+    async def store(self, user):
+        await asyncio.sleep(0)
+        if self.fail:
+            raise CsmError(desc='Storage is not available')
+        self.users[user.user_id] = User(user.to_native())
+
+    async def delete(self, user_id):
+        self.users.pop(user_id, None)
+
+    async def count(self, query):
+        return len(self.users)
+
+
+@contextmanager
+def _user_manager(*user_ids):
+    """ User manager with queries the fake storage understands """
+    with mock.patch('csm.core.services.users.Query', FakeQuery), \
+            mock.patch('csm.core.services.users.Compare',
+                       lambda field, operation, value: value):
+        storage = FakeUserStorage(*user_ids)
+        yield UserManager(storage), storage
+
+
+def init(args):
+    pass
+
+
+@async_test
+async def test_get_exact_id(args):
+    with _user_manager('Admin') as (user_mgr, storage):
+        user = await user_mgr.get('Admin')
+        assert_equal(user.user_id, 'Admin')
+        # The stored ids are not listed when the id matches
+        assert_equal((storage.lookups, storage.lists), (['Admin'], 0))
+        await user_mgr.get('Admin')
+        assert_equal(storage.lookups, ['Admin'])
+
+
+@async_test
+async def test_get_ignoring_case(args):
+    with _user_manager('Admin', 'monitor') as (user_mgr, storage):
+        user = await user_mgr.get('ADMIN')
+        assert_equal(user.user_id, 'Admin')
+        assert_equal((storage.lookups, storage.lists), (['ADMIN', 'Admin'], 1))
+        # Any case of the id hits the cache
+        await user_mgr.get('admin')
+        assert_equal(len(storage.lookups), 2)
+        # The stored ids are listed once for the cache TTL
+        assert_equal(await user_mgr.get('MONITOR') is not None, True)
+        assert_equal(await user_mgr.get('missing'), None)
+        assert_equal(storage.lists, 1)
+
+
+@async_test
+async def test_get_returns_copies(args):
+    with _user_manager('admin') as (user_mgr, storage):
+        user = await user_mgr.get('admin')
+        user.roles = ['admin']
+        cached = await user_mgr.get('admin')
+        assert_equal(cached.roles, ['monitor'])
+        cached.update({'roles': ['manage']})
+        assert_equal((await user_mgr.get('admin')).roles, ['monitor'])
+        assert_equal(len(storage.lookups), 1)
+
+
+@async_test
+async def test_save_invalidates(args):
+    with _user_manager('admin') as (user_mgr, storage):
+        user = await user_mgr.get('admin')
+        user.update({'roles': ['manage']})
+        await user_mgr.save(user)
+        assert_equal((await user_mgr.get('admin')).roles, ['manage'])
+        assert_equal(len(storage.lookups), 2)
+        # The unsaved changes are not served from the cache
+        user.update({'roles': ['admin']})
+        storage.fail = True
+        with assert_raises(CsmError):
+            await user_mgr.save(user)
+        assert_equal((await user_mgr.get('admin')).roles, ['manage'])
+        assert_equal(len(storage.lookups), 3)
+
+
+@async_test
+async def test_lookup_during_save(args):
+    with _user_manager('admin') as (user_mgr, storage):
+        user = await user_mgr.get('admin')
+        user.update({'roles': ['manage']})
+        # The lookup reads the user before the store is done
+        _, previous = await asyncio.gather(user_mgr.save(user), user_mgr.get('admin'))
+        assert_equal(previous.roles, ['monitor'])
+        assert_equal((await user_mgr.get('admin')).roles, ['manage'])
+
+
+@async_test
+async def test_create_delete_invalidate(args):
+    with _user_manager('admin') as (user_mgr, storage):
+        # The stored ids are listed by the failed lookup of a missing user
+        assert_equal(await user_mgr.get('Manager'), None)
+        assert_equal(storage.lists, 1)
+        await user_mgr.create(User.instantiate_csm_user('Manager', 'hash'))
+        with assert_raises(ResourceExist):
+            await user_mgr.create(User.instantiate_csm_user('manager', 'hash'))
+        # The new id is known without listing the users again
+        assert_equal((await user_mgr.get('MANAGER')).user_id, 'Manager')
+        assert_equal(storage.lists, 1)
+        await user_mgr.delete('Manager')
+        assert_equal(await user_mgr.get('manager'), None)
+        assert_equal(await user_mgr.get('Manager'), None)
+        assert_equal(storage.lists, 1)
+
+
+test_list = [
+    test_get_exact_id,
+    test_get_ignoring_case,
+    test_get_returns_copies,
+    test_save_invalidates,
+    test_lookup_during_save,
+    test_create_delete_invalidate,
+]
@@ -0,0 +1,160 @@
+# CORTX-CSM: CORTX Management web and CLI interface.
+# Copyright (c) 2020 Seagate Technology LLC and/or its Affiliates
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+
+import time
+from threading import Event, Thread
+from csm.plugins.cortx.health import ActuatorRequestScheduler
+from csm.test.common import TestFailed, assert_equal
+
+WAIT_TIMEOUT = 5
+
+
+class SentRequests:
+    """ send_fn recording the requests and signalling every send """
+
+    def __init__(self, fail=False):
+        self.requests = []
+        self.sent = Event()
+        self.fail = fail
+
+    def __call__(self, resource, request_uuid):
+        self.requests.append((resource, request_uuid, time.monotonic()))
+        self.sent.set()
+        if self.fail:
+            raise ConnectionError('Channel is down')
+
+    def wait(self, count):
+        deadline = time.monotonic() + WAIT_TIMEOUT
+        while len(self.requests) < count:
+            if time.monotonic() > deadline:
+                raise TestFailed(f'{count} requests expected, '
+                                 f'{len(self.requests)} sent')
+            self.sent.wait(0.01)
+            self.sent.clear()
+        return self.requests[:count]
+
+
+def _start(scheduler):
+    thread = Thread(target=scheduler.run, daemon=True)
+    thread.start()
+    return thread
+
+
+def _stop(scheduler, thread):
+    scheduler.stop()
+    thread.join(WAIT_TIMEOUT)
+
+
+def init(args):
+    pass
+
+
+def test_response_correlation(args):
+    sent = SentRequests()
+    first_round = Event()
+    scheduler = ActuatorRequestScheduler(
+        {'node:fru:disk': 2, 'enclosure:fru:psu': 1}, sent, interval=0,
+        jitter=0, timeout=60, max_backoff=60, first_round_fn=first_round.set)
+    thread = _start(scheduler)
+    try:
+        requests = {resource: request_uuid
+                    for resource, request_uuid, _ in sent.wait(2)}
+        assert_equal(scheduler.on_response('unknown-uuid'), False)
+        assert_equal(scheduler.on_response(requests['enclosure:fru:psu']), True)
+        # The node request expects a response from both nodes
+        assert_equal(scheduler.on_response(requests['node:fru:disk']), True)
+        assert_equal(first_round.is_set(), False)
+        assert_equal(scheduler.on_response(requests['node:fru:disk']), True)
+        assert_equal(first_round.wait(WAIT_TIMEOUT), True)
+        # Answered requests are no longer pending
+        assert_equal(scheduler.on_response(requests['enclosure:fru:psu']), False)
+    finally:
+        _stop(scheduler, thread)
+
+
+def test_timeout_retry(args):
+    sent = SentRequests()
+    first_round = Event()
+    scheduler = ActuatorRequestScheduler(
+        {'enclosure:fru:psu': 1}, sent, interval=0, jitter=0, timeout=0.05,
+        max_backoff=0.05, first_round_fn=first_round.set)
+    thread = _start(scheduler)
+    try:
+        (_, first_uuid, _), (_, second_uuid, _) = sent.wait(2)
+        # A lost response does not stall the first round
+        assert_equal(first_round.is_set(), True)
+        if first_uuid == second_uuid:
+            raise TestFailed('A retried request must get a new uuid')
+        # The response to the timed out request is not accounted
+        assert_equal(scheduler.on_response(first_uuid), False)
+    finally:
+        _stop(scheduler, thread)
+
+
+def test_backoff(args):
+    scheduler = ActuatorRequestScheduler(
+        {'enclosure:fru:psu': 1}, SentRequests(), interval=600, jitter=0,
+        timeout=10, max_backoff=35)
+    request = scheduler._requests[0]
+    now = 1000.0
+    delays = []
+    for failures in range(1, 5):
+        request.failures = failures
+        scheduler._schedule_next(request, now)
+        delays.append(request.due - now)
+    assert_equal(delays, [10, 20, 35, 35])
+    # A successful poll goes back to the polling interval
+    request.failures = 0
+    scheduler._schedule_next(request, now)
+    assert_equal(request.due - now, 600)
+
+
+def test_expire_partial_response(args):
+    scheduler = ActuatorRequestScheduler(
+        {'node:fru:disk': 2}, SentRequests(), interval=600, jitter=0,
+        timeout=10, max_backoff=60)
+    request = scheduler._requests[0]
+    for responses, failures in ((0, 1), (0, 2), (1, 0)):
+        request.uuid = f'uuid-{failures}-{responses}'
+        request.deadline = 0
+        request.responses = responses
+        scheduler._pending[request.uuid] = request
+        scheduler._expire(100)
+        assert_equal(request.failures, failures)
+        assert_equal(scheduler._pending, {})
+
+
+def test_send_failure(args):
+    sent = SentRequests(fail=True)
+    scheduler = ActuatorRequestScheduler(
+        {'enclosure:fru:psu': 1}, sent, interval=0, jitter=0, timeout=0.02,
+        max_backoff=0.02)
+    thread = _start(scheduler)
+    try:
+        sent.wait(3)
+        assert_equal(scheduler._pending, {})
+        if scheduler._requests[0].failures < 2:
+            raise TestFailed('Failed sends must be retried with a backoff')
+    finally:
+        _stop(scheduler, thread)
+
+
+test_list = [
+    test_response_correlation,
+    test_timeout_retry,
+    test_backoff,
+    test_expire_partial_response,
+    test_send_failure
+]
@@ -0,0 +1,234 @@
+# CORTX-CSM: CORTX Management web and CLI interface.
+# Copyright (c) 2020 Seagate Technology LLC and/or its Affiliates
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+
+import copy
+import json
+import os
+import random
+import shutil
+import tempfile
+from unittest import mock
+from csm.common.conf import Conf
+from csm.core.blogic import const
+from csm.core.services.health import HealthAppService, HealthMapIndex, HealthRepository
+from csm.test.common import TestFailed, assert_equal
+
+
+def _leaf(health="", severity="", alert_uuid=""):
+    return {
+        const.ALERT_HEALTH: health,
+        const.ALERT_SEVERITY: severity,
+        const.ALERT_UUID: alert_uuid
+    }
+
+
+def _health_map():
+    return {
+        "nodes": {
+            "srvnode-1": {
+                "hw": {
+                    "disk-0": _leaf("OK", "informational", "a-1"),
+                    "disk-1": _leaf("OK", "informational", "a-2"),
+                    "psu-0": _leaf()
+                },
+                "sw": {
+                    "csm": _leaf("OK", "informational"),
+                    "empty": {}
+                }
+            },
+            "srvnode-2": {
+                "hw": {
+                    "disk-0": _leaf("Fault", "critical", "a-3"),
+                    "psu-0": _leaf()
+                },
+                "sw": {
+                    "csm": _leaf("Degraded", "warning", "a-4")
+                }
+            }
+        }
+    }
+
+
+def _recount(node):
+    """ Full walk of the subtree, same as the summary without the index """
+    health_count_map = {}
+    alert_uuid_map = {}
+    total = 0
+    for value in node.values():
+        if not isinstance(value, dict):
+            continue
+        if HealthMapIndex.has_child_dict(value):
+            child_map, child_alerts, child_total = _recount(value)
+            total += child_total
+            for status, count in child_map.items():
+                health_count_map[status] = health_count_map.get(status, 0) + count
+            for status, alert_uuids in child_alerts.items():
+                alert_uuid_map.setdefault(status, set()).update(alert_uuids)
+        elif value:
+            total += 1
+            health = value.get(const.ALERT_HEALTH, "").lower()
+            severity = value.get(const.ALERT_SEVERITY, "").lower()
+            status = f'{health}-{severity}'
+            if value.get(const.ALERT_HEALTH):
+                health_count_map[status] = health_count_map.get(status, 0) + 1
+            if value.get(const.ALERT_UUID):
+                alert_uuid_map.setdefault(status, set()).add(value[const.ALERT_UUID])
+    return health_count_map, alert_uuid_map, total
+
+
+def _iter_nodes(node):
+    yield node
+    for value in node.values():
+        if isinstance(value, dict) and HealthMapIndex.has_child_dict(value):
+            yield from _iter_nodes(value)
+
+
+def _iter_leaves(node):
+    for value in node.values():
+        if isinstance(value, dict):
+            if HealthMapIndex.has_child_dict(value):
+                yield from _iter_leaves(value)
+            elif value:
+                yield value
+
+
+def _verify_counters(index, health_map):
+    """ Compares the counters of every indexed node with a full recount """
+    for node in _iter_nodes(health_map):
+        counters = index.counters(node)
+        if counters is None:
+            raise TestFailed(f'Node is not indexed: {index.path(node)}')
+        health_count_map, alert_uuid_map, total = _recount(node)
+        assert_equal(counters.total, total)
+        assert_equal(counters.health_count_map(), health_count_map)
+        actual_alerts = {status: set(alert_uuids) for status, alert_uuids
+                         in counters.alert_uuid_map().items()}
+        assert_equal(actual_alerts, alert_uuid_map)
+
+
+def _health_service(path, settings):
+    """ Health service loading the health map from the file at path """
+    with open(path, 'w') as health_map_file:
+        json.dump(_health_map(), health_map_file)
+    conf = {const.HEALTH_SCHEMA_KEY: path, const.MAINTENANCE: {}}
+    conf.update(settings)
+    with mock.patch.object(Conf, 'get', side_effect=lambda index, key, default=None:
+                           conf.get(key, default)):
+        return HealthAppService(HealthRepository(), None, None)
+
+
+def init(args):
+    pass
+
+
+def test_counters_after_build(args):
+    health_map = _health_map()
+    index = HealthMapIndex(health_map)
+    _verify_counters(index, health_map)
+    assert_equal(index.counters().total, 7)
+    assert_equal(index.counters().health_count_map(),
+                 {'ok-informational': 3, 'fault-critical': 1,
+                  'degraded-warning': 1})
+
+
+def test_counters_after_refresh(args):
+    health_map = _health_map()
+    index = HealthMapIndex(health_map)
+    node = health_map["nodes"]["srvnode-1"]
+    disk = node["hw"]["disk-1"]
+    disk.update(_leaf("Fault", "critical", "a-5"))
+    assert_equal(index.refresh(disk), True)
+    _verify_counters(index, health_map)
+    # Resolving the alert brings the counters back
+    disk.update(_leaf("OK", "informational", "a-2"))
+    index.refresh(disk)
+    _verify_counters(index, health_map)
+    # An unchanged leaf and an unknown dict leave the counters as they are
+    index.refresh(disk)
+    assert_equal(index.refresh(_leaf("OK", "informational")), False)
+    _verify_counters(index, health_map)
+
+
+def test_counters_after_update_sequence(args):
+    health_map = _health_map()
+    index = HealthMapIndex(health_map)
+    updates = [_leaf(), _leaf("OK", "informational"),
+               _leaf("Fault", "critical"), _leaf("Degraded", "warning"),
+               _leaf("Fault", "error", "a-10"), _leaf("OK", "informational", "a-11")]
+    leaves = list(_iter_leaves(health_map))
+    rand = random.Random(0)
+    for _ in range(200):
+        leaf = rand.choice(leaves)
+        leaf.update(rand.choice(updates))
+        index.refresh(leaf)
+        _verify_counters(index, health_map)
+
+
+def test_counters_after_set(args):
+    health_map = _health_map()
+    index = HealthMapIndex(health_map)
+    node = health_map["nodes"]["srvnode-2"]
+    # Replacing a subtree changes the structure, the index is rebuilt
+    index.set("hw", copy.deepcopy(health_map["nodes"]["srvnode-1"]["hw"]), node)
+    _verify_counters(index, health_map)
+    assert_equal(index.get("disk-1", node), node["hw"]["disk-1"])
+    new_leaf = node["hw"]["disk-1"]
+    new_leaf.update(_leaf("Fault", "critical", "a-6"))
+    assert_equal(index.refresh(new_leaf), True)
+    _verify_counters(index, health_map)
+
+
+def test_get_outside_index(args):
+    index = HealthMapIndex(_health_map())
+    assert_equal(index.counters({}), None)
+    try:
+        index.get("csm", {"csm": {}})
+    except KeyError:
+        return
+    raise TestFailed('Lookup in a node which is not indexed must fail')
+
+
+def test_verify_counters(args):
+    path = tempfile.mkdtemp()
+    try:
+        service = _health_service(os.path.join(path, 'health_map.json'),
+                                  {const.HEALTH_VERIFY_COUNTERS: True})
+        health_map = service.repo.health_schema.data()
+        node = health_map["nodes"]["srvnode-1"]
+        expected = service._get_health_summary(node)
+        # The leaf is changed behind the back of the index
+        node["hw"]["disk-1"].update(_leaf("Fault", "critical", "a-5"))
+        with mock.patch('csm.core.services.health.Log') as log:
+            summary = service._get_health_summary(node)
+            assert_equal(log.error.call_count, 1)
+        if summary == expected:
+            raise TestFailed('The drifted counters must be recounted')
+        # The index is rebuilt, its counters match again
+        _verify_counters(service.repo.index, health_map)
+        with mock.patch('csm.core.services.health.Log') as log:
+            assert_equal(service._get_health_summary(node), summary)
+            assert_equal(log.error.call_count, 0)
+    finally:
+        shutil.rmtree(path)
+
+
+test_list = [
+    test_counters_after_build,
+    test_counters_after_refresh,
+    test_counters_after_update_sequence,
+    test_counters_after_set,
+    test_get_outside_index,
+    test_verify_counters
+]
@@ -0,0 +1,219 @@
+# CORTX-CSM: CORTX Management web and CLI interface.
+# Copyright (c) 2020 Seagate Technology LLC and/or its Affiliates
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+
+import asyncio
+import json
+import os
+import shutil
+import tempfile
+from datetime import datetime, timezone
+from unittest import mock
+from csm.common.conf import Conf
+from csm.core.blogic import const
+from csm.core.services.health import HealthAppService, HealthRepository
+from csm.test.common import assert_equal, async_test
+
+HIGH_WATER_MARK = 1600000000
+
+
+def _leaf(health="", severity="", alert_uuid=""):
+    return {
+        const.ALERT_HEALTH: health,
+        const.ALERT_SEVERITY: severity,
+        const.ALERT_UUID: alert_uuid,
+        const.HEALTH_ALERT_TYPE: const.NA
+    }
+
+
+def _health_map(*disks):
+    return {
+        "nodes": {
+            "srvnode-1": {
+                "hw": {disk: _leaf("OK", "informational") for disk in disks}
+            }
+        }
+    }
+
+
+class FakeAlertRepository:
+    """ Records which alerts the health map is updated with """
+
+    def __init__(self):
+        self.requests = []
+
+    async def retrieve_by_range(self, create_time_range):
+        self.requests.append(('all', create_time_range))
+        return []
+
+    async def retrieve_updated_since(self, updated_time):
+        self.requests.append(('since', updated_time))
+        return []
+
+
+class HealthService:
+    """ Health services of one test, loading the health map and snapshot from path """
+
+    def __init__(self, path):
+        self.path = path
+        self.schema_path = os.path.join(path, 'health_map.json')
+        self.snapshot_path = os.path.join(path, 'snapshot', 'health_map.json')
+        self.services = []
+
+    def __call__(self, health_map, **settings):
+        with open(self.schema_path, 'w') as health_map_file:
+            json.dump(health_map, health_map_file)
+        conf = {const.HEALTH_SCHEMA_KEY: self.schema_path, const.MAINTENANCE: {},
+                const.HEALTH_SNAPSHOT_PATH: self.snapshot_path,
+                const.HEALTH_SNAPSHOT_INTERVAL: 300}
+        conf.update(settings)
+        with mock.patch.object(Conf, 'get', side_effect=lambda index, key, default=None:
+                               conf.get(key, default)):
+            service = HealthAppService(HealthRepository(), FakeAlertRepository(), None)
+        self.services.append(service)
+        return service
+
+    def conf(self):
+        """ Configuration of the snapshots taken after the service was created """
+        return mock.patch.object(Conf, 'get', return_value=self.schema_path)
+
+    async def save(self, service):
+        with mock.patch('csm.core.services.health.time.time', return_value=HIGH_WATER_MARK), \
+                self.conf():
+            await service.save_health_snapshot()
+
+    def snapshot(self):
+        with open(self.snapshot_path) as snapshot_file:
+            return json.load(snapshot_file)
+
+    async def close(self):
+        for service in self.services:
+            if service._snapshotter:
+                service._snapshotter.stop()
+        await asyncio.sleep(0)
+        shutil.rmtree(self.path)
+
+
+def init(args):
+    pass
+
+
+@async_test
+async def test_save_and_load(args):
+    health = HealthService(tempfile.mkdtemp())
+    try:
+        service = health(_health_map("disk-0", "disk-1"))
+        # The map is not saved until it reflects the alerts of the DB
+        await health.save(service)
+        assert_equal(os.path.exists(health.snapshot_path), False)
+        service._is_map_updated_with_db = True
+        disks = service.repo.health_schema.data()["nodes"]["srvnode-1"]["hw"]
+        disks["disk-1"].update(_leaf("Fault", "critical", "a-1"))
+        await health.save(service)
+        snapshot = health.snapshot()
+        assert_equal((snapshot["version"], snapshot["health_schema"],
+                      snapshot["high_water_mark"]),
+                     (const.HEALTH_SNAPSHOT_VERSION, health.schema_path, HIGH_WATER_MARK))
+        # The snapshot is merged onto the schema, new resources keep their defaults
+        restored = health(_health_map("disk-0", "disk-1", "disk-2"))
+        disks = restored.repo.health_schema.data()["nodes"]["srvnode-1"]["hw"]
+        assert_equal(disks["disk-1"], _leaf("Fault", "critical", "a-1"))
+        assert_equal(disks["disk-2"][const.ALERT_HEALTH], "OK")
+        assert_equal(restored._high_water_mark, HIGH_WATER_MARK)
+        # The index is built from the merged map
+        node = restored.repo.health_schema.data()["nodes"]["srvnode-1"]
+        summary = restored._get_health_summary(node)
+        assert_equal((summary[const.TOTAL], summary[const.CRITICAL.lower()]), (3, 1))
+    finally:
+        await health.close()
+
+
+@async_test
+async def test_stale_snapshot(args):
+    health = HealthService(tempfile.mkdtemp())
+    try:
+        service = health(_health_map("disk-0"))
+        service._is_map_updated_with_db = True
+        service.repo.health_schema.data()["nodes"]["srvnode-1"]["hw"]["disk-0"].update(
+            _leaf("Fault", "critical", "a-1"))
+        await health.save(service)
+        snapshot = health.snapshot()
+        for stale in ({**snapshot, "version": const.HEALTH_SNAPSHOT_VERSION + 1},
+                      {**snapshot, "health_schema": "/etc/csm/other_health_map.json"}):
+            with open(health.snapshot_path, 'w') as snapshot_file:
+                json.dump(stale, snapshot_file)
+            restored = health(_health_map("disk-0"))
+            disk = restored.repo.health_schema.data()["nodes"]["srvnode-1"]["hw"]["disk-0"]
+            assert_equal((disk[const.ALERT_HEALTH], restored._high_water_mark), ("OK", None))
+        with open(health.snapshot_path, 'w') as snapshot_file:
+            snapshot_file.write('{"version": 1, "health_')
+        assert_equal(health(_health_map("disk-0"))._high_water_mark, None)
+    finally:
+        await health.close()
+
+
+@async_test
+async def test_replay_since_high_water_mark(args):
+    health = HealthService(tempfile.mkdtemp())
+    try:
+        service = health(_health_map("disk-0"))
+        await service.update_health_schema_with_db()
+        # Without a snapshot all the alerts are replayed
+        assert_equal(service.alerts_repo.requests, [('all', None)])
+        await health.save(service)
+        restored = health(_health_map("disk-0"))
+        await restored.update_health_schema_with_db()
+        since = datetime.fromtimestamp(HIGH_WATER_MARK - const.HEALTH_SNAPSHOT_OVERLAP,
+                                       timezone.utc)
+        assert_equal(restored.alerts_repo.requests, [('since', since)])
+        assert_equal(restored._is_map_updated_with_db, True)
+    finally:
+        await health.close()
+
+
+@async_test
+async def test_periodic_snapshot(args):
+    health = HealthService(tempfile.mkdtemp())
+    try:
+        service = health(_health_map("disk-0"), **{const.HEALTH_SNAPSHOT_INTERVAL: 60})
+        snapshotter = service._snapshotter
+        assert_equal((snapshotter.is_running(), snapshotter.period.total_seconds()),
+                     (True, 60))
+        service._is_map_updated_with_db = True
+        # Restarted with the first period due now
+        snapshotter.stop()
+        with mock.patch('csm.core.services.health.time.time', return_value=HIGH_WATER_MARK), \
+                health.conf():
+            snapshotter.start()
+            await asyncio.sleep(0.1)
+        assert_equal(health.snapshot()["high_water_mark"], HIGH_WATER_MARK)
+        # The last snapshot is saved on shutdown, after the periodic ones stopped
+        with mock.patch('csm.core.services.health.time.time',
+                        return_value=HIGH_WATER_MARK + 30), health.conf():
+            await service.shutdown()
+        assert_equal((snapshotter.is_running(), health.snapshot()["high_water_mark"]),
+                     (False, HIGH_WATER_MARK + 30))
+        # Without a snapshot path there is no periodic snapshot
+        assert_equal(health(_health_map("disk-0"), **{const.HEALTH_SNAPSHOT_PATH: ""})
+                     ._snapshotter, None)
+    finally:
+        await health.close()
+
+
+test_list = [
+    test_save_and_load,
+    test_stale_snapshot,
+    test_replay_since_high_water_mark,
+    test_periodic_snapshot,
+]
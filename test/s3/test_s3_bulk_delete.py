@@ -0,0 +1,251 @@
+# CORTX-CSM: CORTX Management web and CLI interface.
+# Copyright (c) 2020 Seagate Technology LLC and/or its Affiliates
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+
+import asyncio
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+from aiohttp.test_utils import make_mocked_request
+from botocore.exceptions import ClientError
+from csm.common.conf import Conf
+from csm.core.blogic import const
+from csm.core.controllers.s3.buckets import S3BucketView
+from csm.core.data.models.s3 import S3ConnectionConfig
+from csm.core.services.s3.buckets import BucketDeletionJob, S3BucketService
+from csm.core.services.s3.utils import CsmS3ConfigurationFactory
+from csm.core.services.sessions import S3Credentials
+from csm.plugins.cortx.s3 import BulkDeleteMixin, S3Client
+from csm.test.common import TestFailed, assert_equal, assert_raises, async_test
+
+BUCKET_NAME = 'bucket1'
+WAIT_TIMEOUT = 5
+
+
+class FakeS3Bucket:
+    """
+    Low level client of a single bucket, counts the concurrent deletions.
+    The deletions of the keys from blocked_from on wait until released.
+    """
+
+    def __init__(self, count, denied=(), blocked_from=None):
+        self.keys = sorted(f'key{number:06}' for number in range(count))
+        self.denied = set(denied)
+        self.blocked_from = blocked_from
+        self.released = threading.Event()
+        self.batches = []
+        self.bucket_deleted = False
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def list_objects(self, Bucket, MaxKeys, Marker=''):
+        with self._lock:
+            keys = [key for key in self.keys if key > Marker]
+        return {
+            'Contents': [{'Key': key} for key in keys[:MaxKeys]],
+            'IsTruncated': len(keys) > MaxKeys
+        }
+
+    def delete_objects(self, Bucket, Delete):
+        keys = [obj['Key'] for obj in Delete['Objects']]
+        with self._lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            if self.blocked_from is not None and keys[-1] >= self.blocked_from:
+                self.released.wait(WAIT_TIMEOUT)
+            time.sleep(0.01)
+            errors = [{'Key': key, 'Code': 'AccessDenied', 'Message': 'Access Denied'}
+                      for key in keys if key in self.denied]
+            with self._lock:
+                self.batches.append(len(keys))
+                for key in keys:
+                    if key not in self.denied:
+                        self.keys.remove(key)
+            return {'Errors': errors} if errors else {}
+        finally:
+            with self._lock:
+                self.active -= 1
+
+    def delete_bucket(self, Bucket):
+        if self.keys:
+            raise ClientError({'Error': {'Code': 'BucketNotEmpty', 'Message': ''},
+                               'ResponseMetadata': {'HTTPStatusCode': 409}},
+                              'DeleteBucket')
+        self.bucket_deleted = True
+
+
+class FakeS3Client(S3Client):
+    """ S3 client with every thread connected to the same fake bucket """
+
+    def __init__(self, bucket, executor):
+        self.bucket = bucket
+        super().__init__('access_key', 'secret_key', S3ConnectionConfig(),
+                         loop=asyncio.get_event_loop(), executor=executor)
+
+    def _create_boto_connection(self, access_key, secret_key, config, session_token=None):
+        return mock.Mock(meta=mock.Mock(client=self.bucket))
+
+
+class FakeS3Plugin:
+
+    def __init__(self, client):
+        self.client = client
+
+    def get_s3_client(self, access_key, secret_key, connection_config=None,
+                      session_token=None):
+        return self.client
+
+
+def _credentials():
+    return S3Credentials('s3user', 'access_key', 'secret_key', 'session_token')
+
+
+def _bucket_service(client):
+    with mock.patch.object(CsmS3ConfigurationFactory, 'get_s3_connection_config',
+                           return_value=S3ConnectionConfig()):
+        return S3BucketService(FakeS3Plugin(client), None)
+
+
+def init(args):
+    args['executor'] = ThreadPoolExecutor(max_workers=8)
+
+
+def test_abstract_mixin(args):
+    class IncompleteClient(BulkDeleteMixin):
+        async def _delete_objects(self, bucket_name, keys):
+            return len(keys)
+
+    with assert_raises(TypeError):
+        IncompleteClient()
+
+
+@async_test
+async def test_delete_bucket_batches(args):
+    bucket = FakeS3Bucket(2500)
+    client = FakeS3Client(bucket, args[0]['executor'])
+    progress = []
+    await client.delete_bucket(BUCKET_NAME, concurrency=2, progress=progress.append)
+    assert_equal(sorted(bucket.batches), [500, 1000, 1000])
+    assert_equal(sorted(progress), [500, 1000, 1000])
+    assert_equal(bucket.keys, [])
+    assert_equal(bucket.bucket_deleted, True)
+    if bucket.max_active > 2:
+        raise TestFailed(f'{bucket.max_active} batches deleted at once, at most 2 expected')
+
+
+@async_test
+async def test_empty_bucket_small_batches(args):
+    bucket = FakeS3Bucket(25)
+    client = FakeS3Client(bucket, args[0]['executor'])
+    assert_equal(await client.empty_bucket(BUCKET_NAME, batch_size=10), 25)
+    assert_equal(sorted(bucket.batches), [5, 10, 10])
+    # An empty bucket takes no delete request
+    assert_equal(await client.empty_bucket(BUCKET_NAME), 0)
+    assert_equal(len(bucket.batches), 3)
+
+
+@async_test
+async def test_delete_objects_errors(args):
+    bucket = FakeS3Bucket(3000, denied=['key001500'])
+    client = FakeS3Client(bucket, args[0]['executor'])
+    try:
+        await client.delete_bucket(BUCKET_NAME)
+    except ClientError as e:
+        assert_equal(e.response['Error']['Code'], 'AccessDenied')
+        assert_equal(e.response['ResponseMetadata']['HTTPStatusCode'], 403)
+    else:
+        raise TestFailed('Denied deletions must fail the bucket deletion')
+    assert_equal('key001500' in bucket.keys, True)
+    assert_equal(bucket.bucket_deleted, False)
+
+
+def test_deletion_job(args):
+    job = BucketDeletionJob(BUCKET_NAME, 's3user')
+    job.progress(1000)
+    job.progress(500)
+    state = job.to_dict()
+    assert_equal((state['status'], state['deleted_objects'], state['finished']),
+                 (BucketDeletionJob.STATUS_RUNNING, 1500, None))
+    job.finish(ClientError({'Error': {'Code': 'AccessDenied', 'Message': 'Access Denied'}},
+                           'DeleteObjects'))
+    state = job.to_dict()
+    assert_equal(job.running, False)
+    assert_equal((state['status'], state['error_code'], state['message']),
+                 (BucketDeletionJob.STATUS_FAILED, 'AccessDenied', 'Access Denied'))
+
+
+@async_test
+async def test_service_deletion_progress(args):
+    bucket = FakeS3Bucket(2500, blocked_from='key001000')
+    service = _bucket_service(FakeS3Client(bucket, args[0]['executor']))
+    s3_session = _credentials()
+    try:
+        state = await service.delete_bucket(BUCKET_NAME, s3_session, timeout=0.5)
+        # The first batch is deleted, the others wait
+        assert_equal((state['status'], state['deleted_objects']),
+                     (BucketDeletionJob.STATUS_RUNNING, 1000))
+        assert_equal(await service.get_bucket_deletion(BUCKET_NAME, s3_session), state)
+        # The running deletion is reused
+        job = await service.start_bucket_deletion(BUCKET_NAME, s3_session)
+        bucket.released.set()
+        await asyncio.wait_for(job.task, WAIT_TIMEOUT)
+    finally:
+        bucket.released.set()
+    state = await service.get_bucket_deletion(BUCKET_NAME, s3_session)
+    assert_equal((state['status'], state['deleted_objects']),
+                 (BucketDeletionJob.STATUS_COMPLETED, 2500))
+    assert_equal(bucket.bucket_deleted, True)
+    assert_equal(len(bucket.batches), 3)
+
+
+@async_test
+async def test_delete_view_accepted(args):
+    bucket = FakeS3Bucket(2000, blocked_from='key001000')
+    service = _bucket_service(FakeS3Client(bucket, args[0]['executor']))
+    request = make_mocked_request('DELETE', f'/api/v1/s3/bucket/{BUCKET_NAME}',
+                                  match_info={'bucket_name': BUCKET_NAME},
+                                  app={'s3_bucket_service': service})
+    request.session = mock.Mock(credentials=_credentials())
+    delete_wait = {const.S3_DELETE_WAIT: 0.5}
+    with mock.patch.object(Conf, 'get',
+                           side_effect=lambda index, key, default=None:
+                           delete_wait.get(key, default)):
+        try:
+            response = await S3BucketView(request).delete()
+            assert_equal(response.status, const.STATUS_ACCEPTED)
+            state = json.loads(response.text)
+            assert_equal((state['bucket_name'], state['status']),
+                         (BUCKET_NAME, BucketDeletionJob.STATUS_RUNNING))
+        finally:
+            bucket.released.set()
+        # A deletion done within the wait is answered right away
+        delete_wait[const.S3_DELETE_WAIT] = WAIT_TIMEOUT
+        result = await S3BucketView(request).delete()
+    assert_equal(result, {"message": "Bucket Deleted Successfully."})
+    assert_equal(bucket.bucket_deleted, True)
+
+
+test_list = [
+    test_abstract_mixin,
+    test_delete_bucket_batches,
+    test_empty_bucket_small_batches,
+    test_delete_objects_errors,
+    test_deletion_job,
+    test_service_deletion_progress,
+    test_delete_view_accepted,
+]
@@ -0,0 +1,119 @@
+# CORTX-CSM: CORTX Management web and CLI interface.
+# Copyright (c) 2020 Seagate Technology LLC and/or its Affiliates
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+from boto import config as boto_config
+from csm.core.data.models.s3 import S3ConnectionConfig
+from csm.plugins.cortx.s3 import BaseClient, S3ClientPool
+from csm.test.common import assert_equal
+
+THREADS = 8
+
+
+class FakeClient(BaseClient):
+    """ Client whose connections record the CA file boto read for them """
+
+    def _create_boto_connection_object(self, **kwargs):
+        ca_cert = boto_config.get('Boto', 'ca_certificates_file')
+        # Let the other threads run while the connection is created
+        time.sleep(0.01)
+        return mock.Mock(ca_certs=(ca_cert, boto_config.get('Boto', 'ca_certificates_file')))
+
+
+class Factory:
+    """ Creates the clients of the pool and counts them """
+
+    def __init__(self):
+        self.created = 0
+
+    def __call__(self):
+        self.created += 1
+        return object()
+
+
+def _config(ca_cert_file):
+    config = S3ConnectionConfig()
+    config.host = 'localhost'
+    config.port = 9080
+    config.ca_cert_file = ca_cert_file
+    return config
+
+
+def init(args):
+    pass
+
+
+def test_lru_eviction(args):
+    pool = S3ClientPool(size=2, ttl=300)
+    factory = Factory()
+    first = pool.get(('iam', 'first'), factory)
+    second = pool.get(('iam', 'second'), factory)
+    assert_equal(pool.get(('iam', 'first'), factory), first)
+    # The least recently used client is evicted first
+    pool.get(('iam', 'third'), factory)
+    assert_equal(pool.get(('iam', 'first'), factory), first)
+    assert_equal(factory.created, 3)
+    assert_equal(pool.get(('iam', 'second'), factory) is second, False)
+    assert_equal(factory.created, 4)
+    pool.clear()
+    pool.get(('iam', 'first'), factory)
+    assert_equal(factory.created, 5)
+
+
+def test_ttl_eviction(args):
+    pool = S3ClientPool(size=64, ttl=300)
+    factory = Factory()
+    with mock.patch('csm.plugins.cortx.s3.time.monotonic', return_value=1000):
+        client = pool.get(('s3', 'key'), factory)
+    with mock.patch('csm.plugins.cortx.s3.time.monotonic', return_value=1299):
+        assert_equal(pool.get(('s3', 'key'), factory), client)
+    # The time to live counts from the creation of the client, not its last use
+    with mock.patch('csm.plugins.cortx.s3.time.monotonic', return_value=1300):
+        renewed = pool.get(('s3', 'key'), factory)
+    assert_equal((renewed is client, factory.created), (False, 2))
+    with mock.patch('csm.plugins.cortx.s3.time.monotonic', return_value=1500):
+        assert_equal(pool.get(('s3', 'key'), factory), renewed)
+
+
+def test_connection_ca_cert(args):
+    saved = boto_config.get('Boto', 'ca_certificates_file') \
+        if boto_config.has_section('Boto') else None
+    executor = ThreadPoolExecutor(max_workers=THREADS)
+    try:
+        clients = [FakeClient('access', 'secret', _config(f'/etc/ssl/ca{i % 2}.pem'),
+                              executor=executor)
+                   for i in range(THREADS)]
+        barrier = threading.Barrier(THREADS)
+
+        def connect(client):
+            barrier.wait()
+            return client.connection.ca_certs
+        ca_certs = list(executor.map(connect, clients))
+    finally:
+        executor.shutdown()
+        if saved is not None:
+            boto_config.set('Boto', 'ca_certificates_file', saved)
+    # The connections created on the executor threads use the CA of their client
+    assert_equal(ca_certs, [(f'/etc/ssl/ca{i % 2}.pem',) * 2 for i in range(THREADS)])
+
+
+test_list = [
+    test_lru_eviction,
+    test_ttl_eviction,
+    test_connection_ca_cert,
+]
@@ -0,0 +1,287 @@
+# CORTX-CSM: CORTX Management web and CLI interface.
+# Copyright (c) 2020 Seagate Technology LLC and/or its Affiliates
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+
+import sys
+import os
+import asyncio
+import hashlib
+import re
+from datetime import datetime, timezone
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+from aiohttp import web
+from botocore.exceptions import ClientError
+from cortx.utils.log import Log
+from csm.core.data.models.s3 import (S3ConnectionConfig, ExtendedIamAccount,
+                                     IamAccountListResponse, IamError)
+from csm.plugins.cortx.s3_native import (SigV4Signer, NativeIamClient, NativeS3Client,
+                                         create_session)
+from csm.test.common import TestFailed, assert_equal
+
+ACCESS_KEY = 'AKIDEXAMPLE'
+SECRET_KEY = 'wJalrXUtnFEMI/K7MDENG+bPxRfiCYEXAMPLEKEY'
+
+IAM_LIST_ACCOUNTS = '''<?xml version="1.0" encoding="UTF-8"?>
+<ListAccountsResponse xmlns="https://iam.seagate.com/doc/2010-05-08/">
+  <ListAccountsResult>
+    <Accounts>{}</Accounts>
+    <IsTruncated>false</IsTruncated>
+  </ListAccountsResult>
+  <ResponseMetadata><RequestId>0000</RequestId></ResponseMetadata>
+</ListAccountsResponse>'''
+
+IAM_ACCOUNT = '''<member><AccountName>{0}</AccountName><AccountId>{0}-id</AccountId>
+<CanonicalId>{0}-cid</CanonicalId><Email>{0}@test.com</Email></member>'''
+
+IAM_CREATE_ACCOUNT = '''<?xml version="1.0" encoding="UTF-8"?>
+<CreateAccountResponse xmlns="https://iam.seagate.com/doc/2010-05-08/">
+  <CreateAccountResult><Account>
+    <AccountId>{0}-id</AccountId><CanonicalId>{0}-cid</CanonicalId>
+    <AccountName>{0}</AccountName><RootUserName>root</RootUserName>
+    <AccessKeyId>AK{0}</AccessKeyId><RootSecretKeyId>SK{0}</RootSecretKeyId>
+    <Status>Active</Status>
+  </Account></CreateAccountResult>
+</CreateAccountResponse>'''
+
+IAM_ERROR = '''<?xml version="1.0" encoding="UTF-8"?>
+<ErrorResponse xmlns="https://iam.seagate.com/doc/2010-05-08/">
+  <Error><Code>{}</Code><Message>{}</Message></Error>
+  <RequestId>0000</RequestId>
+</ErrorResponse>'''
+
+S3_LIST_BUCKETS = '''<?xml version="1.0" encoding="UTF-8"?>
+<ListAllMyBucketsResult xmlns="http://s3.amazonaws.com/doc/2006-03-01/">
+  <Owner><ID>id</ID><DisplayName>test</DisplayName></Owner>
+  <Buckets>{}</Buckets>
+</ListAllMyBucketsResult>'''
+
+S3_LIST_OBJECTS = '''<?xml version="1.0" encoding="UTF-8"?>
+<ListBucketResult xmlns="http://s3.amazonaws.com/doc/2006-03-01/">
+  <Name>{}</Name><IsTruncated>{}</IsTruncated>{}
+</ListBucketResult>'''
+
+S3_ERROR = '''<?xml version="1.0" encoding="UTF-8"?>
+<Error><Code>{}</Code><Message>{}</Message></Error>'''
+
+
+class StubServer:
+    """
+    Minimal IAM and S3 server keeping its state in memory.
+    Every request must carry a valid signature version 4.
+    """
+
+    AUTH_RE = re.compile(r'Credential=([^/]+)/[^,]+, SignedHeaders=([^,]+), Signature=')
+
+    def __init__(self):
+        self.accounts = []
+        self.buckets = {}
+        self.tags = {}
+
+    async def _check_signature(self, request, body):
+        match = self.AUTH_RE.search(request.headers.get('Authorization', ''))
+        if not match or match.group(1) != ACCESS_KEY:
+            raise web.HTTPForbidden()
+        signed = match.group(2).split(';')
+        headers = {name: request.headers[name] for name in signed
+                   if name not in ('x-amz-date', 'x-amz-security-token')}
+        now = datetime.strptime(request.headers['X-Amz-Date'], '%Y%m%dT%H%M%SZ')
+        service = 'iam' if request.path == '/' and request.method == 'POST' else 's3'
+        payload_hash = request.headers.get('X-Amz-Content-SHA256',
+                                           hashlib.sha256(body).hexdigest())
+        expected = SigV4Signer(ACCESS_KEY, SECRET_KEY, service=service).sign(
+            request.method, request.raw_path.split('?')[0], dict(request.query),
+            headers, payload_hash, now.replace(tzinfo=timezone.utc))
+        if expected['Authorization'] != request.headers['Authorization']:
+            raise web.HTTPForbidden()
+
+    async def iam(self, request):
+        body = await request.read()
+        await self._check_signature(request, body)
+        params = await request.post()
+        action = params['Action']
+        if action == 'ListAccounts':
+            accounts = ''.join(IAM_ACCOUNT.format(name) for name in self.accounts)
+            return web.Response(text=IAM_LIST_ACCOUNTS.format(accounts))
+        if action == 'CreateAccount':
+            name = params['AccountName']
+            if name in self.accounts:
+                return web.Response(status=409, text=IAM_ERROR.format(
+                    'EntityAlreadyExists', 'The request was rejected because '
+                    'account with this name already exists.'))
+            self.accounts.append(name)
+            return web.Response(status=201, text=IAM_CREATE_ACCOUNT.format(name))
+        return web.Response(status=400, text=IAM_ERROR.format('InvalidAction', action))
+
+    async def s3(self, request):
+        body = await request.read()
+        await self._check_signature(request, body)
+        bucket = request.match_info.get('bucket')
+        if bucket is None:
+            buckets = ''.join(f'<Bucket><Name>{name}</Name></Bucket>'
+                              for name in self.buckets)
+            return web.Response(text=S3_LIST_BUCKETS.format(buckets))
+        if request.method == 'PUT' and 'tagging' in request.query:
+            self.tags[bucket] = dict(re.findall(
+                r'<Key>(.*?)</Key><Value>(.*?)</Value>', body.decode()))
+            return web.Response()
+        if request.method == 'PUT':
+            self.buckets[bucket] = [f'dir/object {i}' for i in range(2500)]
+            return web.Response()
+        if bucket not in self.buckets:
+            return web.Response(status=404, text=S3_ERROR.format(
+                'NoSuchBucket', 'The specified bucket does not exist'))
+        if request.method == 'HEAD':
+            return web.Response()
+        if 'tagging' in request.query:
+            if not self.tags.get(bucket):
+                return web.Response(status=404, text=S3_ERROR.format(
+                    'NoSuchTagSet', 'The TagSet does not exist'))
+            tags = ''.join(f'<Tag><Key>{k}</Key><Value>{v}</Value></Tag>'
+                           for k, v in self.tags.get(bucket, {}).items())
+            return web.Response(text=f'<Tagging><TagSet>{tags}</TagSet></Tagging>')
+        if request.method == 'GET':
+            marker = request.query.get('marker', '')
+            keys = sorted(key for key in self.buckets[bucket] if key > marker)
+            max_keys = int(request.query.get('max-keys', 1000))
+            contents = ''.join(f'<Contents><Key>{key}</Key></Contents>'
+                               for key in keys[:max_keys])
+            truncated = 'true' if len(keys) > max_keys else 'false'
+            return web.Response(text=S3_LIST_OBJECTS.format(bucket, truncated, contents))
+        if request.method == 'POST' and 'delete' in request.query:
+            for key in re.findall(r'<Key>(.*?)</Key>', body.decode()):
+                self.buckets[bucket].remove(key)
+            return web.Response(text='<DeleteResult></DeleteResult>')
+        if self.buckets[bucket]:
+            return web.Response(status=409, text=S3_ERROR.format(
+                'BucketNotEmpty', 'The bucket you tried to delete is not empty'))
+        del self.buckets[bucket]
+        return web.Response(status=204)
+
+
+async def _test_iam_accounts(iam_client):
+    account = await iam_client.create_account('csm_s3_test', 'csm_s3_test@test.com')
+    if not isinstance(account, ExtendedIamAccount):
+        raise TestFailed("Account creation failed: " + repr(account))
+    assert_equal(account.access_key_id, 'AKcsm_s3_test')
+
+    error = await iam_client.create_account('csm_s3_test', 'csm_s3_test@test.com')
+    if not isinstance(error, IamError):
+        raise TestFailed("Duplicate account has been created")
+    assert_equal(error.http_status, 409)
+
+    account_list = await iam_client.list_accounts()
+    if not isinstance(account_list, IamAccountListResponse):
+        raise TestFailed("Account list fetching failed: " + repr(account_list))
+    assert_equal([x.account_name for x in account_list.iam_accounts], ['csm_s3_test'])
+    assert_equal(account_list.is_truncated, False)
+
+
+async def _test_buckets(s3_client):
+    bucket = await s3_client.create_bucket('native-test')
+    assert_equal(bucket.name, 'native-test')
+    assert_equal([b.name for b in await s3_client.get_all_buckets()], ['native-test'])
+    if await s3_client.get_bucket('missing') is not None:
+        raise TestFailed("A missing bucket has been found")
+
+    assert_equal(await s3_client.get_bucket_tagging(bucket), {})
+    await s3_client.put_bucket_tagging('native-test', {'udx': 'enabled'})
+    assert_equal(await s3_client.get_bucket_tagging(bucket), {'udx': 'enabled'})
+
+    # The objects of the bucket are deleted first, in batches
+    deleted = []
+    await s3_client.delete_bucket('native-test', progress=deleted.append)
+    assert_equal(sorted(deleted), [500, 1000, 1000])
+    assert_equal(await s3_client.get_all_buckets(), [])
+    try:
+        await s3_client.delete_bucket('native-test')
+    except ClientError as e:
+        assert_equal(e.response['Error']['Code'], 'NoSuchBucket')
+        assert_equal(e.response['ResponseMetadata']['HTTPStatusCode'], 404)
+    else:
+        raise TestFailed("A missing bucket has been deleted")
+    # Only a missing tag set is reported as no tags
+    try:
+        await s3_client.get_bucket_tagging(bucket)
+    except ClientError as e:
+        assert_equal(e.response['Error']['Code'], 'NoSuchBucket')
+    else:
+        raise TestFailed("Tags of a missing bucket have been read")
+
+
+def init(args):
+    loop = asyncio.get_event_loop()
+    stub = StubServer()
+    app = web.Application()
+    app.add_routes([web.post('/', stub.iam),
+                    web.get('/', stub.s3),
+                    web.route('*', '/{bucket}', stub.s3)])
+    runner = web.AppRunner(app)
+    loop.run_until_complete(runner.setup())
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    loop.run_until_complete(site.start())
+
+    config = S3ConnectionConfig()
+    config.host = '127.0.0.1'
+    config.port = site._server.sockets[0].getsockname()[1]
+    args['loop'] = loop
+    args['runner'] = runner
+    args['s3_native_config'] = config
+
+
+def test_signature(args):
+    """ Example request of the AWS signature version 4 documentation """
+    signer = SigV4Signer(ACCESS_KEY, SECRET_KEY, service='iam')
+    headers = signer.sign('GET', '/', {'Action': 'ListUsers', 'Version': '2010-05-08'},
+                          {'Host': 'iam.amazonaws.com',
+                           'Content-Type': 'application/x-www-form-urlencoded; charset=utf-8'},
+                          hashlib.sha256(b'').hexdigest(),
+                          datetime(2015, 8, 30, 12, 36, tzinfo=timezone.utc))
+    signature = headers['Authorization'].rpartition('Signature=')[2]
+    assert_equal(signature, '5d672d79c15b13162d9279b0855cfba6789a8edb4c82c400e06b5924a6f2b5d7')
+
+
+def test_iam_accounts(args):
+    loop = args['loop']
+
+    async def _run():
+        async with create_session() as session:
+            iam_client = NativeIamClient(ACCESS_KEY, SECRET_KEY, args['s3_native_config'],
+                                         loop, session=session)
+            await _test_iam_accounts(iam_client)
+
+    loop.run_until_complete(_run())
+
+
+def test_buckets(args):
+    loop = args['loop']
+
+    async def _run():
+        async with create_session() as session:
+            s3_client = NativeS3Client(ACCESS_KEY, SECRET_KEY, args['s3_native_config'],
+                                       loop, session=session)
+            await _test_buckets(s3_client)
+
+    loop.run_until_complete(_run())
+    loop.run_until_complete(args['runner'].cleanup())
+
+
+test_list = [test_signature, test_iam_accounts, test_buckets]
+
+if __name__ == '__main__':
+    Log.init('test', '.')
+    test_args = {}
+    init(test_args)
+    for test in test_list:
+        test(test_args)
@@ -0,0 +1,165 @@
+# CORTX-CSM: CORTX Management web and CLI interface.
+# Copyright (c) 2020 Seagate Technology LLC and/or its Affiliates
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+
+import asyncio
+import math
+from unittest import mock
+from csm.common.conf import Conf
+from csm.common.errors import CsmInternalError
+from csm.common.timeseries import StatsCache, TimelionProvider
+from csm.core.blogic import const
+from csm.test.common import assert_equal, assert_raises, async_test
+
+INTERVAL = 10
+NOW = 1600000005
+
+
+class FakeProcessRequest:
+    """
+    Stands for the timelion query of TimelionProvider._process_request,
+    records the requests and may wait until released or fail
+    """
+
+    def __init__(self):
+        self.requests = []
+        self.released = asyncio.Event()
+        self.released.set()
+        self.errors = []
+
+    async def __call__(self, stats_id, panel, from_t, duration_t, metric_list, interval,
+                       total_sample, unit, output_format, query):
+        self.requests.append((stats_id, from_t, duration_t))
+        await self.released.wait()
+        if self.errors:
+            raise self.errors.pop(0)
+        return {'id': stats_id, 'stats': panel, 'list': [from_t, duration_t]}
+
+
+def _provider(cache_size=256):
+    settings = {'STATS.PROVIDER.host': 'localhost', 'STATS.PROVIDER.port': 8081}
+    with mock.patch.object(Conf, 'get', side_effect=lambda index, key, default=None:
+                           settings.get(key, default)):
+        provider = TimelionProvider(const.AGGREGATION_RULE)
+    provider._storage_interval = INTERVAL
+    provider._cache = StatsCache(cache_size)
+    provider._process_request = FakeProcessRequest()
+    return provider
+
+
+async def _get_stats(provider, stats_id, from_t, duration_t, query=''):
+    return await provider.process_request(stats_id, 'throughput', from_t, duration_t,
+                                          ['read_bytes'], '', '', '', 'gui', query)
+
+
+def init(args):
+    pass
+
+
+def test_align_range(args):
+    provider = _provider()
+    assert_equal(provider._align_range(1001, 1019), (1000, 1020))
+    assert_equal(provider._align_range('1000', '1020'), (1000, 1020))
+    assert_equal(provider._align_range(1009, 1011), (1000, 1020))
+    with assert_raises(ValueError):
+        provider._align_range('now', 1020)
+
+
+def test_payload_expiry(args):
+    provider = _provider()
+    # A range stored already does not change
+    assert_equal(provider._payload_expiry(NOW - 2 * INTERVAL, NOW), math.inf)
+    assert_equal(provider._payload_expiry(NOW - INTERVAL, NOW), math.inf)
+    # A range reaching the trailing interval is valid until the next one is stored
+    assert_equal(provider._payload_expiry(NOW - 5, NOW), NOW + 5)
+    assert_equal(provider._payload_expiry(NOW + 100, NOW), NOW + 5)
+
+
+@async_test
+async def test_shared_request(args):
+    provider = _provider()
+    process_request = provider._process_request
+    process_request.released.clear()
+    requests = [asyncio.ensure_future(_get_stats(provider, stats_id, from_t, 2001))
+                for stats_id, from_t in (('first', 1001), ('second', 1009))]
+    await asyncio.sleep(0)
+    process_request.released.set()
+    first, second = await asyncio.gather(*requests)
+    # The requests of the same aligned range share one query
+    assert_equal(process_request.requests, [(None, 1000, 2010)])
+    assert_equal((first['id'], second['id']), ('first', 'second'))
+    assert_equal(first['list'], second['list'])
+    await _get_stats(provider, 'third', 1000, 2010)
+    assert_equal(len(process_request.requests), 1)
+    # Direct queries are not cached
+    await _get_stats(provider, 'query', 1000, 2010, query='.es(*)')
+    await _get_stats(provider, 'query', 1000, 2010, query='.es(*)')
+    assert_equal(process_request.requests[1:], [('query', 1000, 2010)] * 2)
+
+
+@async_test
+async def test_expiry(args):
+    provider = _provider()
+    process_request = provider._process_request
+    with mock.patch('csm.common.timeseries.time.time', return_value=NOW):
+        await _get_stats(provider, 'stored', NOW - 100, NOW - 50)
+        await _get_stats(provider, 'recent', NOW - 100, NOW)
+    assert_equal(len(process_request.requests), 2)
+    with mock.patch('csm.common.timeseries.time.time', return_value=NOW + 4):
+        await _get_stats(provider, 'stored', NOW - 100, NOW - 50)
+        await _get_stats(provider, 'recent', NOW - 100, NOW)
+    assert_equal(len(process_request.requests), 2)
+    # Only the range reaching the trailing interval is queried again
+    with mock.patch('csm.common.timeseries.time.time', return_value=NOW + 3600):
+        await _get_stats(provider, 'stored', NOW - 100, NOW - 50)
+        await _get_stats(provider, 'recent', NOW - 100, NOW)
+    assert_equal(process_request.requests[2:], [(None, NOW - 105, NOW + 5)])
+
+
+@async_test
+async def test_errors_not_cached(args):
+    provider = _provider()
+    process_request = provider._process_request
+    process_request.errors.append(CsmInternalError('Connection failed to timelion'))
+    process_request.released.clear()
+    requests = [asyncio.ensure_future(_get_stats(provider, stats_id, 1000, 2000))
+                for stats_id in ('first', 'second')]
+    await asyncio.sleep(0)
+    process_request.released.set()
+    results = await asyncio.gather(*requests, return_exceptions=True)
+    # The requests sharing the failed query fail together
+    assert_equal([type(result) for result in results], [CsmInternalError] * 2)
+    assert_equal((await _get_stats(provider, 'third', 1000, 2000))['id'], 'third')
+    assert_equal(len(process_request.requests), 2)
+
+
+@async_test
+async def test_lru_eviction(args):
+    provider = _provider(cache_size=2)
+    process_request = provider._process_request
+    for from_t in (1000, 2000, 1000, 3000, 1000, 2000):
+        await _get_stats(provider, 'lru', from_t, from_t + 100)
+    # The least recently used range is evicted first
+    assert_equal([request[1] for request in process_request.requests],
+                 [1000, 2000, 3000, 2000])
+
+
+test_list = [
+    test_align_range,
+    test_payload_expiry,
+    test_shared_request,
+    test_expiry,
+    test_errors_not_cached,
+    test_lru_eviction,
+]
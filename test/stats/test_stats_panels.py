@@ -0,0 +1,98 @@
+# CORTX-CSM: CORTX Management web and CLI interface.
+# Copyright (c) 2020 Seagate Technology LLC and/or its Affiliates
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+
+import asyncio
+from unittest import mock
+from csm.common.errors import CsmInternalError
+from csm.core.services.stats import STATS_PANEL_MSG_FAILED, StatsAppService
+from csm.test.common import TestFailed, assert_equal, async_test
+
+TIMELION_ERROR = 'Connection failed to timelion http://localhost:5601/api/timelion/run'
+
+
+class FakeStatsProvider:
+    """
+    Answers the panels after their delay, the failing panels raise their error
+    """
+
+    def __init__(self, delays, errors=None):
+        self.delays = delays
+        self.errors = errors or {}
+
+    async def process_request(self, stats_id, panel, **request):
+        await asyncio.sleep(self.delays.get(panel, 0))
+        if panel in self.errors:
+            raise self.errors[panel]
+        return {'id': stats_id, 'list': [{'name': f'{panel}.{metric}'}
+                                         for metric in request['metric_list'] or ['total']]}
+
+
+async def _get_panels(provider, panels):
+    return await StatsAppService(provider).get_panels(
+        'stats', panels, 1000, 2000, '', '', 'gui')
+
+
+def init(args):
+    pass
+
+
+@async_test
+async def test_panels_order(args):
+    provider = FakeStatsProvider({'throughput': 0.03, 'iops': 0.01, 'latency': 0})
+    output = await _get_panels(provider, ['throughput', 'iops', 'latency'])
+    # The metrics keep the order of the panels, not the order they completed in
+    assert_equal(output, {'id': 'stats', 'metrics': [{'name': 'throughput.total'},
+                                                     {'name': 'iops.total'},
+                                                     {'name': 'latency.total'}]})
+    output = await StatsAppService(provider).get_metrics(
+        'stats', ['throughput.read_bytes', 'iops.read_ops', 'throughput.write_bytes.mb'],
+        1000, 2000, '', '', 'gui')
+    assert_equal([metric['name'] for metric in output['metrics']],
+                 ['throughput.read_bytes', 'throughput.write_bytes', 'iops.read_ops'])
+
+
+@async_test
+async def test_partial_results(args):
+    provider = FakeStatsProvider({}, {'iops': CsmInternalError(TIMELION_ERROR),
+                                      'latency': asyncio.CancelledError()})
+    with mock.patch('csm.core.services.stats.Log') as log:
+        output = await _get_panels(provider, ['throughput', 'iops', 'latency'])
+    assert_equal(output['metrics'], [{'name': 'throughput.total'}])
+    # The clients get no detail of the failures, it is only logged
+    assert_equal(output['errors'], [{'panel': 'iops', 'message': STATS_PANEL_MSG_FAILED},
+                                    {'panel': 'latency', 'message': STATS_PANEL_MSG_FAILED}])
+    logged = [args[0] for args, _ in log.error.call_args_list]
+    assert_equal([('iops' in logged[0]), ('latency' in logged[1])], [True, True])
+
+
+@async_test
+async def test_all_failed(args):
+    error = CsmInternalError(TIMELION_ERROR)
+    provider = FakeStatsProvider({'throughput': 0.01}, {'throughput': CsmInternalError('late'),
+                                                        'iops': error})
+    try:
+        await _get_panels(provider, ['iops', 'throughput'])
+    except CsmInternalError as e:
+        # The error of the first panel is raised
+        assert_equal(e, error)
+    else:
+        raise TestFailed('The request must fail when no panel succeeds')
+
+
+test_list = [
+    test_panels_order,
+    test_partial_results,
+    test_all_failed,
+]
@@ -0,0 +1,137 @@
+# CORTX-CSM: CORTX Management web and CLI interface.
+# Copyright (c) 2020 Seagate Technology LLC and/or its Affiliates
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+
+import json
+from unittest import mock
+import aiohttp
+from aiohttp import web
+from csm.common.conf import Conf
+from csm.common.errors import CsmInternalError
+from csm.common.timeseries import TimelionProvider
+from csm.core.blogic import const
+from csm.test.common import assert_equal, assert_raises, async_test
+
+QUERY = {"sheet": [".es(*)"], "time": {"from": "1000", "interval": "10", "to": "2000"}}
+
+
+class StubTimelion:
+    """
+    Timelion API answering the queries with the sheet it got.
+    The connection of the next requests may be closed without a response.
+    """
+
+    def __init__(self):
+        self.requests = []
+        self.peers = set()
+        self.disconnects = 0
+
+    async def run(self, request):
+        self.requests.append(await request.json())
+        self.peers.add(request.transport.get_extra_info('peername'))
+        if self.disconnects:
+            self.disconnects -= 1
+            request.transport.close()
+        return web.json_response({"sheet": self.requests[-1]["sheet"]})
+
+
+class Timelion:
+    """ Timelion provider querying the stub server """
+
+    async def start(self):
+        self.stub = StubTimelion()
+        app = web.Application()
+        app.add_routes([web.post('/api/timelion/run', self.stub.run)])
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, '127.0.0.1', 0)
+        await site.start()
+        settings = {'STATS.PROVIDER.host': '127.0.0.1',
+                    'STATS.PROVIDER.port': site._server.sockets[0].getsockname()[1]}
+        with mock.patch.object(Conf, 'get', side_effect=lambda index, key, default=None:
+                               settings.get(key, default)):
+            self.provider = TimelionProvider(const.AGGREGATION_RULE)
+        self.provider._connections = 10
+        self.provider._timeout = aiohttp.ClientTimeout(total=5, connect=1)
+        self.provider._retries = 2
+        return self.provider, self.stub
+
+    async def stop(self):
+        await self.provider.shutdown()
+        await self.runner.cleanup()
+
+
+def init(args):
+    pass
+
+
+@async_test
+async def test_retry(args):
+    timelion = Timelion()
+    provider, stub = await timelion.start()
+    try:
+        stub.disconnects = 2
+        response = await provider._query(QUERY)
+        assert_equal(json.loads(response), {"sheet": QUERY["sheet"]})
+        assert_equal(stub.requests, [QUERY] * 3)
+        # The query fails once the retries are used up
+        stub.disconnects = 3
+        with assert_raises(CsmInternalError):
+            await provider._query(QUERY)
+        assert_equal(len(stub.requests), 6)
+    finally:
+        await timelion.stop()
+
+
+@async_test
+async def test_session(args):
+    timelion = Timelion()
+    provider, stub = await timelion.start()
+    try:
+        await provider._query(QUERY)
+        session = provider._session
+        await provider._query(QUERY)
+        # The connection is kept alive and reused by the next query
+        assert_equal((provider._session, len(stub.peers)), (session, 1))
+        # A closed session is replaced on the next query
+        await session.close()
+        await provider._query(QUERY)
+        assert_equal(provider._session is session, False)
+        assert_equal((provider._session.closed, len(stub.requests)), (False, 3))
+    finally:
+        await timelion.stop()
+
+
+@async_test
+async def test_shutdown(args):
+    timelion = Timelion()
+    provider, stub = await timelion.start()
+    try:
+        await provider._query(QUERY)
+        session = provider._session
+        await provider.shutdown()
+        assert_equal((session.closed, provider._session), (True, None))
+        await provider.shutdown()
+        # The provider may still be queried after a shutdown
+        await provider._query(QUERY)
+        assert_equal((provider._session.closed, len(stub.requests)), (False, 2))
+    finally:
+        await timelion.stop()
+
+
+test_list = [
+    test_retry,
+    test_session,
+    test_shutdown,
+]
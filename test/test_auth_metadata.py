@@ -0,0 +1,138 @@
+# CORTX-CSM: CORTX Management web and CLI interface.
+# Copyright (c) 2020 Seagate Technology LLC and/or its Affiliates
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+
+from contextlib import contextmanager
+from unittest import mock
+from aiohttp import hdrs, web
+from aiohttp.test_utils import make_mocked_request
+from csm.common.permission_names import Resource, Action
+from csm.core.agent.api import CsmRestApi
+from csm.core.controllers.routes import CsmRoutes
+from csm.core.controllers.view import CsmAuth, CsmView
+from csm.core.services.permissions import PermissionSet
+from csm.test.common import assert_equal, async_test
+
+ALERTS_UPDATE = PermissionSet({Resource.ALERTS: {Action.UPDATE}})
+STATS_LIST = PermissionSet({Resource.STATS: {Action.LIST}})
+
+
+class AlertsView(CsmView):
+    """ View with a public method and methods with their own permissions """
+
+    @CsmAuth.public
+    async def get(self):
+        pass
+
+    @CsmAuth.permissions({Resource.ALERTS: {Action.UPDATE}})
+    async def patch(self):
+        pass
+
+    async def post(self):
+        pass
+
+
+@CsmAuth.public
+class LoginView(CsmView):
+    """ Public view, none of its methods has an auth decorator """
+
+    async def post(self):
+        pass
+
+
+@CsmAuth.permissions({Resource.STATS: {Action.LIST}})
+async def stats_handler(request):
+    pass
+
+
+async def version_handler(request):
+    pass
+
+
+def _application():
+    app = web.Application()
+    app.router.add_view('/api/v1/alerts', AlertsView)
+    app.router.add_view('/api/v1/login', LoginView)
+    app.router.add_get('/api/v1/stats', stats_handler, allow_head=False)
+    app.router.add_route(hdrs.METH_ANY, '/api/v1/version', version_handler)
+    return app
+
+
+@contextmanager
+def _auth_metadata():
+    """ Empty auth metadata cache, the routes of the other tests are restored after """
+    with mock.patch.object(CsmView, '_auth_metadata', {}):
+        yield CsmView._auth_metadata
+
+
+async def _request(app, method, path):
+    """ Request resolved by the router, as the middlewares get it """
+    request = make_mocked_request(method, path, app=app)
+    request._match_info = await app.router.resolve(request)
+    return request
+
+
+def init(args):
+    pass
+
+
+def test_add_auth_metadata(args):
+    with _auth_metadata() as metadata:
+        CsmRoutes.add_auth_metadata(_application())
+        assert_equal(metadata[(AlertsView, hdrs.METH_GET)], (True, PermissionSet()))
+        assert_equal(metadata[(AlertsView, hdrs.METH_PATCH)], (False, ALERTS_UPDATE))
+        assert_equal(metadata[(AlertsView, hdrs.METH_POST)], (False, PermissionSet()))
+        # The view decorator applies to all of its methods
+        assert_equal(metadata[(LoginView, hdrs.METH_POST)], (True, PermissionSet()))
+        assert_equal(metadata[(LoginView, hdrs.METH_DELETE)], (True, PermissionSet()))
+        assert_equal(metadata[(stats_handler, hdrs.METH_GET)], (False, STATS_LIST))
+        assert_equal((stats_handler, hdrs.METH_HEAD) in metadata, False)
+        # A route of any method gets the metadata of every method
+        for method in hdrs.METH_ALL:
+            assert_equal(metadata[(version_handler, method)], (False, PermissionSet()))
+
+
+@async_test
+async def test_request_auth_metadata(args):
+    app = _application()
+    with _auth_metadata() as metadata:
+        CsmRoutes.add_auth_metadata(app)
+        routes = dict(metadata)
+        with mock.patch.object(CsmView, 'get_auth_metadata',
+                               wraps=CsmView.get_auth_metadata) as get_auth_metadata:
+            request = await _request(app, hdrs.METH_PATCH, '/api/v1/alerts')
+            assert_equal(CsmRestApi._is_public(request), False)
+            assert_equal(CsmRestApi._get_permissions(request), ALERTS_UPDATE)
+            # The middlewares share the metadata stored on the request
+            assert_equal(get_auth_metadata.call_count, 1)
+            assert_equal(request[CsmAuth.REQUEST_METADATA], (False, ALERTS_UPDATE))
+            request = await _request(app, hdrs.METH_GET, '/api/v1/alerts')
+            assert_equal(CsmRestApi._is_public(request), True)
+            request = await _request(app, hdrs.METH_GET, '/api/v1/version')
+            assert_equal(CsmRestApi._get_auth_metadata(request), (False, PermissionSet()))
+        # The routes are computed at startup, the requests add nothing
+        assert_equal(metadata, routes)
+        # The handlers of unresolved requests are not kept
+        for _ in range(2):
+            request = await _request(app, hdrs.METH_GET, '/api/v1/missing')
+            assert_equal(CsmRestApi._get_auth_metadata(request), (False, PermissionSet()))
+            request = await _request(app, hdrs.METH_PUT, '/api/v1/stats')
+            assert_equal(CsmRestApi._is_public(request), False)
+        assert_equal(metadata, routes)
+
+
+test_list = [
+    test_add_auth_metadata,
+    test_request_auth_metadata,
+]
@@ -0,0 +1,133 @@
+# CORTX-CSM: CORTX Management web and CLI interface.
+# Copyright (c) 2020 Seagate Technology LLC and/or its Affiliates
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+
+import asyncio
+import re
+from csm.common.feature_endpoints import FeatureEndpointMatcher, FeatureSupportCache
+from csm.test.common import assert_equal, async_test
+
+
+ENDPOINT_MAP = {
+    "/api/v1/alerts": {"feature_name": "alerts"},
+    "/api/v1/alerts/*": {"feature_name": "alerts"},
+    "/api/v1/alerts/*/comments": {"feature_name": "alert_comments"},
+    "/api/v1/stats/*": {"feature_name": "stats"},
+    "/api/v1/stats/perf": {"feature_name": "perf_stats"},
+    "/api/v1/update/firmware/*": {"feature_name": "FW_Update"},
+    "/api/v1/update/firmware/upload": {"feature_name": "FW_Upload"},
+}
+
+PATHS = [
+    "/api/v1/alerts",
+    "/api/v1/alerts/",
+    "/api/v1/alerts/1a2b",
+    "/api/v1/alerts/1a2b/comments",
+    "/api/v1/alerts/1a2b/history",
+    "/api/v1/alerts/1-2",
+    "/api/v1/stats/perf",
+    "/api/v1/stats/throughput",
+    "/api/v1/update/firmware/upload",
+    "/api/v1/update/firmware/start",
+    "/api/v1/users",
+    "/api/v1/alerts_history",
+]
+
+
+def _linear_match(endpoint_map, path):
+    """ Reference lookup, the scan the matcher replaced """
+    for key, value in endpoint_map.items():
+        map_re = f'^{key}$'.replace("*", r"[\w\d]*")
+        if re.search(map_re, path):
+            return value
+    return None
+
+
+class UnsupportedFeaturesDB:
+    """ Counts the lookups, the features listed as unsupported are denied """
+
+    def __init__(self, unsupported=()):
+        self.unsupported = set(unsupported)
+        self.lookups = 0
+
+    async def is_feature_supported(self, component, feature):
+        self.lookups += 1
+        await asyncio.sleep(0.01)
+        return (component, feature) not in self.unsupported
+
+
+def test_match_same_as_linear_scan(*args):
+    matcher = FeatureEndpointMatcher(ENDPOINT_MAP)
+    for path in PATHS:
+        assert_equal(matcher.match(path), _linear_match(ENDPOINT_MAP, path))
+
+
+def test_first_endpoint_wins(*args):
+    matcher = FeatureEndpointMatcher(ENDPOINT_MAP)
+    # The wildcard endpoint comes first in the mapping
+    assert_equal(matcher.match("/api/v1/stats/perf"), {"feature_name": "stats"})
+    # The exact endpoint comes first in the mapping
+    assert_equal(matcher.match("/api/v1/alerts"), {"feature_name": "alerts"})
+
+
+def test_match_cache(*args):
+    matcher = FeatureEndpointMatcher(ENDPOINT_MAP, cache_size=2)
+    first = matcher.match("/api/v1/alerts/1a2b")
+    assert_equal(matcher.match("/api/v1/alerts/1a2b") is first, True)
+    # Paths without a feature are cached as well
+    assert_equal(matcher.match("/api/v1/users"), None)
+    assert_equal(len(matcher._cache), 2)
+    # A full cache is emptied, not grown
+    assert_equal(matcher.match("/api/v1/stats/perf"), {"feature_name": "stats"})
+    assert_equal(len(matcher._cache), 1)
+
+
+@async_test
+async def test_feature_support_cache(*args):
+    features_db = UnsupportedFeaturesDB([("csm", "stats")])
+    cache = FeatureSupportCache(features_db, ttl=60)
+    verdicts = await asyncio.gather(
+        *(cache.is_feature_supported("csm", "stats") for _ in range(5)))
+    assert_equal(verdicts, [False] * 5)
+    # Concurrent lookups share one query
+    assert_equal(features_db.lookups, 1)
+    assert_equal(await cache.is_feature_supported("csm", "alerts"), True)
+    assert_equal(await cache.is_feature_supported("csm", "stats"), False)
+    assert_equal(features_db.lookups, 2)
+    cache.invalidate()
+    features_db.unsupported.clear()
+    assert_equal(await cache.is_feature_supported("csm", "stats"), True)
+    assert_equal(features_db.lookups, 3)
+
+
+@async_test
+async def test_feature_support_cache_expiry(*args):
+    features_db = UnsupportedFeaturesDB()
+    cache = FeatureSupportCache(features_db, ttl=0)
+    await cache.is_feature_supported("csm", "alerts")
+    await cache.is_feature_supported("csm", "alerts")
+    assert_equal(features_db.lookups, 2)
+
+
+def init(args):
+    pass
+
+
+test_list = [
+    test_match_same_as_linear_scan,
+    test_first_endpoint_wins,
+    test_match_cache,
+    test_feature_support_cache,
+    test_feature_support_cache_expiry,
+]
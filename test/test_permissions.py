@@ -13,9 +13,9 @@
 # For any questions about this software or licensing,
 # please email opensource@seagate.com or cortx-questions@seagate.com.
 
-from csm.test.common import assert_equal
+from csm.test.common import assert_equal, assert_not_equal
 from csm.common.permission_names import Resource, Action
-from csm.core.services.permissions import PermissionSet
+from csm.core.services.permissions import PermissionLayout, PermissionSet
 
 
 def test_permissions_union(*args):
@@ -64,6 +64,63 @@ def test_permissions_intersection(*args):
     assert_equal(calculated, expected)
 
 
+def test_permissions_equality(*args):
+    lhs = PermissionSet({
+        Resource.ALERTS: {Action.LIST, Action.UPDATE},
+        Resource.STATS: {Action.LIST}
+    })
+    rhs = PermissionSet({
+        Resource.STATS: [Action.LIST],
+        Resource.ALERTS: [Action.UPDATE, Action.LIST, Action.UPDATE]
+    })
+
+    assert_equal(lhs, rhs)
+    assert_not_equal(lhs, PermissionSet({Resource.ALERTS: {Action.LIST}}))
+    assert_equal(PermissionSet(), PermissionSet({Resource.ALERTS: set()}))
+    assert_equal(lhs.to_dict(), {
+        Resource.ALERTS: sorted([Action.LIST, Action.UPDATE]),
+        Resource.STATS: [Action.LIST]
+    })
+
+
+def test_permissions_in_place(*args):
+    permissions = PermissionSet({Resource.ALERTS: {Action.LIST}})
+    copy = permissions.copy()
+
+    permissions |= PermissionSet({Resource.STATS: {Action.LIST}})
+    assert_equal(permissions, PermissionSet({
+        Resource.ALERTS: {Action.LIST},
+        Resource.STATS: {Action.LIST}
+    }))
+    assert_equal(copy, PermissionSet({Resource.ALERTS: {Action.LIST}}))
+
+    permissions &= PermissionSet({Resource.STATS: {Action.LIST, Action.UPDATE}})
+    assert_equal(permissions, PermissionSet({Resource.STATS: {Action.LIST}}))
+
+
+def test_permissions_outside_layout(*args):
+    known = PermissionSet({Resource.ALERTS: {Action.LIST}})
+    # Pairs not seen yet get a new bit instead of being lost
+    unknown = PermissionSet({
+        'test_resource': {'test_action'},
+        Resource.ALERTS: {Action.LIST}
+    })
+
+    assert_equal(('test_resource', 'test_action') in PermissionLayout._bits, True)
+    assert_not_equal(unknown, known)
+    assert_equal(unknown & known, known)
+    assert_equal((unknown | known).to_dict(), {
+        'test_resource': ['test_action'],
+        Resource.ALERTS: [Action.LIST]
+    })
+    # Registering again keeps the bits already assigned
+    bits = dict(PermissionLayout._bits)
+    PermissionLayout.register({'test_resource': {'test_action', 'other_action'}})
+    assert_equal({pair: PermissionLayout._bits[pair] for pair in bits}, bits)
+    assert_equal(PermissionLayout.items(PermissionLayout.mask(unknown.to_dict())),
+                 {'test_resource': {'test_action'}, Resource.ALERTS: {Action.LIST}})
+
+
 def init(args):
     pass
 
@@ -71,4 +128,7 @@ def init(args):
 test_list = [
     test_permissions_union,
     test_permissions_intersection,
+    test_permissions_equality,
+    test_permissions_in_place,
+    test_permissions_outside_layout,
 ]
@@ -156,6 +156,40 @@ async def test_invalid_roles(*args):
     assert_equal(actual_permissions, expected_permissions)
 
 
+async def test_memo_role_order(*args):
+    role_manager = RoleManager(roles_dict)
+    first = await role_manager.calc_effective_permissions('manage', 'monitor')
+    second = await role_manager.calc_effective_permissions('monitor', 'manage', 'monitor')
+
+    assert_equal(first, second)
+    assert_equal(list(role_manager._effective_permissions), [('manage', 'monitor')])
+
+    # Changing the returned set must not change the memoized one
+    first |= PermissionSet({'nfs': {'list'}})
+    third = await role_manager.calc_effective_permissions('monitor', 'manage')
+    assert_equal(third, second)
+
+
+async def test_memo_role_changes(*args):
+    role_manager = RoleManager(roles_dict)
+    no_permissions = await role_manager.calc_effective_permissions('nfs', 'monitor')
+    assert_equal(no_permissions, await role_manager.calc_effective_permissions('monitor'))
+
+    await role_manager.add_role('nfs', {'nfs': ['list']})
+    expected_permissions = PermissionSet({
+        'alerts': {'list', 'update'},
+        'stats': {'list', 'update'},
+        'users': {'list', 'update'},
+        'nfs': {'list'}
+    })
+    actual_permissions = await role_manager.calc_effective_permissions('monitor', 'nfs')
+    assert_equal(actual_permissions, expected_permissions)
+
+    await role_manager.delete_role('nfs')
+    actual_permissions = await role_manager.calc_effective_permissions('monitor', 'nfs')
+    assert_equal(actual_permissions, no_permissions)
+
+
 CSM_BASE_DIRS = [
     os.path.join(os.path.dirname(__file__), '..'),
     Const.CSM_PATH,
@@ -523,5 +557,7 @@ test_list = [
     async_test(test_monitor_roles),
     async_test(test_manage_roles_with_root),
     async_test(test_invalid_roles),
+    async_test(test_memo_role_order),
+    async_test(test_memo_role_changes),
     async_test(test_rest_ep_permissions),
 ]
@@ -0,0 +1,287 @@
+# CORTX-CSM: CORTX Management web and CLI interface.
+# Copyright (c) 2020 Seagate Technology LLC and/or its Affiliates
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+
+import asyncio
+import os
+import shutil
+import stat
+import tempfile
+import threading
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+from aiohttp.test_utils import make_mocked_request
+from csm.common.conf import Conf
+from csm.common.errors import CsmError, CsmTooManyRequests
+from csm.common.passwd import PasswdPool
+from csm.common.permission_names import Resource, Action
+from csm.core.blogic import const
+from csm.core.controllers.login import LoginView
+from csm.core.data.models.users import User
+from csm.core.services.permissions import PermissionSet
+from csm.core.services.sessions import (
+    FileSessionBackend,
+    InMemorySessionBackend,
+    LocalAuthPolicy,
+    LocalCredentials,
+    LoginThrottle,
+    S3Credentials,
+    Session
+)
+from csm.test.common import assert_equal, assert_raises, async_test
+
+
+NOW = datetime(2021, 1, 1, tzinfo=timezone.utc)
+PERMISSIONS = PermissionSet({
+    Resource.ALERTS: {Action.LIST, Action.UPDATE},
+    Resource.STATS: {Action.LIST}
+})
+
+
+def _session(session_id, expires_in, credentials=None):
+    return Session(session_id, NOW + timedelta(seconds=expires_in),
+                   credentials or LocalCredentials('admin'), PERMISSIONS)
+
+
+async def _session_ids(backend):
+    return sorted(session.session_id for session in await backend.load_all())
+
+
+class FakePasswdPool:
+    """ Accepts a single password and counts the verifications """
+
+    def __init__(self, password):
+        self.password = password
+        self.verified = 0
+
+    async def verify(self, password, hashed):
+        self.verified += 1
+        return password == self.password
+
+
+def _conf(settings):
+    return mock.patch.object(Conf, 'get', side_effect=lambda index, key, default=None:
+                             settings.get(key, default))
+
+
+@async_test
+async def test_memory_delete_expired(args):
+    backend = InMemorySessionBackend()
+    for number, expires_in in enumerate((30, 10, 20, 40)):
+        await backend.store(_session(f'session{number}', expires_in))
+    await backend.delete('session3')
+    assert_equal(await backend.delete_expired(NOW), 0)
+    assert_equal(await backend.delete_expired(NOW + timedelta(seconds=20)), 2)
+    assert_equal(await _session_ids(backend), ['session0'])
+    # The deleted session is not counted when its heap entry is popped
+    assert_equal(await backend.delete_expired(NOW + timedelta(seconds=60)), 1)
+    assert_equal(await backend.load_all(), [])
+
+
+@async_test
+async def test_memory_touch(args):
+    backend = InMemorySessionBackend()
+    await backend.store(_session('session0', 10))
+    await backend.store(_session('session1', 10))
+    await backend.touch('session0', NOW + timedelta(seconds=30))
+    await backend.touch('unknown', NOW + timedelta(seconds=30))
+    assert_equal(await backend.load('unknown'), None)
+    # The outdated heap entry of the refreshed session is skipped
+    assert_equal(await backend.delete_expired(NOW + timedelta(seconds=20)), 1)
+    session = await backend.load('session0')
+    assert_equal(session.expiry_time, NOW + timedelta(seconds=30))
+    assert_equal(await backend.delete_expired(NOW + timedelta(seconds=30)), 1)
+
+
+@async_test
+async def test_memory_heap_rebuild(args):
+    backend = InMemorySessionBackend()
+    await backend.store(_session('session0', 10))
+    for seconds in range(1000):
+        await backend.touch('session0', NOW + timedelta(seconds=seconds))
+    # Outdated entries do not pile up
+    assert_equal(len(backend._expiry) <= 2 + 64, True)
+    assert_equal(await backend.delete_expired(NOW + timedelta(seconds=998)), 0)
+    assert_equal(await backend.delete_expired(NOW + timedelta(seconds=999)), 1)
+
+
+@async_test
+async def test_file_store_load(args):
+    path = tempfile.mkdtemp()
+    try:
+        backend = FileSessionBackend(os.path.join(path, 'sessions'))
+        credentials = S3Credentials('s3user', 'access', 'secret', 'token')
+        await backend.store(_session('session0', 10, credentials))
+        await backend.store(_session('session1', 20))
+        session_file = os.path.join(path, 'sessions', 'session0.json')
+        assert_equal(stat.S_IMODE(os.stat(session_file).st_mode), 0o600)
+        session = await backend.load('session0')
+        assert_equal(session.expiry_time, NOW + timedelta(seconds=10))
+        assert_equal(type(session.credentials), S3Credentials)
+        assert_equal((session.credentials.user_id,
+                      session.credentials.access_key,
+                      session.credentials.secret_key,
+                      session.credentials.session_token),
+                     ('s3user', 'access', 'secret', 'token'))
+        assert_equal(session.permissions, PERMISSIONS)
+        assert_equal(await _session_ids(backend), ['session0', 'session1'])
+        # A broken file is skipped
+        with open(os.path.join(path, 'sessions', 'broken.json'), 'w') as f:
+            f.write('{')
+        assert_equal(await backend.load('broken'), None)
+        assert_equal(await _session_ids(backend), ['session0', 'session1'])
+    finally:
+        shutil.rmtree(path)
+
+
+@async_test
+async def test_file_session_id(args):
+    path = tempfile.mkdtemp()
+    try:
+        backend = FileSessionBackend(path)
+        with assert_raises(CsmError):
+            await backend.store(_session('../session0', 10))
+        assert_equal(await backend.load('../session0'), None)
+        assert_equal(await backend.load('missing'), None)
+        await backend.delete('../session0')
+        await backend.touch('', NOW)
+        assert_equal(os.listdir(path), [])
+    finally:
+        shutil.rmtree(path)
+
+
+@async_test
+async def test_file_touch_delete_expired(args):
+    path = tempfile.mkdtemp()
+    try:
+        backend = FileSessionBackend(path)
+        for number in range(3):
+            await backend.store(_session(f'session{number}', 10))
+        await backend.touch('session0', NOW + timedelta(seconds=30))
+        await backend.touch('missing', NOW + timedelta(seconds=30))
+        session = await backend.load('session0')
+        assert_equal(session.expiry_time, NOW + timedelta(seconds=30))
+        await backend.delete('session1')
+        await backend.delete('session1')
+        assert_equal(await backend.delete_expired(NOW + timedelta(seconds=20)), 1)
+        assert_equal(await _session_ids(backend), ['session0'])
+        # A second backend on the same directory sees the same sessions
+        other = FileSessionBackend(path)
+        assert_equal(await _session_ids(other), ['session0'])
+        assert_equal(await other.delete_expired(NOW + timedelta(seconds=30)), 1)
+        assert_equal(await backend.load('session0'), None)
+    finally:
+        shutil.rmtree(path)
+
+
+@async_test
+async def test_passwd_pool_max_pending(args):
+    released = threading.Event()
+
+    def verify(password, hashed):
+        released.wait(5)
+        return True
+
+    pool = PasswdPool(workers=1, max_pending=2)
+    try:
+        with mock.patch('csm.common.passwd.Passwd.verify', verify):
+            pending = [asyncio.ensure_future(pool.verify('password', 'hash'))
+                       for _ in range(2)]
+            await asyncio.sleep(0.01)
+            # The calls waiting for the thread count as pending too
+            with assert_raises(CsmTooManyRequests):
+                await pool.verify('password', 'hash')
+            released.set()
+            assert_equal(await asyncio.gather(*pending), [True, True])
+            assert_equal(await pool.verify('password', 'hash'), True)
+    finally:
+        released.set()
+        await pool.shutdown()
+
+
+def test_login_throttle(args):
+    throttle = LoginThrottle(max_per_user=2, max_per_remote=3)
+    with throttle.limit('admin', '10.0.0.1'), throttle.limit('ADMIN', '10.0.0.1'):
+        # The user id is not case sensitive
+        with assert_raises(CsmTooManyRequests):
+            with throttle.limit('Admin', '10.0.0.2'):
+                pass
+        with throttle.limit('monitor', '10.0.0.1'):
+            with assert_raises(CsmTooManyRequests):
+                with throttle.limit('manager', '10.0.0.1'):
+                    pass
+            # The rejected login releases the user it was counted for
+            assert_equal(throttle._in_progress.get(('user', 'manager')), None)
+        # The logins without a remote address are limited per user only
+        with throttle.limit('manager'):
+            pass
+    assert_equal(throttle._in_progress, {})
+    with throttle.limit('admin', '10.0.0.1'):
+        pass
+
+
+@async_test
+async def test_login_failure_cache(args):
+    pool = FakePasswdPool('password')
+    with _conf({const.LOGIN_FAILURE_CACHE_TTL: 0.1}):
+        policy = LocalAuthPolicy(pool)
+    user = User.instantiate_csm_user('admin', 'hash')
+    assert_equal(await policy.authenticate(user, 'wrong'), None)
+    assert_equal(await policy.authenticate(user, 'wrong'), None)
+    assert_equal(pool.verified, 1)
+    # Other passwords are verified
+    credentials = await policy.authenticate(user, 'password')
+    assert_equal((credentials.user_id, pool.verified), ('admin', 2))
+    # A password change forgets the failures
+    user.password_hash = 'new hash'
+    assert_equal(await policy.authenticate(user, 'wrong'), None)
+    assert_equal(pool.verified, 3)
+    # So does the failure cache TTL
+    await asyncio.sleep(0.15)
+    assert_equal(await policy.authenticate(user, 'wrong'), None)
+    assert_equal(pool.verified, 4)
+
+
+def test_login_client_address(args):
+    def client_address(remote, forwarded=None):
+        headers = {'X-Forwarded-For': forwarded} if forwarded else {}
+        request = make_mocked_request('POST', '/api/v1/login', headers=headers)
+        return LoginView(request.clone(remote=remote))._client_address()
+
+    assert_equal(client_address('127.0.0.1', '10.0.0.5, 10.0.0.9'), '10.0.0.9')
+    assert_equal(client_address('::1', '10.0.0.9'), '10.0.0.9')
+    assert_equal(client_address('127.0.0.1'), '127.0.0.1')
+    # Other hosts can not pass the address for the throttling
+    assert_equal(client_address('10.0.0.5', '10.0.0.9'), '10.0.0.5')
+    with _conf({const.LOGIN_TRUSTED_PROXIES: ['10.0.0.5']}):
+        assert_equal(client_address('10.0.0.5', '10.0.0.1, 10.0.0.9'), '10.0.0.9')
+        assert_equal(client_address('127.0.0.1', '10.0.0.9'), '127.0.0.1')
+
+
+def init(args):
+    pass
+
+
+test_list = [
+    test_memory_delete_expired,
+    test_memory_touch,
+    test_memory_heap_rebuild,
+    test_file_store_load,
+    test_file_session_id,
+    test_file_touch_delete_expired,
+    test_passwd_pool_max_pending,
+    test_login_throttle,
+    test_login_failure_cache,
+    test_login_client_address,
+]
@@ -0,0 +1,152 @@
+# CORTX-CSM: CORTX Management web and CLI interface.
+# Copyright (c) 2020 Seagate Technology LLC and/or its Affiliates
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+
+import asyncio
+from types import SimpleNamespace
+from unittest import mock
+from uuid import uuid4
+from botocore.exceptions import ClientError
+from csm.core.blogic import const
+from csm.core.services.usl import UslService
+from csm.test.common import assert_equal, async_test
+
+NOW = 1000
+TTL = 60
+
+
+def _tagging_error(code):
+    return ClientError({'Error': {'Code': code, 'Message': code},
+                        'ResponseMetadata': {'HTTPStatusCode': 500}}, 'GetBucketTagging')
+
+
+class FakeS3Client:
+    """
+    Buckets with their tags, or the error reading their tags raises.
+    Records the tag reads and how many of them run at once.
+    """
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.reads = []
+        self.running = 0
+        self.max_running = 0
+
+    async def get_all_buckets(self):
+        return [SimpleNamespace(name=name) for name in self.buckets]
+
+    async def get_bucket_tagging(self, bucket):
+        self.reads.append(bucket.name)
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        try:
+            await asyncio.sleep(0)
+            tags = self.buckets[bucket.name]
+            if isinstance(tags, Exception):
+                raise tags
+            return tags
+        finally:
+            self.running -= 1
+
+
+class FakeCapacityService:
+
+    def __init__(self, provisioner):
+        pass
+
+    async def get_capacity_details(self):
+        return {const.SIZE: 1000, const.USED: 10}
+
+
+def _usl_service(s3_client, concurrency=8):
+    service = UslService.__new__(UslService)
+    service._device_uuid = uuid4()
+    service._provisioner = None
+    service._s3plugin = mock.Mock(get_s3_client=mock.Mock(return_value=s3_client))
+    service._tag_check_concurrency = concurrency
+    service._tag_cache_ttl = TTL
+    service._lyve_pilot_buckets = {}
+    return service
+
+
+async def _is_enabled(service, s3_client, name, now=NOW):
+    with mock.patch('csm.core.services.usl.time.monotonic', return_value=now):
+        return await service._is_bucket_lyve_pilot_enabled(s3_client,
+                                                           SimpleNamespace(name=name))
+
+
+def init(args):
+    pass
+
+
+@async_test
+async def test_verdict_cache(args):
+    s3_client = FakeS3Client({'udx': {'udx': 'enabled'}, 'data': {'udx': 'disabled'},
+                              'untagged': {}})
+    service = _usl_service(s3_client)
+    for _ in range(2):
+        assert_equal([await _is_enabled(service, s3_client, name)
+                      for name in ('udx', 'data', 'untagged')], [True, False, False])
+    assert_equal(s3_client.reads, ['udx', 'data', 'untagged'])
+    # The verdicts expire after the TTL
+    assert_equal(await _is_enabled(service, s3_client, 'udx', NOW + TTL), True)
+    assert_equal(s3_client.reads[3:], ['udx'])
+    # Tagging a bucket drops its verdict
+    s3_client.buckets['data'] = {'udx': 'enabled'}
+    service._forget_lyve_pilot_bucket('data')
+    assert_equal(await _is_enabled(service, s3_client, 'data'), True)
+    assert_equal(s3_client.reads[4:], ['data'])
+
+
+@async_test
+async def test_client_error_not_cached(args):
+    s3_client = FakeS3Client({'udx': _tagging_error('InternalError')})
+    service = _usl_service(s3_client)
+    with mock.patch('csm.core.services.usl.Log') as log:
+        assert_equal(await _is_enabled(service, s3_client, 'udx'), False)
+    assert_equal((log.warn.call_count, service._lyve_pilot_buckets), (1, {}))
+    # The bucket is checked again once its tags can be read
+    s3_client.buckets['udx'] = {'udx': 'enabled'}
+    assert_equal(await _is_enabled(service, s3_client, 'udx'), True)
+    assert_equal(s3_client.reads, ['udx', 'udx'])
+
+
+@async_test
+async def test_volume_list(args):
+    buckets = {f'bucket-{i}': {'udx': 'enabled'} if i % 3 == 0 else {} for i in range(20)}
+    buckets['bucket-1'] = _tagging_error('ServiceUnavailable')
+    s3_client = FakeS3Client(buckets)
+    service = _usl_service(s3_client, concurrency=4)
+
+    async def _get_system_friendly_name():
+        return 'cortx'
+    service._get_system_friendly_name = _get_system_friendly_name
+    with mock.patch('csm.core.services.usl.CsmS3ConfigurationFactory'), \
+            mock.patch('csm.core.services.usl.StorageCapacityService', FakeCapacityService), \
+            mock.patch('csm.core.services.usl.Log'):
+        volumes = await service._get_lyve_pilot_volume_list('access', 'secret')
+        # The tags are read concurrently, up to the configured number of buckets
+        assert_equal((s3_client.max_running, len(s3_client.reads)), (4, 20))
+        assert_equal([volume.bucketName for volume in volumes.values()],
+                     [f'bucket-{i}' for i in range(0, 20, 3)])
+        # Only the bucket whose tags failed is read again
+        await service._get_lyve_pilot_volume_list('access', 'secret')
+    assert_equal(s3_client.reads[20:], ['bucket-1'])
+
+
+test_list = [
+    test_verdict_cache,
+    test_client_error_not_cached,
+    test_volume_list,
+]
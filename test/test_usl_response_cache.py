@@ -0,0 +1,190 @@
+# CORTX-CSM: CORTX Management web and CLI interface.
+# Copyright (c) 2020 Seagate Technology LLC and/or its Affiliates
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+
+import asyncio
+import json
+from unittest import mock
+from aiohttp.test_utils import make_mocked_request
+from csm.common.conf import Conf
+from csm.common.errors import CsmError
+from csm.common.response_cache import CachedResponse, ResponseCache
+from csm.core.blogic import const
+from csm.core.controllers.usl import SystemView
+from csm.core.services.system_config import SystemConfigAppService
+from csm.core.services.usl import UslService
+from csm.test.common import assert_equal, assert_raises, async_test
+
+SYSTEM = {'model': 'CORTX', 'serialNumber': '123', 'friendlyName': 'appliance'}
+
+
+class Computation:
+    """ Response computation which counts its calls and may wait until released """
+
+    def __init__(self, *values):
+        self.values = list(values)
+        self.calls = 0
+        self.released = asyncio.Event()
+        self.released.set()
+
+    async def __call__(self):
+        value = self.values[min(self.calls, len(self.values) - 1)]
+        self.calls += 1
+        await self.released.wait()
+        if isinstance(value, Exception):
+            raise value
+        return value
+
+
+class FakeSystemConfigManager:
+
+    async def get_system_config_by_id(self, config_id):
+        return mock.Mock(config_id=config_id)
+
+    async def delete(self, config_id):
+        pass
+
+
+def _usl_service():
+    service = UslService.__new__(UslService)
+    service._response_cache = ResponseCache(60)
+    return service
+
+
+async def _get_system(service, if_none_match=None):
+    headers = {'If-None-Match': if_none_match} if if_none_match else {}
+    transport = mock.Mock(get_extra_info=lambda name: ('127.0.0.1', 28100))
+    request = make_mocked_request('GET', '/usl/v1/system', headers=headers,
+                                  transport=transport,
+                                  app={const.USL_SERVICE: service,
+                                       const.S3_ACCOUNT_SERVICE: None,
+                                       const.S3_IAM_USERS_SERVICE: None,
+                                       const.S3_BUCKET_SERVICE: None})
+    with mock.patch.object(Conf, 'get', side_effect=lambda index, key, default=None: default):
+        return await SystemView(request).get()
+
+
+def init(args):
+    pass
+
+
+def test_etag(args):
+    response = CachedResponse(SYSTEM, 0)
+    # The tag depends on the content only
+    assert_equal(CachedResponse(dict(SYSTEM), 10).etag, response.etag)
+    assert_equal(CachedResponse({**SYSTEM, 'model': 'LR'}, 0).etag == response.etag, False)
+    assert_equal((response.content_type, json.loads(response.body)),
+                 (CachedResponse.JSON, SYSTEM))
+    assert_equal(CachedResponse(b'key', 0).content_type, CachedResponse.BINARY)
+    assert_equal(response.matches(None), False)
+    assert_equal(response.matches('"other"'), False)
+    assert_equal(response.matches(response.etag), True)
+    assert_equal(response.matches(f'"other", W/{response.etag}'), True)
+    assert_equal(response.matches('*'), True)
+
+
+@async_test
+async def test_shared_computation(args):
+    cache = ResponseCache(60)
+    compute = Computation(SYSTEM)
+    compute.released.clear()
+    first = asyncio.ensure_future(cache.get('system', compute))
+    second = asyncio.ensure_future(cache.get('system', compute))
+    await asyncio.sleep(0)
+    # A cancelled request does not cancel the computation of the others
+    first.cancel()
+    compute.released.set()
+    response = await second
+    assert_equal((compute.calls, json.loads(response.body)), (1, SYSTEM))
+    assert_equal(await cache.get('system', compute), response)
+    assert_equal(compute.calls, 1)
+    # Expired responses are computed again
+    cache = ResponseCache(0)
+    await cache.get('system', compute)
+    await cache.get('system', compute)
+    assert_equal(compute.calls, 3)
+
+
+@async_test
+async def test_errors_not_cached(args):
+    cache = ResponseCache(60)
+    compute = Computation(CsmError(desc='Provisioner is not available'), SYSTEM)
+    with assert_raises(CsmError):
+        await cache.get('system', compute)
+    response = await cache.get('system', compute)
+    assert_equal((compute.calls, json.loads(response.body)), (2, SYSTEM))
+
+
+@async_test
+async def test_invalidate_during_computation(args):
+    cache = ResponseCache(60)
+    stale = Computation({'state': 'old'})
+    stale.released.clear()
+    pending = asyncio.ensure_future(cache.get('system', stale))
+    await asyncio.sleep(0)
+    cache.invalidate()
+    # The requests after the invalidation do not wait for the stale response
+    fresh = Computation({'state': 'new'})
+    response = await cache.get('system', fresh)
+    stale.released.set()
+    assert_equal(json.loads((await pending).body), {'state': 'old'})
+    # The stale response is not cached over the fresh one
+    assert_equal(await cache.get('system', fresh), response)
+    assert_equal((stale.calls, fresh.calls), (1, 1))
+    # The invalidation of a prefix keeps the other responses
+    certificate = await cache.get('certificates/domain', Computation(b'certificate'))
+    cache.invalidate('certificates/')
+    assert_equal(await cache.get('system', fresh), response)
+    assert_equal(await cache.get('certificates/domain', Computation(b'new')) == certificate,
+                 False)
+
+
+@async_test
+async def test_not_modified(args):
+    service = _usl_service()
+    service.get_system = Computation(SYSTEM)
+    response = await _get_system(service)
+    assert_equal((response.status, json.loads(response.body)), (200, SYSTEM))
+    etag = response.headers['ETag']
+    # A client polling with the current tag gets no body
+    response = await _get_system(service, etag)
+    assert_equal((response.status, response.body, response.headers['ETag']),
+                 (304, None, etag))
+    response = await _get_system(service, '"other"')
+    assert_equal((response.status, response.headers['ETag']), (200, etag))
+    assert_equal(service.get_system.calls, 1)
+
+
+@async_test
+async def test_system_config_invalidates(args):
+    service = _usl_service()
+    compute = Computation(SYSTEM, {**SYSTEM, 'friendlyName': 'renamed'})
+    system_config = SystemConfigAppService(None, None, None, FakeSystemConfigManager())
+    system_config.add_listener(service.invalidate_responses)
+    before = await service.get_cached_response(service.CACHE_SYSTEM, compute)
+    await system_config.delete_system_config('config')
+    after = await service.get_cached_response(service.CACHE_SYSTEM, compute)
+    assert_equal(compute.calls, 2)
+    assert_equal(json.loads(after.body)['friendlyName'], 'renamed')
+    assert_equal(before.etag == after.etag, False)
+
+
+test_list = [
+    test_etag,
+    test_shared_computation,
+    test_errors_not_cached,
+    test_invalidate_during_computation,
+    test_not_modified,
+    test_system_config_invalidates,
+]
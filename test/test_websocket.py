@@ -0,0 +1,299 @@
+# CORTX-CSM: CORTX Management web and CLI interface.
+# Copyright (c) 2020 Seagate Technology LLC and/or its Affiliates
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+
+import asyncio
+import json
+from csm.core.agent.websocket import WebSocketFanout, WebSocketEvent
+from csm.test.common import assert_equal, async_test
+
+
+class FakeWebSocket:
+    """ Records the sent messages, blocks the sends while paused """
+
+    def __init__(self, fail=False):
+        self.messages = []
+        self.closed = False
+        self.fail = fail
+        self.resumed = asyncio.Event()
+        self.resumed.set()
+
+    def pause(self):
+        self.resumed.clear()
+
+    def resume(self):
+        self.resumed.set()
+
+    async def send_str(self, data):
+        if self.fail:
+            raise ConnectionResetError('Connection reset by peer')
+        await self.resumed.wait()
+        self.messages.append(json.loads(data))
+
+    async def close(self):
+        self.closed = True
+
+
+async def _drain():
+    """ Lets the sender tasks run until they are blocked """
+    for _ in range(100):
+        await asyncio.sleep(0)
+
+
+def _alert(number, severity="critical", host_id="srvnode-1"):
+    return WebSocketEvent("alerts", {"alert": number, "severity": severity},
+                          severity=severity, host_id=host_id)
+
+
+def _fanout(**kwargs):
+    kwargs.setdefault("default_topics", ("alerts",))
+    return WebSocketFanout(json.dumps, **kwargs)
+
+
+@async_test
+async def test_publish(*args):
+    fanout = _fanout()
+    first, second = FakeWebSocket(), FakeWebSocket()
+    fanout.add(first)
+    fanout.add(second)
+    for number in range(3):
+        fanout.publish(_alert(number))
+    await _drain()
+    expected = [{"alert": number, "severity": "critical"} for number in range(3)]
+    assert_equal(first.messages, expected)
+    assert_equal(second.messages, expected)
+    await fanout.close()
+    await _drain()
+
+
+@async_test
+async def test_slow_client_drop(*args):
+    fanout = _fanout(queue_size=2, lag_policy=WebSocketFanout.POLICY_DROP)
+    slow, fast = FakeWebSocket(), FakeWebSocket()
+    slow_client = fanout.add(slow)
+    fanout.add(fast)
+    slow.pause()
+    for number in range(5):
+        fanout.publish(_alert(number))
+        await _drain()
+    # The fast client is not held up by the slow one
+    assert_equal([m["alert"] for m in fast.messages], [0, 1, 2, 3, 4])
+    # The slow client is blocked on message 0, the oldest queued are dropped
+    assert_equal(slow_client.dropped, 2)
+    assert_equal(slow_client.lag, 2)
+    slow.resume()
+    await _drain()
+    assert_equal([m["alert"] for m in slow.messages], [0, 3, 4])
+    assert_equal(fanout.metrics()["clients"], 2)
+    await fanout.close()
+    await _drain()
+
+
+@async_test
+async def test_slow_client_disconnect(*args):
+    fanout = _fanout(queue_size=2, lag_policy=WebSocketFanout.POLICY_DISCONNECT)
+    slow, fast = FakeWebSocket(), FakeWebSocket()
+    fanout.add(slow)
+    fanout.add(fast)
+    slow.pause()
+    for number in range(4):
+        fanout.publish(_alert(number))
+        await _drain()
+    assert_equal(slow.closed, True)
+    assert_equal(fast.closed, False)
+    assert_equal(fanout.metrics()["clients"], 1)
+    assert_equal(len(fast.messages), 4)
+    await fanout.close()
+    await _drain()
+
+
+@async_test
+async def test_send_failure_disconnect(*args):
+    fanout = _fanout()
+    broken = FakeWebSocket(fail=True)
+    fanout.add(broken)
+    fanout.publish(_alert(0))
+    await _drain()
+    assert_equal(broken.closed, True)
+    assert_equal(fanout.metrics()["clients"], 0)
+    # Publishing without clients keeps working
+    fanout.publish(_alert(1))
+    await fanout.close()
+    await _drain()
+
+
+@async_test
+async def test_subscriptions(*args):
+    fanout = _fanout()
+    ws = FakeWebSocket()
+    fanout.add(ws)
+    fanout.handle_message(ws, json.dumps({
+        "action": "subscribe",
+        "topics": [{"topic": "health", "subtree": "srvnode-2"}]}))
+    fanout.handle_message(ws, json.dumps({
+        "action": "unsubscribe", "topics": [{"topic": "alerts"}]}))
+    fanout.handle_message(ws, json.dumps({
+        "action": "subscribe",
+        "topics": [{"topic": "alerts", "severity": "CRITICAL"}]}))
+    fanout.publish(_alert(0, severity="warning"))
+    fanout.publish(_alert(1, severity="critical"))
+    fanout.publish(WebSocketEvent("health", {"health": "srvnode-1"},
+                                  subtree=("nodes", "srvnode-1", "disk")))
+    fanout.publish(WebSocketEvent("health", {"health": "srvnode-2"},
+                                  subtree=("nodes", "srvnode-2", "disk")))
+    await _drain()
+    replies = ws.messages[:3]
+    assert_equal([reply["action"] for reply in replies],
+                 ["subscribe", "unsubscribe", "subscribe"])
+    assert_equal(replies[-1]["topics"],
+                 [{"topic": "health", "subtree": "srvnode-2"},
+                  {"topic": "alerts", "severity": "CRITICAL"}])
+    assert_equal(ws.messages[3:], [{"alert": 1, "severity": "critical"},
+                                   {"health": "srvnode-2"}])
+    fanout.handle_message(ws, "not json")
+    fanout.handle_message(ws, json.dumps({"action": "publish"}))
+    await _drain()
+    assert_equal("error" in ws.messages[-2] and "error" in ws.messages[-1], True)
+    await fanout.close()
+    await _drain()
+
+
+@async_test
+async def test_resume_complete(*args):
+    fanout = _fanout()
+    for number in range(3):
+        fanout.publish(_alert(number))
+    epoch = fanout._epoch
+    ws = FakeWebSocket()
+    ws.pause()
+    client = fanout.add(ws)
+    fanout.handle_message(ws, json.dumps(
+        {"action": "resume", "seq": 1, "epoch": epoch}))
+    # The reply is queued with the replayed events
+    assert_equal(client.replayed, 3)
+    assert_equal(client.lag, 0)
+    fanout.publish(_alert(3))
+    assert_equal(client.lag, 1)
+    ws.resume()
+    await _drain()
+    reply, *events = ws.messages
+    assert_equal(reply, {"action": "resume", "epoch": epoch, "seq": 3,
+                         "complete": True})
+    assert_equal([event["seq"] for event in events], [2, 3, 4])
+    assert_equal(events[-1], {"seq": 4, "epoch": epoch, "topic": "alerts",
+                              "data": {"alert": 3, "severity": "critical"}})
+    assert_equal(client.replayed, 0)
+    assert_equal(client.lag, 0)
+    await fanout.close()
+    await _drain()
+
+
+@async_test
+async def test_resume_incomplete(*args):
+    fanout = _fanout(history_size=2)
+    for number in range(5):
+        fanout.publish(_alert(number))
+    ws = FakeWebSocket()
+    fanout.add(ws)
+    # Events 2 and 3 are no longer buffered
+    fanout.handle_message(ws, json.dumps(
+        {"action": "resume", "seq": 1, "epoch": fanout._epoch}))
+    await _drain()
+    assert_equal(ws.messages[0]["complete"], False)
+    assert_equal([event["seq"] for event in ws.messages[1:]], [4, 5])
+    # The agent was restarted
+    ws.messages.clear()
+    fanout.handle_message(ws, json.dumps(
+        {"action": "resume", "seq": 5, "epoch": "previous"}))
+    await _drain()
+    assert_equal(ws.messages[0]["complete"], False)
+    assert_equal([event["seq"] for event in ws.messages[1:]], [4, 5])
+    await fanout.close()
+    await _drain()
+
+
+@async_test
+async def test_replayed_lag(*args):
+    fanout = _fanout(queue_size=2, lag_policy=WebSocketFanout.POLICY_DROP)
+    for number in range(4):
+        fanout.publish(_alert(number))
+    ws = FakeWebSocket()
+    ws.pause()
+    client = fanout.add(ws)
+    fanout.handle_message(ws, json.dumps(
+        {"action": "resume", "seq": 0, "epoch": fanout._epoch}))
+    # The replay goes past the queue bound without dropping
+    assert_equal(client.replayed, 5)
+    assert_equal(client.lag, 0)
+    assert_equal(client.dropped, 0)
+    for number in range(4, 7):
+        fanout.publish(_alert(number))
+    # The oldest live message is dropped, not the reply or the replayed events
+    assert_equal(client.dropped, 1)
+    assert_equal(client.replayed, 5)
+    assert_equal(client.lag, 2)
+    ws.resume()
+    await _drain()
+    reply, *events = ws.messages
+    assert_equal((reply["action"], reply["complete"]), ("resume", True))
+    assert_equal([event["seq"] for event in events], [1, 2, 3, 4, 6, 7])
+    assert_equal(client.replayed, 0)
+    assert_equal(client.lag, 0)
+    await fanout.close()
+    await _drain()
+
+
+@async_test
+async def test_lag_before_resume(*args):
+    fanout = _fanout(queue_size=2, lag_policy=WebSocketFanout.POLICY_DROP)
+    ws = FakeWebSocket()
+    ws.pause()
+    client = fanout.add(ws)
+    await _drain()
+    # The sender is blocked on message 0, messages 1 and 2 are queued
+    for number in range(3):
+        fanout.publish(_alert(number))
+        await _drain()
+    fanout.handle_message(ws, json.dumps(
+        {"action": "resume", "seq": 1, "epoch": fanout._epoch}))
+    fanout.publish(_alert(3))
+    fanout.publish(_alert(4))
+    # The live messages before the replayed ones are dropped first
+    assert_equal(client.dropped, 2)
+    assert_equal(client.lag, 2)
+    ws.resume()
+    await _drain()
+    assert_equal(ws.messages[:2], [{"alert": 0, "severity": "critical"},
+                                   {"action": "resume", "epoch": fanout._epoch,
+                                    "seq": 3, "complete": True}])
+    assert_equal([event["seq"] for event in ws.messages[2:]], [2, 3, 4, 5])
+    await fanout.close()
+    await _drain()
+
+
+def init(args):
+    pass
+
+
+test_list = [
+    test_publish,
+    test_slow_client_drop,
+    test_slow_client_disconnect,
+    test_send_failure_disconnect,
+    test_subscriptions,
+    test_resume_complete,
+    test_resume_incomplete,
+    test_replayed_lag,
+    test_lag_before_resume,
+]